@@ -0,0 +1,169 @@
+import sys
+
+from db.PooledQueryExecutor import QueryExecutorBase
+from utils.logging import logger
+
+try:
+    import aiomysql
+except ImportError:
+    # Pass as this is an optional requirement. We're going to check later if it
+    # was properly imported and only use it if it's installed.
+    pass
+
+
+class AsyncPooledQueryExecutor(QueryExecutorBase):
+    """
+    asyncio counterpart of PooledQueryExecutor. Offers the same execute, autofetch_* and autoexec_* methods
+    as coroutines, backed by a pool of non-blocking connections (aiomysql). Waiting for a free connection or
+    a result suspends the calling coroutine instead of blocking the thread running the event loop.
+    The pool is bound to the event loop it has been created in, init_pool has to be awaited in that loop.
+    Optional API for coroutine based code, MAD itself does not use it yet (see scripts/benchmark_db_executor.py).
+    Requires aiomysql.
+    """
+
+    def __init__(self, host, port, username, password, database, poolsize=1):
+        self.host = host
+        self.port = port
+        self.user = username
+        self.password = password
+        self.database = database
+        self._poolsize = poolsize
+
+        self._pool = None
+
+    @staticmethod
+    def is_available() -> bool:
+        return 'aiomysql' in sys.modules
+
+    async def init_pool(self):
+        if not self.is_available():
+            raise RuntimeError("aiomysql is required for the async DB executor. Install it with "
+                               "'pip install aiomysql'")
+        logger.info("Connecting to DB (async)")
+        self._pool = await aiomysql.create_pool(host=self.host,
+                                                port=self.port,
+                                                user=self.user,
+                                                password=self.password,
+                                                db=self.database,
+                                                minsize=1,
+                                                maxsize=self._poolsize,
+                                                autocommit=False)
+
+    async def close_pool(self):
+        if self._pool is None:
+            return
+        self._pool.close()
+        await self._pool.wait_closed()
+        self._pool = None
+
+    async def execute(self, sql, args=None, commit=False, **kwargs):
+        """
+        Execute a sql, it could be with args and with out args. Behaves like PooledQueryExecutor.execute.
+        :param sql: sql clause
+        :param args: args need by sql clause
+        :param commit: whether to commit
+        :return: if commit, return None, else, return result
+        """
+        get_id = kwargs.get('get_id', False)
+        get_dict = kwargs.get('get_dict', False)
+
+        async with self._pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    if args:
+                        if type(args) != tuple:
+                            args = (args,)
+                        await cursor.execute(sql, args)
+                    else:
+                        await cursor.execute(sql)
+                    if commit is True:
+                        affected_rows = cursor.rowcount
+                        await conn.commit()
+                        if get_id:
+                            return cursor.lastrowid
+                        else:
+                            return affected_rows
+                    else:
+                        res = await cursor.fetchall()
+                        if get_dict:
+                            return self._convert_to_dict([column[0] for column in cursor.description], res)
+                        return res
+                except aiomysql.Error as err:
+                    logger.error("Failed executing query: {}, error: {}", str(sql), str(err))
+                    logger.debug(sql)
+                    logger.debug(args)
+                    return None
+                except Exception as e:
+                    logger.error("Unspecified exception in dbWrapper: {}", str(e))
+                    return None
+
+    async def executemany(self, sql, args, commit=False):
+        """
+        Execute with many args. Behaves like PooledQueryExecutor.executemany.
+        :param sql: sql clause
+        :param args: args
+        :param commit: commit or not.
+        :return: if commit, return None, else, return result
+        """
+        async with self._pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.executemany(sql, args)
+
+                    if commit is True:
+                        await conn.commit()
+                        return None
+                    else:
+                        res = await cursor.fetchall()
+                        return res
+                except aiomysql.Error as err:
+                    logger.error("Failed executing query: {}", str(err))
+                    return None
+                except Exception as e:
+                    logger.error("Unspecified exception in dbWrapper: {}", str(e))
+                    return None
+
+    async def autofetch_all(self, sql, args=()):
+        """ Fetch all data and have it returned as a dictionary """
+        return await self.execute(sql, args=args, get_dict=True, raise_exc=True)
+
+    async def autofetch_value(self, sql, args=()):
+        """ Fetch the first value from the first row """
+        data = await self.execute(sql, args=args, raise_exc=True)
+        if not data or len(data) == 0:
+            return None
+        return data[0][0]
+
+    async def autofetch_row(self, sql, args=()):
+        """ Fetch the first row and have it return as a dictionary """
+        data = await self.execute(sql, args=args, get_dict=True, raise_exc=True)
+        if not data or len(data) == 0:
+            return data
+        return data[0]
+
+    async def autofetch_column(self, sql, args=None):
+        """ get one field for 0, 1, or more rows in a query and return the result in a list
+        """
+        data = await self.execute(sql, args=args, raise_exc=True)
+        returned_vals = []
+        for row in data:
+            returned_vals.append(row[0])
+        return returned_vals
+
+    async def autoexec_delete(self, table, keyvals, literals=[], where_append=[]):
+        """ Performs a delete, see PooledQueryExecutor.autoexec_delete """
+        query, args = self._build_delete_query(table, keyvals, literals, where_append)
+        await self.execute(query, args=args, commit=True, raise_exc=True)
+
+    async def autoexec_insert(self, table, keyvals, literals=[], optype="INSERT"):
+        """ Auto-inserts into a table, see PooledQueryExecutor.autoexec_insert
+        Returns (int):
+            Primary key for the row
+        """
+        query, args = self._build_insert_query(table, keyvals, literals, optype)
+        return await self.execute(query, args=args, commit=True, get_id=True, raise_exc=True)
+
+    async def autoexec_update(self, table, set_keyvals, set_literals=[], where_keyvals={}, where_literals=[]):
+        """ Auto-updates a table, see PooledQueryExecutor.autoexec_update """
+        query, args = self._build_update_query(table, set_keyvals, set_literals, where_keyvals, where_literals)
+        await self.execute(query, args=args, commit=True, raise_exc=True)
@@ -8,7 +8,11 @@ from utils.logging import logger
 
 class DbFactory:
     @staticmethod
-    def get_wrapper(args) -> (DbWrapper, SyncManager):
+    def get_wrapper(args, webhook_change_feed=None) -> (DbWrapper, SyncManager):
+        """
+        :param webhook_change_feed: WebhookChangeFeed the keys of the entities written by proto submissions are
+        published to, None if the webhook worker polls the DB
+        """
         if args.db_method == "monocle":
             logger.error(
                 "MAD has dropped Monocle support. Please consider checking out the "
@@ -25,6 +29,6 @@ class DbFactory:
         db_exec = db_pool_manager.PooledQueryExecutor(host=args.dbip, port=args.dbport,
                                                       username=args.dbusername, password=args.dbpassword,
                                                       database=args.dbname, poolsize=args.db_poolsize)
-        db_wrapper = DbWrapper(db_exec=db_exec, args=args)
+        db_wrapper = DbWrapper(db_exec=db_exec, args=args, webhook_change_feed=webhook_change_feed)
 
         return db_wrapper, db_pool_manager
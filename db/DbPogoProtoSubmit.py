@@ -1,7 +1,8 @@
 import time
 import json
+import random
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from bitstring import BitArray
 
 from utils.logging import logger
@@ -18,10 +19,24 @@ class DbPogoProtoSubmit:
     moved outside the db package.
     """
     default_spawndef = 240
+    # seconds a known calc_endminsec of a spawnpoint is used before it is read from the DB again
+    spawn_endtime_ttl = 1800
+    # seconds a spawnpoint without a known calc_endminsec is not looked up in the DB again
+    spawn_endtime_miss_ttl = 60
 
-    def __init__(self, db_exec: PooledQueryExecutor, lure_duration: int):
+    def __init__(self, db_exec: PooledQueryExecutor, lure_duration: int, change_feed=None):
         self._db_exec: PooledQueryExecutor = db_exec
         self._lure_duration: int = lure_duration
+        # WebhookChangeFeed the keys of written entities are published to, None if the webhook polls the DB
+        self._change_feed = change_feed
+        # change type -> keys written since the last publish
+        self._pending_changes: Dict[str, set] = {}
+        # spawnpoint -> (calc_endminsec or None if unknown, expiration timestamp)
+        self._spawn_endtimes: Dict[int, Tuple[Optional[str], float]] = {}
+        self._spawn_endtimes_preloaded: bool = False
+        self._spawn_endtimes_next_purge: float = 0
+        # spawnpoint -> calc_endminsec written by the statements built since the last commit
+        self._pending_endtimes: Dict[int, str] = {}
 
 
     def mons(self, origin: str, map_proto: dict, mon_ids_iv: Optional[List[int]], mitm_mapper):
@@ -29,63 +44,11 @@ class DbPogoProtoSubmit:
         Update/Insert mons from a map_proto dict
         """
         logger.debug("DbPogoProtoSubmit::mons called with data received from {}", str(origin))
-        cells = map_proto.get("cells", None)
-        if cells is None:
+        statements = self._mons_statements(origin, map_proto, mitm_mapper)
+        if statements is None:
             return False
 
-        query_mons = (
-            "INSERT INTO pokemon (encounter_id, spawnpoint_id, pokemon_id, latitude, longitude, disappear_time, "
-            "individual_attack, individual_defense, individual_stamina, move_1, move_2, cp, cp_multiplier, "
-            "weight, height, gender, catch_prob_1, catch_prob_2, catch_prob_3, rating_attack, rating_defense, "
-            "weather_boosted_condition, last_modified, costume, form) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
-            "%s, %s, %s, %s, %s) "
-            "ON DUPLICATE KEY UPDATE last_modified=VALUES(last_modified), disappear_time=VALUES(disappear_time)"
-        )
-
-        mon_args = []
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
-                lat = wild_mon["latitude"]
-                lon = wild_mon["longitude"]
-                mon_id = wild_mon["pokemon_data"]["id"]
-                encounter_id = wild_mon["encounter_id"]
-
-                if encounter_id < 0:
-                    encounter_id = encounter_id + 2**64
-
-                mitm_mapper.collect_mon_stats(origin, str(encounter_id))
-
-                now = datetime.utcfromtimestamp(time.time()).strftime("%Y-%m-%d %H:%M:%S")
-
-                # get known spawn end time and feed into despawn time calculation
-                getdetspawntime = self._get_detected_endtime(str(spawnid))
-                despawn_time_unix = gen_despawn_timestamp(getdetspawntime)
-                despawn_time = datetime.utcfromtimestamp(despawn_time_unix).strftime("%Y-%m-%d %H:%M:%S")
-
-                if getdetspawntime is None:
-                    logger.debug("{}: adding mon (#{}) at {}, {}. Despawns at {} (init) ({})",
-                                 str(origin), mon_id, lat, lon, despawn_time, spawnid)
-                else:
-                    logger.debug("{}: adding mon (#{}) at {}, {}. Despawns at {} (non-init) ({})",
-                                 str(origin), mon_id, lat, lon, despawn_time, spawnid)
-
-                mon_args.append(
-                    (
-                        encounter_id, spawnid, mon_id, lat, lon,
-                        despawn_time,
-                        # TODO: consider .get("XXX", None)
-                        None, None, None, None, None, None, None, None, None,
-                        wild_mon["pokemon_data"]["display"]["gender_value"],
-                        None, None, None, None, None,
-                        wild_mon["pokemon_data"]["display"]["weather_boosted_value"],
-                        now, wild_mon["pokemon_data"]["display"]["costume_value"],
-                        wild_mon["pokemon_data"]["display"]["form_value"]
-                    )
-                )
-
-        self._db_exec.executemany(query_mons, mon_args, commit=True)
+        self._execute_statements(statements)
         return True
 
 
@@ -198,7 +161,10 @@ class DbPogoProtoSubmit:
             form
         )
 
-        self._db_exec.execute(query, vals, commit=True)
+        self._record_changes("pokemon", [encounter_id])
+        pending = self._take_pending()
+        if self._db_exec.execute(query, vals, commit=True) is not None:
+            self._on_committed(pending)
         logger.debug("Done updating mon in DB")
         return True
 
@@ -206,75 +172,11 @@ class DbPogoProtoSubmit:
     def spawnpoints(self, origin: str, map_proto: dict):
         logger.debug(
             "DbPogoProtoSubmit::spawnpoints called with data received by {}", str(origin))
-        cells = map_proto.get("cells", None)
-        if cells is None:
+        statements = self._spawnpoints_statements(map_proto)
+        if statements is None:
             return False
-        spawnpoint_args, spawnpoint_args_unseen = [], []
-        spawn_ids = []
 
-        query_spawnpoints = (
-            "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, "
-            "last_scanned, spawndef, calc_endminsec) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s) "
-            "ON DUPLICATE KEY UPDATE last_scanned=VALUES(last_scanned), "
-            "earliest_unseen=LEAST(earliest_unseen, VALUES(earliest_unseen)), "
-            "spawndef=VALUES(spawndef), calc_endminsec=VALUES(calc_endminsec)"
-        )
-
-        query_spawnpoints_unseen = (
-            "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, last_non_scanned, spawndef) "
-            "VALUES (%s, %s, %s, %s, %s, %s) "
-            "ON DUPLICATE KEY UPDATE spawndef=VALUES(spawndef), last_non_scanned=VALUES(last_non_scanned)"
-        )
-
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        dt = datetime.now()
-
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawn_ids.append(int(str(wild_mon['spawnpoint_id']), 16))
-
-        spawndef = self._get_spawndef(spawn_ids)
-
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
-                lat, lng, alt = S2Helper.get_position_from_cell(
-                    int(str(wild_mon["spawnpoint_id"]) + "00000", 16))
-                despawntime = wild_mon["time_till_hidden"]
-
-                minpos = self._get_current_spawndef_pos()
-                # TODO: retrieve the spawndefs by a single executemany and pass that...
-
-                spawndef_ = spawndef.get(spawnid, False)
-                if spawndef_:
-                    newspawndef = self._set_spawn_see_minutesgroup(spawndef_, minpos)
-                else:
-                    newspawndef = self._set_spawn_see_minutesgroup(self.default_spawndef, minpos)
-
-                last_scanned = None
-                last_non_scanned = None
-
-                if 0 <= int(despawntime) <= 90000:
-                    fulldate = dt + timedelta(milliseconds=despawntime)
-                    earliest_unseen = int(despawntime)
-                    last_scanned = now
-                    calcendtime = fulldate.strftime("%M:%S")
-
-                    spawnpoint_args.append(
-                        (spawnid, lat, lng, earliest_unseen, last_scanned, newspawndef, calcendtime)
-                    )
-                else:
-                    earliest_unseen = 99999999
-                    last_non_scanned = now
-
-                    spawnpoint_args_unseen.append(
-                        (spawnid, lat, lng, earliest_unseen, last_non_scanned, newspawndef)
-                    )
-
-        self._db_exec.executemany(query_spawnpoints, spawnpoint_args, commit=True)
-        self._db_exec.executemany(query_spawnpoints_unseen,
-                                  spawnpoint_args_unseen, commit=True)
+        self._execute_statements(statements)
 
 
     def stops(self, origin: str, map_proto: dict):
@@ -282,28 +184,11 @@ class DbPogoProtoSubmit:
         Update/Insert pokestops from a map_proto dict
         """
         logger.debug("DbPogoProtoSubmit::stops called with data received from {}", str(origin))
-        cells = map_proto.get("cells", None)
-        if cells is None:
+        statements = self._stops_statements(map_proto)
+        if statements is None:
             return False
 
-        query_stops = (
-            "INSERT INTO pokestop (pokestop_id, enabled, latitude, longitude, last_modified, lure_expiration, "
-            "last_updated, active_fort_modifier, incident_start, incident_expiration, incident_grunt_type) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
-            "ON DUPLICATE KEY UPDATE last_updated=VALUES(last_updated), lure_expiration=VALUES(lure_expiration), "
-            "last_modified=VALUES(last_modified), latitude=VALUES(latitude), longitude=VALUES(longitude), "
-            "active_fort_modifier=VALUES(active_fort_modifier), incident_start=VALUES(incident_start), "
-            "incident_expiration=VALUES(incident_expiration), incident_grunt_type=VALUES(incident_grunt_type)"
-        )
-
-        stops_args = []
-        for cell in cells:
-            for fort in cell["forts"]:
-                if fort["type"] == 1:
-                    stops_args.append(
-                        self._extract_args_single_stop(fort))
-
-        self._db_exec.executemany(query_stops, stops_args, commit=True)
+        self._execute_statements(statements)
         return True
 
 
@@ -326,7 +211,10 @@ class DbPogoProtoSubmit:
         stop_args = self._extract_args_single_stop_details(stop_proto)
 
         if stop_args is not None:
-            self._db_exec.execute(query_stops, stop_args, commit=True)
+            self._record_changes("pokestop", [stop_args[0]])
+            pending = self._take_pending()
+            if self._db_exec.execute(query_stops, stop_args, commit=True) is not None:
+                self._on_committed(pending)
         return True
 
 
@@ -380,7 +268,10 @@ class DbPogoProtoSubmit:
         )
         logger.debug("DbPogoProtoSubmit::quest submitted quest typ {} at stop {}",
                      str(quest_type), str(fort_id))
-        self._db_exec.execute(query_quests, vals, commit=True)
+        self._record_changes("quest", [fort_id])
+        pending = self._take_pending()
+        if self._db_exec.execute(query_quests, vals, commit=True) is not None:
+            self._on_committed(pending)
 
         return True
 
@@ -390,9 +281,347 @@ class DbPogoProtoSubmit:
         Update/Insert gyms from a map_proto dict
         """
         logger.debug("DbPogoProtoSubmit::gyms called with data received from {}", str(origin))
+        statements = self._gyms_statements(map_proto)
+        if statements is None:
+            return False
+
+        self._execute_statements(statements)
+        logger.debug("{}: submit_gyms done", str(origin))
+        return True
+
+
+    def gym(self, origin: str, map_proto: dict):
+        """
+        Update gyms from a map_proto dict
+        """
+        logger.debug("Updating gym sent by {}", str(origin))
+        if map_proto.get("result", 0) != 1:
+            return False
+        status = map_proto.get("gym_status_and_defenders", None)
+        if status is None:
+            return False
+        fort_proto = status.get("pokemon_fort_proto", None)
+        if fort_proto is None:
+            return False
+        gym_id = fort_proto["id"]
+        name = map_proto["name"]
+        description = map_proto["description"]
+        url = map_proto["url"]
+
+        set_keys = []
+        vals = []
+
+        if name is not None and name != "":
+            set_keys.append("name=%s")
+            vals.append(name)
+        if description is not None and description != "":
+            set_keys.append("description=%s")
+            vals.append(description)
+        if url is not None and url != "":
+            set_keys.append("url=%s")
+            vals.append(url)
+
+        if len(set_keys) == 0:
+            return False
+
+        query = "UPDATE gymdetails SET " + ",".join(set_keys) + " WHERE gym_id = %s"
+        vals.append(gym_id)
+
+        self._db_exec.execute((query), tuple(vals), commit=True)
+
+        return True
+
+
+    def raids(self, origin: str, map_proto: dict, mitm_mapper):
+        """
+        Update/Insert raids from a map_proto dict
+        """
+        logger.debug(
+            "DbPogoProtoSubmit::raids called with data received from {}", str(origin))
+        statements = self._raids_statements(origin, map_proto, mitm_mapper)
+        if statements is None:
+            return False
+
+        self._execute_statements(statements)
+        logger.debug(
+            "DbPogoProtoSubmit::raids: Done submitting raids with data received from {}", str(origin))
+        return True
+
+
+    def weather(self, origin, map_proto, received_timestamp):
+        """
+        Update/Insert weather from a map_proto dict
+        """
+        logger.debug("DbPogoProtoSubmit::weather called with data received from {}", str(origin))
+        statements = self._weather_statements(map_proto, received_timestamp)
+        if statements is None:
+            return False
+
+        self._execute_statements(statements)
+        return True
+
+
+    def cells(self, origin: str, map_proto: dict):
+        self._execute_statements(self._cells_statements(map_proto))
+
+
+    def gmos(self, gmos: List[tuple], mitm_mapper, with_weather: bool = False):
+        """
+        Update/Insert the content of several GMOs at once. The rows of all GMOs are merged per table and
+        written by a single executemany per table within one transaction. If that transaction fails, every
+        GMO is written by a transaction of its own instead.
+        :param gmos: list of (origin, map_proto, received_timestamp) tuples
+        :param mitm_mapper: MitmMapper or PlayerStatsAggregator collecting the stats of mons and raids
+        :param with_weather: whether weather is to be submitted as well
+        :return: whether the content of all GMOs has been written
+        """
+        logger.debug("DbPogoProtoSubmit::gmos called with {} GMOs", len(gmos))
+        # statements of each GMO per table along with the changes they write
+        submissions = []
+        for origin, map_proto, received_timestamp in gmos:
+            gmo_statements = [
+                self._weather_statements(map_proto, received_timestamp) if with_weather else None,
+                self._stops_statements(map_proto),
+                self._gyms_statements(map_proto),
+                self._raids_statements(origin, map_proto, mitm_mapper),
+                self._spawnpoints_statements(map_proto),
+                self._mons_statements(origin, map_proto, mitm_mapper),
+                self._cells_statements(map_proto)
+            ]
+            submissions.append((gmo_statements, self._take_pending()))
+
+        # merged per table in the same order for all batches to have the rows locked in a consistent order
+        merged = {}
+        for table in range(len(submissions[0][0]) if submissions else 0):
+            for gmo_statements, _ in submissions:
+                for query, args in gmo_statements[table] or []:
+                    merged.setdefault(query, []).extend(args)
+
+        statements = [(query, args) for query, args in merged.items() if args]
+        if not statements:
+            return True
+        if self._db_exec.executemany_transaction(statements):
+            for _, pending in submissions:
+                self._on_committed(pending)
+            logger.debug("DbPogoProtoSubmit::gmos: Done submitting {} GMOs", len(gmos))
+            return True
+
+        if len(submissions) == 1:
+            return False
+        logger.warning("Failed submitting {} GMOs at once, submitting them one by one", len(gmos))
+        committed = True
+        for gmo_statements, pending in submissions:
+            statements = [(query, args) for table_statements in gmo_statements if table_statements
+                          for query, args in table_statements if args]
+            if not statements:
+                continue
+            if self._db_exec.executemany_transaction(statements):
+                self._on_committed(pending)
+            else:
+                committed = False
+        return committed
+
+
+    def _execute_statements(self, statements):
+        pending = self._take_pending()
+        statements = [(query, args) for query, args in statements if args]
+        if not statements or self._db_exec.executemany_transaction(statements):
+            self._on_committed(pending)
+
+
+    def _record_changes(self, change_type: str, keys):
+        if self._change_feed is not None:
+            self._pending_changes.setdefault(change_type, set()).update(keys)
+
+
+    def _take_pending(self) -> Tuple[Dict[str, set], Dict[int, str]]:
+        """
+        Changes and spawnpoint endtimes recorded by the statements built since the last call, to be passed to
+        _on_committed once the statements have been committed
+        """
+        pending = (self._pending_changes, self._pending_endtimes)
+        self._pending_changes = {}
+        self._pending_endtimes = {}
+        return pending
+
+
+    def _on_committed(self, pending: Tuple[Dict[str, set], Dict[int, str]]):
+        changes, endtimes = pending
+        for spawn_id, calc_endminsec in endtimes.items():
+            self._update_detected_endtime(spawn_id, calc_endminsec)
+        if self._change_feed is None or not changes:
+            return
+        self._change_feed.publish(changes)
+
+
+    def _mons_statements(self, origin: str, map_proto: dict, mitm_mapper):
         cells = map_proto.get("cells", None)
         if cells is None:
-            return False
+            return None
+
+        query_mons = (
+            "INSERT INTO pokemon (encounter_id, spawnpoint_id, pokemon_id, latitude, longitude, disappear_time, "
+            "individual_attack, individual_defense, individual_stamina, move_1, move_2, cp, cp_multiplier, "
+            "weight, height, gender, catch_prob_1, catch_prob_2, catch_prob_3, rating_attack, rating_defense, "
+            "weather_boosted_condition, last_modified, costume, form) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, "
+            "%s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE last_modified=VALUES(last_modified), disappear_time=VALUES(disappear_time)"
+        )
+
+        spawn_ids = []
+        for cell in cells:
+            for wild_mon in cell["wild_pokemon"]:
+                spawn_ids.append(int(str(wild_mon["spawnpoint_id"]), 16))
+        detected_endtimes = self._get_detected_endtimes(spawn_ids)
+
+        mon_args = []
+        for cell in cells:
+            for wild_mon in cell["wild_pokemon"]:
+                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
+                lat = wild_mon["latitude"]
+                lon = wild_mon["longitude"]
+                mon_id = wild_mon["pokemon_data"]["id"]
+                encounter_id = wild_mon["encounter_id"]
+
+                if encounter_id < 0:
+                    encounter_id = encounter_id + 2**64
+
+                mitm_mapper.collect_mon_stats(origin, str(encounter_id))
+
+                now = datetime.utcfromtimestamp(time.time()).strftime("%Y-%m-%d %H:%M:%S")
+
+                # get known spawn end time and feed into despawn time calculation
+                getdetspawntime = detected_endtimes.get(spawnid, False)
+                despawn_time_unix = gen_despawn_timestamp(getdetspawntime)
+                despawn_time = datetime.utcfromtimestamp(despawn_time_unix).strftime("%Y-%m-%d %H:%M:%S")
+
+                if getdetspawntime is None:
+                    logger.debug("{}: adding mon (#{}) at {}, {}. Despawns at {} (init) ({})",
+                                 str(origin), mon_id, lat, lon, despawn_time, spawnid)
+                else:
+                    logger.debug("{}: adding mon (#{}) at {}, {}. Despawns at {} (non-init) ({})",
+                                 str(origin), mon_id, lat, lon, despawn_time, spawnid)
+
+                mon_args.append(
+                    (
+                        encounter_id, spawnid, mon_id, lat, lon,
+                        despawn_time,
+                        # TODO: consider .get("XXX", None)
+                        None, None, None, None, None, None, None, None, None,
+                        wild_mon["pokemon_data"]["display"]["gender_value"],
+                        None, None, None, None, None,
+                        wild_mon["pokemon_data"]["display"]["weather_boosted_value"],
+                        now, wild_mon["pokemon_data"]["display"]["costume_value"],
+                        wild_mon["pokemon_data"]["display"]["form_value"]
+                    )
+                )
+
+        self._record_changes("pokemon", [args[0] for args in mon_args])
+        return [(query_mons, mon_args)]
+
+
+    def _spawnpoints_statements(self, map_proto: dict):
+        cells = map_proto.get("cells", None)
+        if cells is None:
+            return None
+        spawnpoint_args, spawnpoint_args_unseen = [], []
+        spawn_ids = []
+
+        query_spawnpoints = (
+            "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, "
+            "last_scanned, spawndef, calc_endminsec) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE last_scanned=VALUES(last_scanned), "
+            "earliest_unseen=LEAST(earliest_unseen, VALUES(earliest_unseen)), "
+            "spawndef=VALUES(spawndef), calc_endminsec=VALUES(calc_endminsec)"
+        )
+
+        query_spawnpoints_unseen = (
+            "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, last_non_scanned, spawndef) "
+            "VALUES (%s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE spawndef=VALUES(spawndef), last_non_scanned=VALUES(last_non_scanned)"
+        )
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        dt = datetime.now()
+
+        for cell in cells:
+            for wild_mon in cell["wild_pokemon"]:
+                spawn_ids.append(int(str(wild_mon['spawnpoint_id']), 16))
+
+        spawndef = self._get_spawndef(spawn_ids)
+
+        for cell in cells:
+            for wild_mon in cell["wild_pokemon"]:
+                spawnid = int(str(wild_mon["spawnpoint_id"]), 16)
+                lat, lng, alt = S2Helper.get_position_from_cell(
+                    int(str(wild_mon["spawnpoint_id"]) + "00000", 16))
+                despawntime = wild_mon["time_till_hidden"]
+
+                minpos = self._get_current_spawndef_pos()
+                # TODO: retrieve the spawndefs by a single executemany and pass that...
+
+                spawndef_ = spawndef.get(spawnid, False)
+                if spawndef_:
+                    newspawndef = self._set_spawn_see_minutesgroup(spawndef_, minpos)
+                else:
+                    newspawndef = self._set_spawn_see_minutesgroup(self.default_spawndef, minpos)
+
+                last_scanned = None
+                last_non_scanned = None
+
+                if 0 <= int(despawntime) <= 90000:
+                    fulldate = dt + timedelta(milliseconds=despawntime)
+                    earliest_unseen = int(despawntime)
+                    last_scanned = now
+                    calcendtime = fulldate.strftime("%M:%S")
+
+                    spawnpoint_args.append(
+                        (spawnid, lat, lng, earliest_unseen, last_scanned, newspawndef, calcendtime)
+                    )
+                    self._pending_endtimes[spawnid] = calcendtime
+                else:
+                    earliest_unseen = 99999999
+                    last_non_scanned = now
+
+                    spawnpoint_args_unseen.append(
+                        (spawnid, lat, lng, earliest_unseen, last_non_scanned, newspawndef)
+                    )
+
+        return [(query_spawnpoints, spawnpoint_args), (query_spawnpoints_unseen, spawnpoint_args_unseen)]
+
+
+    def _stops_statements(self, map_proto: dict):
+        cells = map_proto.get("cells", None)
+        if cells is None:
+            return None
+
+        query_stops = (
+            "INSERT INTO pokestop (pokestop_id, enabled, latitude, longitude, last_modified, lure_expiration, "
+            "last_updated, active_fort_modifier, incident_start, incident_expiration, incident_grunt_type) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE last_updated=VALUES(last_updated), lure_expiration=VALUES(lure_expiration), "
+            "last_modified=VALUES(last_modified), latitude=VALUES(latitude), longitude=VALUES(longitude), "
+            "active_fort_modifier=VALUES(active_fort_modifier), incident_start=VALUES(incident_start), "
+            "incident_expiration=VALUES(incident_expiration), incident_grunt_type=VALUES(incident_grunt_type)"
+        )
+
+        stops_args = []
+        for cell in cells:
+            for fort in cell["forts"]:
+                if fort["type"] == 1:
+                    stops_args.append(
+                        self._extract_args_single_stop(fort))
+
+        self._record_changes("pokestop", [args[0] for args in stops_args if args is not None])
+        return [(query_stops, stops_args)]
+
+
+    def _gyms_statements(self, map_proto: dict):
+        cells = map_proto.get("cells", None)
+        if cells is None:
+            return None
         gym_args = []
         gym_details_args = []
         now = datetime.utcfromtimestamp(
@@ -445,63 +674,14 @@ class DbPogoProtoSubmit:
                     gym_details_args.append(
                         (gym["id"], "unknown", gym["image_url"], now)
                     )
-        self._db_exec.executemany(query_gym, gym_args, commit=True)
-        self._db_exec.executemany(query_gym_details, gym_details_args, commit=True)
-        logger.debug("{}: submit_gyms done", str(origin))
-        return True
-
-
-    def gym(self, origin: str, map_proto: dict):
-        """
-        Update gyms from a map_proto dict
-        """
-        logger.debug("Updating gym sent by {}", str(origin))
-        if map_proto.get("result", 0) != 1:
-            return False
-        status = map_proto.get("gym_status_and_defenders", None)
-        if status is None:
-            return False
-        fort_proto = status.get("pokemon_fort_proto", None)
-        if fort_proto is None:
-            return False
-        gym_id = fort_proto["id"]
-        name = map_proto["name"]
-        description = map_proto["description"]
-        url = map_proto["url"]
+        self._record_changes("gym", [args[0] for args in gym_args])
+        return [(query_gym, gym_args), (query_gym_details, gym_details_args)]
 
-        set_keys = []
-        vals = []
 
-        if name is not None and name != "":
-            set_keys.append("name=%s")
-            vals.append(name)
-        if description is not None and description != "":
-            set_keys.append("description=%s")
-            vals.append(description)
-        if url is not None and url != "":
-            set_keys.append("url=%s")
-            vals.append(url)
-
-        if len(set_keys) == 0:
-            return False
-
-        query = "UPDATE gymdetails SET " + ",".join(set_keys) + " WHERE gym_id = %s"
-        vals.append(gym_id)
-
-        self._db_exec.execute((query), tuple(vals), commit=True)
-
-        return True
-
-
-    def raids(self, origin: str, map_proto: dict, mitm_mapper):
-        """
-        Update/Insert raids from a map_proto dict
-        """
-        logger.debug(
-            "DbPogoProtoSubmit::raids called with data received from {}", str(origin))
+    def _raids_statements(self, origin: str, map_proto: dict, mitm_mapper):
         cells = map_proto.get("cells", None)
         if cells is None:
-            return False
+            return None
         raid_args = []
         now = datetime.utcfromtimestamp(time.time()).strftime("%Y-%m-%d %H:%M:%S")
 
@@ -566,20 +746,14 @@ class DbPogoProtoSubmit:
                             gender
                         )
                     )
-        self._db_exec.executemany(query_raid, raid_args, commit=True)
-        logger.debug(
-            "DbPogoProtoSubmit::raids: Done submitting raids with data received from {}", str(origin))
-        return True
+        self._record_changes("raid", [args[0] for args in raid_args])
+        return [(query_raid, raid_args)]
 
 
-    def weather(self, origin, map_proto, received_timestamp):
-        """
-        Update/Insert weather from a map_proto dict
-        """
-        logger.debug("DbPogoProtoSubmit::weather called with data received from {}", str(origin))
+    def _weather_statements(self, map_proto: dict, received_timestamp):
         cells = map_proto.get("cells", None)
         if cells is None:
-            return False
+            return None
 
         query_weather = (
             "INSERT INTO weather (s2_cell_id, latitude, longitude, cloud_level, rain_level, wind_level, "
@@ -596,15 +770,14 @@ class DbPogoProtoSubmit:
         for client_weather in map_proto["client_weather"]:
             # lat, lng, alt = S2Helper.get_position_from_cell(weather_extract["cell_id"])
             time_of_day = map_proto.get("time_of_day_value", 0)
-            list_of_weather_args.append(
-                self._extract_args_single_weather(
-                    client_weather, time_of_day, received_timestamp)
-            )
-        self._db_exec.executemany(query_weather, list_of_weather_args, commit=True)
-        return True
+            weather_args = self._extract_args_single_weather(client_weather, time_of_day, received_timestamp)
+            if weather_args is not None:
+                list_of_weather_args.append(weather_args)
+        self._record_changes("weather", [args[0] for args in list_of_weather_args])
+        return [(query_weather, list_of_weather_args)]
 
 
-    def cells(self, origin: str, map_proto: dict):
+    def _cells_statements(self, map_proto: dict):
         protocells = map_proto.get("cells", [])
 
         query = (
@@ -624,7 +797,7 @@ class DbPogoProtoSubmit:
 
             cells.append((cell_id, 15, lat, lng, cell["current_timestamp"] / 1000))
 
-        self._db_exec.executemany(query, cells, commit=True)
+        return [(query, cells)]
 
 
     def _extract_args_single_stop(self, stop_data):
@@ -720,22 +893,89 @@ class DbPogoProtoSubmit:
 
     def _get_detected_endtime(self, spawn_id):
         logger.debug("DbPogoProtoSubmit::_get_detected_endtime called")
+        return self._get_detected_endtimes([int(spawn_id)]).get(int(spawn_id), False)
+
+
+    def _get_detected_endtimes(self, spawn_ids) -> Dict[int, str]:
+        """
+        Retrieve the known calc_endminsec of the given spawnpoints. Endtimes of statements not committed yet
+        and cached values are used as long as they did not expire, all other spawnpoints are read from the DB
+        with a single query.
+        :param spawn_ids: list of spawnpoint IDs
+        :return: dict of spawnpoint ID -> calc_endminsec for every spawnpoint with a known endtime
+        """
+        if not self._spawn_endtimes_preloaded:
+            self._preload_detected_endtimes()
+
+        now = time.time()
+        if now >= self._spawn_endtimes_next_purge:
+            self._purge_detected_endtimes(now)
+        endtimes = {}
+        missing = []
+        for spawn_id in set(spawn_ids):
+            pending = self._pending_endtimes.get(spawn_id, None)
+            cached = self._spawn_endtimes.get(spawn_id, None)
+            if pending is not None:
+                endtimes[spawn_id] = pending
+            elif cached is not None and cached[1] > now:
+                if cached[0] is not None:
+                    endtimes[spawn_id] = cached[0]
+            else:
+                missing.append(spawn_id)
+
+        if not missing:
+            return endtimes
+        logger.debug("DbPogoProtoSubmit::_get_detected_endtimes retrieving {} spawnpoints", len(missing))
 
         query = (
-            "SELECT calc_endminsec "
+            "SELECT spawnpoint, calc_endminsec "
             "FROM trs_spawn "
-            "WHERE spawnpoint=%s"
+            "WHERE calc_endminsec IS NOT NULL AND spawnpoint IN ({})"
         )
-        args = (
-            spawn_id,
+        res = self._db_exec.execute_in_chunks(query, missing)
+        if res is None:
+            return endtimes
+        for spawnpoint, calc_endminsec in res:
+            self._update_detected_endtime(int(spawnpoint), str(calc_endminsec))
+            endtimes[int(spawnpoint)] = str(calc_endminsec)
+        miss_expiration = now + self.spawn_endtime_miss_ttl
+        for spawn_id in missing:
+            if spawn_id not in endtimes:
+                self._spawn_endtimes[spawn_id] = (None, miss_expiration)
+        return endtimes
+
+
+    def _update_detected_endtime(self, spawn_id: int, calc_endminsec: str):
+        self._spawn_endtimes[spawn_id] = (calc_endminsec, time.time() + self.spawn_endtime_ttl)
+
+
+    def _purge_detected_endtimes(self, now: float):
+        """ Drops the expired endtimes of spawnpoints not looked up since they expired """
+        expired = [spawn_id for spawn_id, (_, expiration) in self._spawn_endtimes.items() if expiration <= now]
+        for spawn_id in expired:
+            del self._spawn_endtimes[spawn_id]
+        self._spawn_endtimes_next_purge = now + self.spawn_endtime_miss_ttl
+        if expired:
+            logger.debug("DbPogoProtoSubmit::_purge_detected_endtimes dropped {} spawnpoints", len(expired))
+
+
+    def _preload_detected_endtimes(self):
+        logger.debug("DbPogoProtoSubmit::_preload_detected_endtimes called")
+        query = (
+            "SELECT spawnpoint, calc_endminsec "
+            "FROM trs_spawn "
+            "WHERE calc_endminsec IS NOT NULL"
         )
-
-        found = self._db_exec.execute(query, args)
-
-        if found and len(found) > 0 and found[0][0]:
-            return str(found[0][0])
-        else:
-            return False
+        res = self._db_exec.execute(query)
+        if res is None:
+            return
+        self._spawn_endtimes_preloaded = True
+        # spread the expiration of the preloaded endtimes for them not to be read from the DB all at once
+        now = time.time()
+        for spawnpoint, calc_endminsec in res:
+            expiration = now + random.uniform(self.spawn_endtime_ttl / 2, self.spawn_endtime_ttl)
+            self._spawn_endtimes[int(spawnpoint)] = (str(calc_endminsec), expiration)
+        logger.info("Preloaded endtimes of {} spawnpoints", len(res))
 
 
     def _get_spawndef(self, spawn_ids):
@@ -743,16 +983,16 @@ class DbPogoProtoSubmit:
             return False
         logger.debug("DbPogoProtoSubmit::_get_spawndef called")
 
-        spawnids = ",".join(map(str, spawn_ids))
         spawnret = {}
 
         query = (
             "SELECT spawnpoint, spawndef "
-            "FROM trs_spawn where spawnpoint in (%s)" % (spawnids)
+            "FROM trs_spawn WHERE spawnpoint IN ({})"
         )
-        # vals = (spawn_id,)
 
-        res = self._db_exec.execute(query)
+        res = self._db_exec.execute_in_chunks(query, spawn_ids)
+        if res is None:
+            return spawnret
         for row in res:
             spawnret[int(row[0])] = row[1]
         return spawnret
@@ -58,7 +58,7 @@ class DbStatsReader:
         query = (
                 "SELECT count(*), pokemon_id, form, gender, costume FROM pokemon WHERE individual_attack IS NOT NULL "
         )
-        query = query + "AND pokemon_id IN(" + ",".join(map(str, mon_id_list)) + ") "
+        query = query + "AND pokemon_id IN({}) "
         if timestamp_from:
             query = query + " AND UNIX_TIMESTAMP(last_modified) > %s "
             data = data + (timestamp_from,)
@@ -67,7 +67,8 @@ class DbStatsReader:
             data = data + (timestamp_to,)
         query = query + "GROUP BY pokemon_id, form"
         logger.debug('Final query for shiny_stats_global_v2: {}', query)
-        res = self._db_exec.execute(query, data)
+        # results are grouped by pokemon_id, the chunks of the IN list therefore never share a group
+        res = self._db_exec.execute_in_chunks(query, mon_id_list, args=data)
         return res
 
 
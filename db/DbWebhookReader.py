@@ -13,7 +13,23 @@ class DbWebhookReader:
         self._db_wrapper = db_wrapper # type: db.DbWrapper
 
 
+    def __execute(self, query, args, ids):
+        # queries of changed elements by their keys contain an IN list, which is filled chunk by chunk
+        if ids is None:
+            return self._db_exec.execute(query, args)
+        return self._db_exec.execute_in_chunks(query, ids, args=args)
+
+
     def get_raids_changed_since(self, timestamp):
+        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__get_raids("raid.last_scanned >= %s", (tsdt, ))
+
+
+    def get_raids_by_gym_ids(self, gym_ids):
+        return self.__get_raids("raid.gym_id IN ({})", ids=gym_ids)
+
+
+    def __get_raids(self, where, args=(), ids=None):
         query = (
             "SELECT raid.gym_id, raid.level, raid.spawn, raid.start, raid.end, raid.pokemon_id, "
             "raid.cp, raid.move_1, raid.move_2, raid.last_scanned, raid.form, raid.is_exclusive, raid.gender, "
@@ -22,10 +38,9 @@ class DbWebhookReader:
             "FROM raid "
             "LEFT JOIN gymdetails ON gymdetails.gym_id = raid.gym_id "
             "LEFT JOIN gym ON gym.gym_id = raid.gym_id "
-            "WHERE raid.last_scanned >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt, ))
+        res = self.__execute(query, args, ids)
 
         ret = []
         for (gym_id, level, spawn, start, end, pokemon_id,
@@ -58,13 +73,21 @@ class DbWebhookReader:
 
 
     def get_weather_changed_since(self, timestamp):
+        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__get_weather("last_updated >= %s", (tsdt, ))
+
+
+    def get_weather_by_cell_ids(self, s2_cell_ids):
+        return self.__get_weather("s2_cell_id IN ({})", ids=s2_cell_ids)
+
+
+    def __get_weather(self, where, args=(), ids=None):
         query = (
             "SELECT * "
             "FROM weather "
-            "WHERE last_updated >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt, ))
+        res = self.__execute(query, args, ids)
 
         ret = []
         for (s2_cell_id, latitude, longitude, cloud_level, rain_level, wind_level,
@@ -94,16 +117,24 @@ class DbWebhookReader:
 
 
     def get_gyms_changed_since(self, timestamp):
+        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__get_gyms("gym.last_scanned >= %s", (tsdt, ))
+
+
+    def get_gyms_by_ids(self, gym_ids):
+        return self.__get_gyms("gym.gym_id IN ({})", ids=gym_ids)
+
+
+    def __get_gyms(self, where, args=(), ids=None):
         query = (
             "SELECT name, description, url, gym.gym_id, team_id, guard_pokemon_id, slots_available, "
             "latitude, longitude, total_cp, is_in_battle, weather_boosted_condition, "
             "last_modified, gym.last_scanned, gym.is_ex_raid_eligible "
             "FROM gym "
             "LEFT JOIN gymdetails ON gym.gym_id = gymdetails.gym_id "
-            "WHERE gym.last_scanned >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt, ))
+        res = self.__execute(query, args, ids)
 
         ret = []
         for (name, description, url, gym_id, team_id, guard_pokemon_id, slots_available,
@@ -130,15 +161,23 @@ class DbWebhookReader:
 
 
     def get_stops_changed_since(self, timestamp):
+        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__get_stops("last_updated >= %s", (tsdt, ))
+
+
+    def get_stops_by_ids(self, pokestop_ids):
+        return self.__get_stops("pokestop_id IN ({})", ids=pokestop_ids)
+
+
+    def __get_stops(self, where, args=(), ids=None):
         query = (
             "SELECT pokestop_id, latitude, longitude, lure_expiration, name, image, active_fort_modifier, "
             "last_modified, last_updated, incident_start, incident_expiration, incident_grunt_type "
             "FROM pokestop "
-            "WHERE last_updated >= %s AND (DATEDIFF(lure_expiration, '1970-01-01 00:00:00') > 0 OR "
+            "WHERE " + where + " AND (DATEDIFF(lure_expiration, '1970-01-01 00:00:00') > 0 OR "
             "incident_start IS NOT NULL)"
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt, ))
+        res = self.__execute(query, args, ids)
 
         ret = []
         for (pokestop_id, latitude, longitude, lure_expiration, name, image, active_fort_modifier,
@@ -161,6 +200,15 @@ class DbWebhookReader:
 
 
     def get_mon_changed_since(self, timestamp):
+        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        return self.__get_mon("last_modified >= %s", (tsdt, ))
+
+
+    def get_mon_by_encounter_ids(self, encounter_ids):
+        return self.__get_mon("encounter_id IN ({})", ids=encounter_ids)
+
+
+    def __get_mon(self, where, args=(), ids=None):
         query = (
             "SELECT encounter_id, spawnpoint_id, pokemon_id, pokemon.latitude, pokemon.longitude, "
             "disappear_time, individual_attack, individual_defense, individual_stamina, "
@@ -169,10 +217,9 @@ class DbWebhookReader:
             "(trs_spawn.calc_endminsec IS NOT NULL) AS verified "
             "FROM pokemon "
             "INNER JOIN trs_spawn ON pokemon.spawnpoint_id = trs_spawn.spawnpoint "
-            "WHERE last_modified >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt, ))
+        res = self.__execute(query, args, ids)
 
         ret = []
         for (encounter_id, spawnpoint_id, pokemon_id, latitude,
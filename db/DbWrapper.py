@@ -19,8 +19,15 @@ from db.DbStatsReader import DbStatsReader
 from db.DbWebhookReader import DbWebhookReader
 
 
+def _utc_timestamp(value: Optional[datetime]) -> Optional[int]:
+    """ Unix timestamp of a datetime read from the DB, the DB stores UTC """
+    if value is None:
+        return None
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
 class DbWrapper:
-    def __init__(self, db_exec, args):
+    def __init__(self, db_exec, args, webhook_change_feed=None):
         self._db_exec = db_exec
         self.application_args = args
 
@@ -32,7 +39,8 @@ class DbWrapper:
         self.schema_updater.ensure_unversioned_columns_exist()
         self.schema_updater.create_madmin_databases_if_not_exists()
         self.schema_updater.ensure_unversioned_madmin_columns_exist()
-        self.proto_submit: DbPogoProtoSubmit = DbPogoProtoSubmit(db_exec, args.lure_duration)
+        self.proto_submit: DbPogoProtoSubmit = DbPogoProtoSubmit(db_exec, args.lure_duration,
+                                                                 webhook_change_feed)
         self.stats_submit: DbStatsSubmit = DbStatsSubmit(db_exec)
         self.stats_reader: DbStatsReader = DbStatsReader(db_exec)
         self.webhook_reader: DbWebhookReader = DbWebhookReader(db_exec, self)
@@ -48,6 +56,10 @@ class DbWrapper:
     def executemany(self, sql, args, commit=False):
         return self._db_exec.executemany(sql, args, commit)
 
+    def execute_in_chunks(self, sql, values, args=(), chunk_size=100, prepared=False, get_dict=False):
+        return self._db_exec.execute_in_chunks(sql, values, args=args, chunk_size=chunk_size, prepared=prepared,
+                                               get_dict=get_dict)
+
     def autofetch_all(self, sql, args=()):
         """ Fetch all data and have it returned as a dictionary """
         return self._db_exec.autofetch_all(sql, args=args)
@@ -357,6 +369,12 @@ class DbWrapper:
             logger.warning("DbWrapper::get_to_be_encountered: Not returning any encounters since no time left or "
                            "eligible mon IDs specified")
             return []
+        # position of every mon ID in the priority list, the first occurrence counts
+        mon_ranks = {}
+        for rank, mon_id in enumerate(eligible_mon_ids):
+            mon_ranks.setdefault(mon_id, rank)
+        if not mon_ranks:
+            return []
         logger.debug("Getting mons to be encountered")
         query = (
             "SELECT latitude, longitude, encounter_id, spawnpoint_id, pokemon_id, "
@@ -364,40 +382,39 @@ class DbWrapper:
             "FROM pokemon "
             "WHERE individual_attack IS NULL AND individual_defense IS NULL AND individual_stamina IS NULL "
             "AND encounter_id != 0 "
-            "and (disappear_time BETWEEN DATE_ADD(UTC_TIMESTAMP(), INTERVAL %s SECOND) "
-            "and DATE_ADD(UTC_TIMESTAMP(), INTERVAL 60 MINUTE))"
-            "ORDER BY expire ASC"
-        )
-
-        vals = (
-            int(min_time_left_seconds),
-        )
-
-        results = self.execute(query, vals, commit=False)
-
-        next_to_encounter = []
+            "AND (disappear_time BETWEEN DATE_ADD(UTC_TIMESTAMP(), INTERVAL %s SECOND) "
+            "AND DATE_ADD(UTC_TIMESTAMP(), INTERVAL 60 MINUTE)) "
+            "AND pokemon_id IN ({}) "
+        ).format(",".join(["%s"] * len(mon_ranks)))
+        vals = [int(min_time_left_seconds)] + list(mon_ranks.keys())
+
+        if geofence_helper and geofence_helper.geofenced_areas:
+            # only the bounding box of the fences is of interest, the fences themselves are checked afterwards
+            min_lat, min_lon, max_lat, max_lon = geofence_helper.get_polygon_from_fence()
+            query += "AND latitude >= %s AND longitude >= %s AND latitude <= %s AND longitude <= %s "
+            vals += [min_lat, min_lon, max_lat, max_lon]
+        query += "ORDER BY expire ASC"
+
+        results = self.execute(query, tuple(vals), commit=False)
+
+        candidates = []
         for latitude, longitude, encounter_id, spawnpoint_id, pokemon_id, expire in results:
-            if pokemon_id not in eligible_mon_ids:
-                continue
-            elif latitude is None or longitude is None:
+            if latitude is None or longitude is None:
                 logger.warning("lat or lng is none")
                 continue
-            elif geofence_helper and not geofence_helper.is_coord_inside_include_geofence([latitude, longitude]):
-                logger.debug("Excluded encounter at {}, {} since the coordinate is not inside the given include fences", str(
-                    latitude), str(longitude))
-                continue
+            candidates.append((pokemon_id, latitude, longitude, encounter_id))
 
-            next_to_encounter.append((pokemon_id, Location(latitude, longitude), encounter_id))
+        if geofence_helper:
+            inside = geofence_helper.get_geofenced_mask([(latitude, longitude)
+                                                         for _, latitude, longitude, _ in candidates])
+            logger.debug("Excluded {} encounters since the coordinates are not inside the given include fences",
+                         len(candidates) - sum(1 for is_inside in inside if is_inside))
+            candidates = [candidate for candidate, is_inside in zip(candidates, inside) if is_inside]
 
-        # now filter by the order of eligible_mon_ids
-        to_be_encountered = []
-        i = 0
-        for mon_prio in eligible_mon_ids:
-            for mon in next_to_encounter:
-                if mon_prio == mon[0]:
-                    to_be_encountered.append((i, mon[1], mon[2]))
-            i += 1
-        return to_be_encountered
+        # order by the position in eligible_mon_ids, the order by expiration is kept for mons of the same rank
+        candidates.sort(key=lambda candidate: mon_ranks[candidate[0]])
+        return [(mon_ranks[pokemon_id], Location(latitude, longitude), encounter_id)
+                for pokemon_id, latitude, longitude, encounter_id in candidates]
 
     def stop_from_db_without_quests(self, geofence_helper, levelmode: bool = False):
         logger.debug("DbWrapper::stop_from_db_without_quests called")
@@ -441,6 +458,40 @@ class DbWrapper:
 
 
 
+    @staticmethod
+    def __rectangle_where(lat_column, lon_column, neLat, neLon, swLat, swLon, oNeLat=None, oNeLon=None,
+                          oSwLat=None, oSwLon=None, timestamp=None, timestamp_column=None,
+                          timestamp_as_datetime=True):
+        """
+        Builds the parameterised conditions for the MADmin map to fetch elements within a rectangle. Elements within
+        a known (old) rectangle are excluded, if there's no old rectangle only elements updated since timestamp are
+        fetched.
+        :return: the conditions (without WHERE) and their args
+        """
+        where = (
+            "({lat} >= %s AND {lon} >= %s "
+            "AND {lat} <= %s AND {lon} <= %s)"
+        )
+        args = [swLat, swLon, neLat, neLon]
+
+        # but don't fetch elements from a known rectangle
+        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
+            where += (
+                " AND NOT ({lat} >= %s AND {lon} >= %s "
+                "AND {lat} <= %s AND {lon} <= %s)"
+            )
+            args += [oSwLat, oSwLon, oNeLat, oNeLon]
+
+        # there's no old rectangle so check for a timestamp to send only updated stuff
+        elif timestamp is not None and timestamp_column is not None:
+            where += " AND {ts} >= %s"
+            if timestamp_as_datetime:
+                args.append(datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S"))
+            else:
+                args.append(int(timestamp))
+
+        return where.format(lat=lat_column, lon=lon_column, ts=timestamp_column), tuple(args)
+
     def get_gyms_in_rectangle(self, neLat, neLon, swLat, swLon, oNeLat=None, oNeLon=None, oSwLat=None, oSwLon=None, timestamp=None):
         """
         Basically just for MADmin map. This method returns gyms within a certain rectangle.
@@ -460,47 +511,27 @@ class DbWrapper:
             "LEFT JOIN raid ON raid.gym_id = gym.gym_id "
         )
 
-        # fetch gyms only in a certain rectangle
-        query_where = (
-            " WHERE (latitude >= {} AND longitude >= {} "
-            " AND latitude <= {} AND longitude <= {}) "
-        ).format(swLat, swLon, neLat, neLon)
+        # TODO ish: until we don't show any other information like raids
+        #          we can use last_modified, since that will give us actual
+        #          changes like gym color change
+        query_where, args = self.__rectangle_where("gym.latitude", "gym.longitude", neLat, neLon, swLat, swLon,
+                                                   oNeLat, oNeLon, oSwLat, oSwLon, timestamp,
+                                                   timestamp_column="gym.last_modified")
 
-        # but don't fetch gyms from a known rectangle
-        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
-            oquery_where = (
-                " AND NOT (latitude >= {} AND longitude >= {} "
-                " AND latitude <= {} AND longitude <= {}) "
-            ).format(oSwLat, oSwLon, oNeLat, oNeLon)
-
-            query_where = query_where + oquery_where
-
-        # there's no old rectangle so check for a timestamp to send only updated stuff
-        elif timestamp is not None:
-            tsdt = datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
-
-            # TODO ish: until we don't show any other information like raids
-            #          we can use last_modified, since that will give us actual
-            #          changes like gym color change
-            oquery_where = " AND last_modified >= '{}' ".format(tsdt)
-
-            query_where = query_where + oquery_where
-
-        res = self.execute(query + query_where)
+        res = self.execute(query + "WHERE " + query_where, args)
 
+        nowts = time.time()
         for (gym_id, latitude, longitude, name, url, team_id, last_updated,
                 level, spawn, start, end, mon_id, form, last_scanned) in res:
 
-            nowts = datetime.utcfromtimestamp(time.time()).timestamp()
-
             # check if we found a raid and if it's still active
-            if end is None or nowts > int(end.replace(tzinfo=timezone.utc).timestamp()):
+            if end is None or nowts > _utc_timestamp(end):
                 raid = None
             else:
                 raid = {
-                    "spawn": int(spawn.replace(tzinfo=timezone.utc).timestamp()),
-                    "start": int(start.replace(tzinfo=timezone.utc).timestamp()),
-                    "end": int(end.replace(tzinfo=timezone.utc).timestamp()),
+                    "spawn": _utc_timestamp(spawn),
+                    "start": _utc_timestamp(start),
+                    "end": _utc_timestamp(end),
                     "mon": mon_id,
                     "form": form,
                     "level": level
@@ -513,8 +544,8 @@ class DbWrapper:
                 "latitude": latitude,
                 "longitude": longitude,
                 "team_id": team_id,
-                "last_updated": int(last_updated.replace(tzinfo=timezone.utc).timestamp()),
-                "last_scanned": int(last_scanned.replace(tzinfo=timezone.utc).timestamp()),
+                "last_updated": _utc_timestamp(last_updated),
+                "last_scanned": _utc_timestamp(last_scanned),
                 "raid": raid
             }
 
@@ -532,31 +563,14 @@ class DbWrapper:
             "height, gender, form, costume, weather_boosted_condition, "
             "last_modified "
             "FROM pokemon "
-            "WHERE disappear_time > '{}'"
-        ).format(now)
-
-        query_where = (
-            " AND (latitude >= {} AND longitude >= {} "
-            " AND latitude <= {} AND longitude <= {}) "
-        ).format(swLat, swLon, neLat, neLon)
-
-        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
-            oquery_where = (
-                " AND NOT (latitude >= {} AND longitude >= {} "
-                " AND latitude <= {} AND longitude <= {}) "
-            ).format(oSwLat, oSwLon, oNeLat, oNeLon)
-
-            query_where = query_where + oquery_where
-
-        # there's no old rectangle so check for a timestamp to send only updated stuff
-        elif timestamp is not None:
-            tsdt = datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
-
-            oquery_where = " AND last_modified >= '{}' ".format(tsdt)
+            "WHERE disappear_time > %s AND "
+        )
 
-            query_where = query_where + oquery_where
+        query_where, args = self.__rectangle_where("latitude", "longitude", neLat, neLon, swLat, swLon,
+                                                   oNeLat, oNeLon, oSwLat, oSwLon, timestamp,
+                                                   timestamp_column="last_modified")
 
-        res = self.execute(query + query_where)
+        res = self.execute(query + query_where, (now,) + args)
 
         for (encounter_id, spawnpoint_id, pokemon_id, latitude, longitude,
                 disappear_time, individual_attack, individual_defense,
@@ -570,7 +584,7 @@ class DbWrapper:
                 "mon_id": pokemon_id,
                 "latitude": latitude,
                 "longitude": longitude,
-                "disappear_time": int(disappear_time.replace(tzinfo=timezone.utc).timestamp()),
+                "disappear_time": _utc_timestamp(disappear_time),
                 "individual_attack": individual_attack,
                 "individual_defense": individual_defense,
                 "individual_stamina": individual_stamina,
@@ -583,7 +597,7 @@ class DbWrapper:
                 "form": form,
                 "costume": costume,
                 "weather_boosted_condition": weather_boosted_condition,
-                "last_modified": int(last_modified.replace(tzinfo=timezone.utc).timestamp())
+                "last_modified": _utc_timestamp(last_modified)
             })
 
         return mons
@@ -599,25 +613,11 @@ class DbWrapper:
             "FROM pokestop "
         )
 
-        query_where = (
-            " WHERE (latitude >= {} AND longitude >= {} "
-            " AND latitude <= {} AND longitude <= {}) "
-        ).format(swLat, swLon, neLat, neLon)
+        query_where, args = self.__rectangle_where("latitude", "longitude", neLat, neLon, swLat, swLon,
+                                                   oNeLat, oNeLon, oSwLat, oSwLon, timestamp,
+                                                   timestamp_column="last_updated")
 
-        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
-            oquery_where = (
-                " AND NOT (latitude >= {} AND longitude >= {} "
-                " AND latitude <= {} AND longitude <= {}) "
-            ).format(oSwLat, oSwLon, oNeLat, oNeLon)
-
-            query_where = query_where + oquery_where
-
-        elif timestamp is not None:
-            tsdt = datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
-            oquery_where = " AND last_updated >= '{}' ".format(tsdt)
-            query_where = query_where + oquery_where
-
-        res = self.execute(query + query_where)
+        res = self.execute(query + "WHERE " + query_where, args)
 
         for (stop_id, enabled, latitude, longitude, last_modified, lure_expiration,
                 active_fort_modifier, last_updated, name, image, incident_start,
@@ -627,20 +627,19 @@ class DbWrapper:
                 "enabled": enabled,
                 "latitude": latitude,
                 "longitude": longitude,
-                "last_modified": int(last_modified.replace(tzinfo=timezone.utc).timestamp()),
-                "lure_expiration": int(lure_expiration.replace(tzinfo=timezone.utc).timestamp()) if lure_expiration is not None else None,
+                "last_modified": _utc_timestamp(last_modified),
+                "lure_expiration": _utc_timestamp(lure_expiration),
                 "active_fort_modifier": active_fort_modifier,
-                "last_updated": int(last_updated.replace(tzinfo=timezone.utc).timestamp()) if last_updated is not None else None,
+                "last_updated": _utc_timestamp(last_updated),
                 "name": name,
                 "image": image,
-                "incident_start": int(incident_start.replace(tzinfo=timezone.utc).timestamp()) if incident_start is not None else None,
-                "incident_expiration": int(incident_expiration.replace(tzinfo=timezone.utc).timestamp()) if incident_expiration is not None else None,
+                "incident_start": _utc_timestamp(incident_start),
+                "incident_expiration": _utc_timestamp(incident_expiration),
                 "incident_grunt_type": incident_grunt_type
             }
 
         return stops
 
-
     def delete_stop(self, latitude: float, longitude: float):
         logger.debug('Deleting stop from db')
         query = (
@@ -946,26 +945,12 @@ class DbWrapper:
             "FROM trs_s2cells "
         )
 
-        query_where = (
-            " WHERE (center_latitude >= {} AND center_longitude >= {} "
-            " AND center_latitude <= {} AND center_longitude <= {}) "
-        ).format(swLat, swLon, neLat, neLon)
+        # updated is stored as unix timestamp
+        query_where, args = self.__rectangle_where("center_latitude", "center_longitude", neLat, neLon, swLat, swLon,
+                                                   oNeLat, oNeLon, oSwLat, oSwLon, timestamp,
+                                                   timestamp_column="updated", timestamp_as_datetime=False)
 
-        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
-            oquery_where = (
-                " AND NOT (center_latitude >= {} AND center_longitude >= {} "
-                " AND center_latitude <= {} AND center_longitude <= {}) "
-            ).format(oSwLat, oSwLon, oNeLat, oNeLon)
-
-            query_where = query_where + oquery_where
-
-        elif timestamp is not None:
-            tsdt = datetime.utcfromtimestamp(int(timestamp)).strftime("%Y-%m-%d %H:%M:%S")
-            oquery_where = " AND updated >= '{}' ".format(tsdt)
-
-            query_where = query_where + oquery_where
-
-        res = self.execute(query + query_where)
+        res = self.execute(query + "WHERE " + query_where, args)
 
         cells = []
         for (id, level, center_latitude, center_longitude, updated) in res:
@@ -1,13 +1,197 @@
+import random
+import time
 from multiprocessing import Lock, Semaphore
 from multiprocessing.managers import SyncManager
 import mysql
+from mysql.connector import errorcode
 from mysql.connector.pooling import MySQLConnectionPool
 from utils.logging import logger
 
 class PooledQuerySyncManager(SyncManager):
     pass
 
-class PooledQueryExecutor:
+class QueryExecutorBase:
+    """
+    Driver independent helpers used by the executors to build queries and convert results
+    """
+
+    # ===================================================
+    # =============== DB Helper Functions ===============
+    # ===================================================
+
+    def _convert_to_dict(self, descr, rows):
+        desc = [n for n in descr]
+        return [dict(zip(desc, row)) for row in rows]
+
+    def _create_clause(self, col_names, col_subs):
+        """ Creates a clause and handles lists
+        Args:
+            col_names (list): List of column names
+            col_subs (list): List of column value substitutions
+        Returns (list):
+            List of elements for the clause
+        """
+        clause = []
+        for ind, name in enumerate(col_names):
+            if col_subs[ind].find(",") != -1:
+                clause.append("`%s` IN (%s)" % (name, col_subs[ind]))
+            else:
+                clause.append("`%s` = %s" % (name, col_subs[ind]))
+        return clause
+
+    def _fix_table(self, table):
+        """ Encapsualtes the table in backticks
+        Args:
+            table (str): Table to encapsulate
+        Returns (str):
+            Encapsulated table
+        """
+        split_table = table.split(".")
+        table_name = ""
+        if len(split_table) > 2:
+            raise Exception("Invalid table format, %s" % table)
+        for name in split_table:
+            name = name.replace("`", "")
+            if len(table_name) != 0:
+                table_name += "."
+            table_name += "`%s`" % name
+        return table_name
+
+    def _process_literals(self, optype, keyvals, literals):
+        """ Processes literals and returns a tuple containing all data required for the query
+        Args:
+            keyvals (dict): Data to insert into the table
+            literals (list): Datapoints that should not be escaped
+            optype (str): Type of operation
+        Returns (tuple):
+            (Column names, Column Substitutions, Column Values, Literal Values, OnDuplicate)
+        """
+        column_names = []
+        column_substituion = []
+        column_values = []
+        literal_values = []
+        ondupe_out = []
+        for key, value in keyvals.items():
+            if type(value) is list and optype not in ["DELETE", "UPDATE"]:
+                raise Exception("Unable to process a list in key %s" % key)
+            column_names += [key]
+            # Determine the type of data to insert
+            sub_op = "%%s"
+            if key in literals:
+                sub_op = "%s"
+            # Number of times to repeat
+            num_times = 1
+            if type(value) is list:
+                num_times = len(value)
+            column_substituion += [",".join(sub_op for _ in range(0, num_times))]
+            # Add to the entries
+            if key in literals:
+                if type(value) is list:
+                    literal_values += value
+                else:
+                    literal_values += [value]
+            else:
+                if type(value) is list:
+                    column_values += value
+                else:
+                    column_values += [value]
+        for key, value in keyvals.items():
+            if optype == "ON DUPLICATE":
+                tmp_value = "`%s` = %%s" % key
+                if key in literals:
+                    tmp_value = tmp_value % value
+                else:
+                    column_values += [value]
+                ondupe_out += [tmp_value]
+        return (column_names, column_substituion, column_values, literal_values, ondupe_out)
+
+    def _build_delete_query(self, table, keyvals, literals, where_append):
+        """ Builds the query of a delete
+        Returns (tuple):
+            (Query, Args)
+        """
+        if type(keyvals) is not dict:
+            raise Exception("Data must be a dictionary")
+        if type(literals) is not list:
+            raise Exception("Literals must be a list")
+        table = self._fix_table(table)
+        parsed_literals = self._process_literals("DELETE", keyvals, literals)
+        (column_names, column_substituion, column_values, literal_values, _) = parsed_literals
+        query = "DELETE FROM %s\nWHERE "
+        where_clauses = where_append + self._create_clause(column_names, column_substituion)
+        query += "\nAND ".join(k for k in where_clauses)
+        literal_values = [table] + literal_values
+        query = query % tuple(literal_values)
+        return query, tuple(column_values)
+
+    def _build_insert_query(self, table, keyvals, literals, optype):
+        """ Builds the query of an insert
+        Returns (tuple):
+            (Query, Args)
+        """
+        optype = optype.upper()
+        if optype not in ["INSERT", "REPLACE", "INSERT IGNORE", "ON DUPLICATE"]:
+            raise ProgrammingError("MySQL operation must be 'INSERT', 'REPLACE', 'INSERT IGNORE', 'ON DUPLICATE',"\
+                                    "got '%s'" % optype)
+        if type(keyvals) is not dict:
+            raise Exception("Data must be a dictionary")
+        if type(literals) is not list:
+            raise Exception("Literals must be a list")
+        table = self._fix_table(table)
+        parsed_literals = self._process_literals(optype, keyvals, literals)
+        (column_names, column_substituion, column_values, literal_values, ondupe_out) = parsed_literals
+        ondupe_values = []
+        inital_type = optype
+        if optype == "ON DUPLICATE":
+            inital_type = "INSERT"
+        if inital_type in ["INSERT", "REPLACE"]:
+            inital_type += " INTO"
+        rownames = ",".join("`%s`" % k for k in column_names)
+        rowvalues = ", ".join(k for k in column_substituion)
+        query = "%s %s\n"\
+                "(%s)\n"\
+                "VALUES(%s)" % (inital_type, table, rownames, rowvalues) % tuple(literal_values)
+        if optype == "ON DUPLICATE":
+            dupe_out = ",\n".join("%s" % k for k in ondupe_out)
+            query += "\nON DUPLICATE KEY UPDATE\n"\
+                     "%s" % dupe_out
+            column_values += ondupe_values
+        return query, tuple(column_values)
+
+    def _build_update_query(self, table, set_keyvals, set_literals, where_keyvals, where_literals):
+        """ Builds the query of an update
+        Returns (tuple):
+            (Query, Args)
+        """
+        if type(set_keyvals) is not dict:
+            raise Exception("Set Keyvals must be a dictionary")
+        if type(set_literals) is not list:
+            raise Exception("Literals must be a list")
+        if type(where_keyvals) is not dict:
+            raise Exception("Where Keyvals must be a dictionary")
+        if type(where_literals) is not list:
+            raise Exception("Literals must be a list")
+        parsed_set = self._process_literals("SET", set_keyvals, set_literals)
+        (set_col_names, set_col_sub, set_val, set_literal_val, _) = parsed_set
+        parsed_where = self._process_literals("UPDATE", where_keyvals, where_literals)
+        (where_col_names, where_col_sub, where_val, where_literal_val, _) = parsed_where
+        first_sub = [table]
+        actual_values = set_val + where_val
+        set_clause = self._create_clause(set_col_names, set_col_sub)
+        first_sub.append(",".join(set_clause) % tuple(set_literal_val))
+        query = "UPDATE %s\n"\
+                "SET %s"
+        if where_col_names:
+            query += "\nWHERE %s"
+            where_clause = self._create_clause(where_col_names, where_col_sub)
+            first_sub.append("\nAND".join(where_clause) % tuple(where_literal_val))
+        query = query % tuple(first_sub)
+        return query, tuple(actual_values)
+
+
+class PooledQueryExecutor(QueryExecutorBase):
+    # errors a transaction is run again after: deadlock and lock wait timeout
+    transaction_retry_errnos = (errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT)
 
     def __init__(self, host, port, username, password, database, poolsize=1):
         self.host = host
@@ -95,7 +279,7 @@ class PooledQueryExecutor:
             else:
                 res = cursor.fetchall()
                 if get_dict:
-                    return self.__convert_to_dict(cursor.column_names, res)
+                    return self._convert_to_dict(cursor.column_names, res)
                 return res
         except mysql.connector.Error as err:
             logger.error("Failed executing query: {}, error: {}", str(sql), str(err))
@@ -143,96 +327,83 @@ class PooledQueryExecutor:
             self.close(conn, cursor)
             self._connection_semaphore.release()
 
-    # ===================================================
-    # =============== DB Helper Functions ===============
-    # ===================================================
+    def execute_in_chunks(self, sql, values, args=(), chunk_size=100, prepared=False, get_dict=False):
+        """
+        Execute a query containing an IN list for an arbitrary amount of values. The values are split into
+        chunks of a fixed size and passed as parameters. The last chunk is padded by repeating its last value,
+        so the query text is the same for every chunk and call.
+        :param sql: sql clause with a single {} as placeholder of the IN list, e.g. "... WHERE id IN ({})"
+        :param values: values to be placed into the IN list
+        :param args: additional args needed by sql clause, placed after the values of the IN list
+        :param chunk_size: amount of values per query
+        :param prepared: whether to use a server-side prepared statement
+        :param get_dict: whether to return the rows as dicts
+        :return: the rows of all chunks or None if a query failed
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return []
+        query = sql.format(",".join(["%s"] * chunk_size))
 
-    def __convert_to_dict(self, descr, rows):
-        desc = [n for n in descr]
-        return [dict(zip(desc, row)) for row in rows]
+        self._connection_semaphore.acquire()
+        conn = self._pool.get_connection()
+        cursor = self.setup_cursor(conn, prepared=prepared)
 
-    def __create_clause(self, col_names, col_subs):
-        """ Creates a clause and handles lists
-        Args:
-            col_names (list): List of column names
-            col_subs (list): List of column value substitutions
-        Returns (list):
-            List of elements for the clause
-        """
-        clause = []
-        for ind, name in enumerate(col_names):
-            if col_subs[ind].find(",") != -1:
-                clause.append("`%s` IN (%s)" % (name, col_subs[ind]))
-            else:
-                clause.append("`%s` = %s" % (name, col_subs[ind]))
-        return clause
+        try:
+            res = []
+            for start in range(0, len(values), chunk_size):
+                chunk = values[start:start + chunk_size]
+                chunk += [chunk[-1]] * (chunk_size - len(chunk))
+                cursor.execute(query, tuple(chunk) + tuple(args))
+                res += cursor.fetchall()
+            if get_dict:
+                return self._convert_to_dict(cursor.column_names, res)
+            return res
+        except mysql.connector.Error as err:
+            logger.error("Failed executing query: {}, error: {}", str(query), str(err))
+            logger.debug(args)
+            return None
+        except Exception as e:
+            logger.error("Unspecified exception in dbWrapper: {}", str(e))
+            return None
+        finally:
+            self.close(conn, cursor)
+            self._connection_semaphore.release()
 
-    def __fix_table(self, table):
-        """ Encapsualtes the table in backticks
-        Args:
-            table (str): Table to encapsulate
-        Returns (str):
-            Encapsulated table
+    def executemany_transaction(self, statements, retries=2):
         """
-        split_table = table.split(".")
-        table_name = ""
-        if len(split_table) > 2:
-            raise Exception("Invalid table format, %s" % table)
-        for name in split_table:
-            name = name.replace("`", "")
-            if len(table_name) != 0:
-                table_name += "."
-            table_name += "`%s`" % name
-        return table_name
-
-    def __process_literals(self, optype, keyvals, literals):
-        """ Processes literals and returns a tuple containing all data required for the query
-        Args:
-            keyvals (dict): Data to insert into the table
-            literals (list): Datapoints that should not be escaped
-            optype (str): Type of operation
-        Returns (tuple):
-            (Column names, Column Substitutions, Column Values, Literal Values, OnDuplicate)
+        Execute several statements with many args each on a single connection and commit them
+        as one transaction. The transaction is rolled back if any of the statements fails. A transaction
+        failing due to a deadlock or a lock wait timeout is rolled back and run again up to retries times.
+        :param statements: sequence of (sql, args) tuples, args being a sequence as with executemany
+        :param retries: number of times the transaction is run again after a deadlock or lock wait timeout
+        :return: True if the transaction has been committed, False otherwise
         """
-        column_names = []
-        column_substituion = []
-        column_values = []
-        literal_values = []
-        ondupe_out = []
-        for key, value in keyvals.items():
-            if type(value) is list and optype not in ["DELETE", "UPDATE"]:
-                raise Exception("Unable to process a list in key %s" % key)
-            column_names += [key]
-            # Determine the type of data to insert
-            sub_op = "%%s"
-            if key in literals:
-                sub_op = "%s"
-            # Number of times to repeat
-            num_times = 1
-            if type(value) is list:
-                num_times = len(value)
-            column_substituion += [",".join(sub_op for _ in range(0, num_times))]
-            # Add to the entries
-            if key in literals:
-                if type(value) is list:
-                    literal_values += value
-                else:
-                    literal_values += [value]
-            else:
-                if type(value) is list:
-                    column_values += value
-                else:
-                    column_values += [value]
-        for key, value in keyvals.items():
-            if optype == "ON DUPLICATE":
-                tmp_value = "`%s` = %%s" % key
-                if key in literals:
-                    tmp_value = tmp_value % value
-                else:
-                    column_values += [value]
-                ondupe_out += [tmp_value]
-        return (column_names, column_substituion, column_values, literal_values, ondupe_out)
+        self._connection_semaphore.acquire()
+        conn = self._pool.get_connection()
+        cursor = conn.cursor()
 
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    for sql, args in statements:
+                        cursor.executemany(sql, args)
+                    conn.commit()
+                    return True
+                except mysql.connector.Error as err:
+                    conn.rollback()
+                    if err.errno not in self.transaction_retry_errnos or attempt >= retries:
+                        logger.error("Failed executing transaction: {}", str(err))
+                        return False
+                    logger.warning("Transaction failed ({}), retrying", str(err))
+                    time.sleep(random.uniform(0.05, 0.2) * (attempt + 1))
+                except Exception as e:
+                    logger.error("Unspecified exception in dbWrapper: {}", str(e))
+                    conn.rollback()
+                    return False
+        finally:
+            self.close(conn, cursor)
+            self._connection_semaphore.release()
 
     def autofetch_all(self, sql, args=()):
         """ Fetch all data and have it returned as a dictionary """
@@ -270,19 +441,8 @@ class PooledQueryExecutor:
             literals (list): Datapoints that should not be escaped
             where_append (list): Additional data to append to the query
         """
-        if type(keyvals) is not dict:
-            raise Exception("Data must be a dictionary")
-        if type(literals) is not list:
-            raise Exception("Literals must be a list")
-        table = self.__fix_table(table)
-        parsed_literals = self.__process_literals("DELETE", keyvals, literals)
-        (column_names, column_substituion, column_values, literal_values, _) = parsed_literals
-        query = "DELETE FROM %s\nWHERE "
-        where_clauses = where_append + self.__create_clause(column_names, column_substituion)
-        query += "\nAND ".join(k for k in where_clauses)
-        literal_values = [table] + literal_values
-        query = query % tuple(literal_values)
-        self.execute(query, args=tuple(column_values), commit=True, raise_exc=True)
+        query, args = self._build_delete_query(table, keyvals, literals, where_append)
+        self.execute(query, args=args, commit=True, raise_exc=True)
 
     def autoexec_insert(self, table, keyvals, literals=[], optype="INSERT"):
         """ Auto-inserts into a table and handles all escaping
@@ -297,34 +457,8 @@ class PooledQueryExecutor:
         Returns (int):
             Primary key for the row
         """
-        optype = optype.upper()
-        if optype not in ["INSERT", "REPLACE", "INSERT IGNORE", "ON DUPLICATE"]:
-            raise ProgrammingError("MySQL operation must be 'INSERT', 'REPLACE', 'INSERT IGNORE', 'ON DUPLICATE',"\
-                                    "got '%s'" % optype)
-        if type(keyvals) is not dict:
-            raise Exception("Data must be a dictionary")
-        if type(literals) is not list:
-            raise Exception("Literals must be a list")
-        table = self.__fix_table(table)
-        parsed_literals = self.__process_literals(optype, keyvals, literals)
-        (column_names, column_substituion, column_values, literal_values, ondupe_out) = parsed_literals
-        ondupe_values = []
-        inital_type = optype
-        if optype == "ON DUPLICATE":
-            inital_type = "INSERT"
-        if inital_type in ["INSERT", "REPLACE"]:
-            inital_type += " INTO"
-        rownames = ",".join("`%s`" % k for k in column_names)
-        rowvalues = ", ".join(k for k in column_substituion)
-        query = "%s %s\n"\
-                "(%s)\n"\
-                "VALUES(%s)" % (inital_type, table, rownames, rowvalues) % tuple(literal_values)
-        if optype == "ON DUPLICATE":
-            dupe_out = ",\n".join("%s" % k for k in ondupe_out)
-            query += "\nON DUPLICATE KEY UPDATE\n"\
-                     "%s" % dupe_out
-            column_values += ondupe_values
-        return self.execute(query, args=tuple(column_values), commit=True, get_id=True, raise_exc=True)
+        query, args = self._build_insert_query(table, keyvals, literals, optype)
+        return self.execute(query, args=args, commit=True, get_id=True, raise_exc=True)
 
     def autoexec_update(self, table, set_keyvals, set_literals=[], where_keyvals={}, where_literals=[]):
         """ Auto-updates into a table and handles all escaping
@@ -335,27 +469,5 @@ class PooledQueryExecutor:
             where_keyvals (dict): Data used in the where clause
             where_literals (list): Datapoints that should not be escaped
         """
-        if type(set_keyvals) is not dict:
-            raise Exception("Set Keyvals must be a dictionary")
-        if type(set_literals) is not list:
-            raise Exception("Literals must be a list")
-        if type(where_keyvals) is not dict:
-            raise Exception("Where Keyvals must be a dictionary")
-        if type(where_literals) is not list:
-            raise Exception("Literals must be a list")
-        parsed_set = self.__process_literals("SET", set_keyvals, set_literals)
-        (set_col_names, set_col_sub, set_val, set_literal_val, _) = parsed_set
-        parsed_where = self.__process_literals("UPDATE", where_keyvals, where_literals)
-        (where_col_names, where_col_sub, where_val, where_literal_val, _) = parsed_where
-        first_sub = [table]
-        actual_values = set_val + where_val
-        set_clause = self.__create_clause(set_col_names, set_col_sub)
-        first_sub.append(",".join(set_clause) % tuple(set_literal_val))
-        query = "UPDATE %s\n"\
-                "SET %s"
-        if where_col_names:
-            query += "\nWHERE %s"
-            where_clause = self.__create_clause(where_col_names, where_col_sub)
-            first_sub.append("\nAND".join(where_clause) % tuple(where_literal_val))
-        query = query % tuple(first_sub)
-        self.execute(query, args=tuple(actual_values), commit=True, raise_exc=True)
+        query, args = self._build_update_query(table, set_keyvals, set_literals, where_keyvals, where_literals)
+        self.execute(query, args=args, commit=True, raise_exc=True)
@@ -7,7 +7,9 @@ from utils.logging import logger
 # Trying to import matplotlib, which is not compatible with all hardware.
 # Matlplotlib is faster for big calculations.
 try:
+    import numpy as np
     from matplotlib.path import Path
+    from matplotlib.transforms import Bbox
 except ImportError:
     # Pass as this is an optional requirement. We're going to check later if it
     # was properly imported and only use it if it's installed.
@@ -15,6 +17,9 @@ except ImportError:
 
 
 class GeofenceHelper:
+    # amount of cells per axis of the grid index used for single coordinate checks
+    index_resolution = 64
+
     def __init__(self, include_geofence, exclude_geofence):
         self.geofenced_areas = []
         self.excluded_areas = []
@@ -26,6 +31,13 @@ class GeofenceHelper:
                 exclude_geofence, excluded=True)
             logger.debug2("Loaded {} geofenced and {} excluded areas.", len(
                 self.geofenced_areas), len(self.excluded_areas))
+        # the polygons are compiled once to be reused by every check
+        self._geofenced_paths = [self._compile_area(area) for area in self.geofenced_areas]
+        self._excluded_paths = [self._compile_area(area) for area in self.excluded_areas]
+        self._geofenced_bounds = [self._get_area_bounds(area) for area in self.geofenced_areas]
+        self._excluded_bounds = [self._get_area_bounds(area) for area in self.excluded_areas]
+        # the grid index is built on the first single coordinate check
+        self._index = None
 
     def get_polygon_from_fence(self):
         maxLat, minLat, maxLon, minLon = -90, 90, -180, 180
@@ -40,6 +52,8 @@ class GeofenceHelper:
         return minLat, minLon, maxLat, maxLon
 
     def is_coord_inside_include_geofence(self, coordinate):
+        if self.use_matplotlib:
+            return self._is_coord_inside_indexed(coordinate)
         # logger.debug("Checking if coord {} is inside fences", str(coordinate))
         # Coordinate is not valid if in one excluded area.
         if self._is_excluded(coordinate):
@@ -48,8 +62,8 @@ class GeofenceHelper:
 
         # Coordinate is geofenced if in one geofenced area.
         if self.geofenced_areas:
-            for va in self.geofenced_areas:
-                if self._in_area(coordinate, va):
+            for va, path in zip(self.geofenced_areas, self._geofenced_paths):
+                if self._in_area(coordinate, va, path):
                     # logger.debug("Coord {} is inside fences", str(coordinate))
                     return True
         else:
@@ -65,25 +79,38 @@ class GeofenceHelper:
         logger.debug('Using matplotlib: {}.', self.use_matplotlib)
         logger.debug('Found {} coordinates to geofence.', len(coordinates))
 
-        geofenced_coordinates = []
-        for c in coordinates:
-            # Coordinate is not valid if in one excluded area.
-            if self._is_excluded(c):
-                continue
-
-            # Coordinate is geofenced if in one geofenced area.
-            if self.geofenced_areas:
-                for va in self.geofenced_areas:
-                    if self._in_area(c, va):
-                        geofenced_coordinates.append(c)
-                        break
-            else:
-                geofenced_coordinates.append(c)
+        inside = self.get_geofenced_mask(coordinates)
+        geofenced_coordinates = [c for c, c_inside in zip(coordinates, inside) if c_inside]
 
         logger.debug2("Geofenced to {} coordinates",
                       len(geofenced_coordinates))
         return geofenced_coordinates
 
+    def get_geofenced_mask(self, coordinates):
+        """
+        Classify all coordinates at once. A coordinate is inside if it is inside any geofenced area (or no
+        geofenced areas are present) and not inside any of the excluded areas.
+        :param coordinates: sequence of n-tuples with lat and lon as first two elements
+        :return: sequence of bools, True for every coordinate inside the geofences
+        """
+        if not self.use_matplotlib:
+            return [self.is_coord_inside_include_geofence(c) for c in coordinates]
+        if len(coordinates) == 0:
+            return np.zeros(0, dtype=bool)
+
+        points = np.array([(c[0], c[1]) for c in coordinates], dtype=float)
+        if self.geofenced_areas:
+            inside = np.zeros(len(points), dtype=bool)
+            for path in self._geofenced_paths:
+                if path is not None:
+                    inside |= path.contains_points(points)
+        else:
+            inside = np.ones(len(points), dtype=bool)
+        for path in self._excluded_paths:
+            if path is not None:
+                inside &= ~path.contains_points(points)
+        return inside
+
     def is_enabled(self):
         return self.geofenced_areas or self.excluded_areas
 
@@ -123,14 +150,110 @@ class GeofenceHelper:
 
         return geofences
 
+    def _compile_area(self, area):
+        if not self.use_matplotlib or not area['polygon']:
+            return None
+        vertices = [(c['lat'], c['lon']) for c in area['polygon']]
+        vertices.append(vertices[0])
+        return Path(np.array(vertices, dtype=float))
+
+    @staticmethod
+    def _get_area_bounds(area):
+        if not area['polygon']:
+            return None
+        lats = [c['lat'] for c in area['polygon']]
+        lons = [c['lon'] for c in area['polygon']]
+        return min(lats), min(lons), max(lats), max(lons)
+
+    def _build_index(self):
+        """
+        Build a grid over the bounding box of all fences. Every cell stores whether it is fully inside an
+        include or exclude fence and the fences whose edges cross it. Only the latter need the polygon test.
+        """
+        bounds = [b for b in self._geofenced_bounds + self._excluded_bounds if b is not None]
+        index = {'cells': {}}
+        if not bounds:
+            self._index = index
+            return
+        min_lat = min(b[0] for b in bounds)
+        min_lon = min(b[1] for b in bounds)
+        max_lat = max(b[2] for b in bounds)
+        max_lon = max(b[3] for b in bounds)
+        # avoid cells of zero size for degenerated fences
+        lat_step = max((max_lat - min_lat) / self.index_resolution, 1e-9)
+        lon_step = max((max_lon - min_lon) / self.index_resolution, 1e-9)
+        index.update({'min_lat': min_lat, 'min_lon': min_lon, 'lat_step': lat_step, 'lon_step': lon_step})
+
+        def add_fence(path, area_bounds, excluded):
+            if path is None:
+                return
+            first_lat, first_lon = self._get_index_cell(index, area_bounds[0], area_bounds[1])
+            last_lat, last_lon = self._get_index_cell(index, area_bounds[2], area_bounds[3])
+            for cell_lat in range(first_lat, last_lat + 1):
+                for cell_lon in range(first_lon, last_lon + 1):
+                    cell_min_lat = min_lat + cell_lat * lat_step
+                    cell_min_lon = min_lon + cell_lon * lon_step
+                    bbox = Bbox([[cell_min_lat, cell_min_lon], [cell_min_lat + lat_step, cell_min_lon + lon_step]])
+                    if path.intersects_bbox(bbox, filled=False):
+                        state = 'candidates'
+                    elif path.contains_point((cell_min_lat + lat_step / 2, cell_min_lon + lon_step / 2)):
+                        state = 'full'
+                    else:
+                        continue
+                    cell = index['cells'].setdefault((cell_lat, cell_lon), {
+                        'include_full': False, 'include_candidates': [],
+                        'exclude_full': False, 'exclude_candidates': []})
+                    prefix = 'exclude_' if excluded else 'include_'
+                    if state == 'full':
+                        cell[prefix + 'full'] = True
+                    else:
+                        cell[prefix + 'candidates'].append(path)
+
+        for path, area_bounds in zip(self._geofenced_paths, self._geofenced_bounds):
+            add_fence(path, area_bounds, False)
+        for path, area_bounds in zip(self._excluded_paths, self._excluded_bounds):
+            add_fence(path, area_bounds, True)
+        self._index = index
+        logger.debug2("Built geofence index with {} cells", len(index['cells']))
+
+    @staticmethod
+    def _get_index_cell(index, lat, lon):
+        return int((lat - index['min_lat']) // index['lat_step']), int((lon - index['min_lon']) // index['lon_step'])
+
+    def _is_coord_inside_indexed(self, coordinate):
+        if self._index is None:
+            self._build_index()
+        point = (coordinate[0], coordinate[1])
+        cell = None
+        if self._index['cells']:
+            cell = self._index['cells'].get(self._get_index_cell(self._index, point[0], point[1]), None)
+        if cell is None:
+            # not touched by any fence
+            return not self.geofenced_areas
+
+        if cell['exclude_full']:
+            return False
+        for path in cell['exclude_candidates']:
+            if path.contains_point(point):
+                return False
+
+        if not self.geofenced_areas or cell['include_full']:
+            return True
+        for path in cell['include_candidates']:
+            if path.contains_point(point):
+                return True
+        return False
+
     def _is_excluded(self, coordinate):
-        for ea in self.excluded_areas:
-            if self._in_area(coordinate, ea):
+        for ea, path in zip(self.excluded_areas, self._excluded_paths):
+            if self._in_area(coordinate, ea, path):
                 return True
 
         return False
 
-    def _in_area(self, coordinate, area):
+    def _in_area(self, coordinate, area, path=None):
+        if path is not None:
+            return path.contains_point((coordinate[0], coordinate[1]))
         point = {'lat': coordinate[0], 'lon': coordinate[1]}
         polygon = area['polygon']
         if self.use_matplotlib:
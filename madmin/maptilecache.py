@@ -0,0 +1,134 @@
+import math
+import time
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Callable, Dict, List, Tuple
+
+from utils.logging import logger
+
+# element shown on the MADmin map, json is the element serialized as sent to the clients.
+# updated is compared with the timestamp of clients fetching updates only, expires (if not None) hides the element
+MapElement = namedtuple("MapElement", ["latitude", "longitude", "updated", "expires", "json"])
+
+
+class MapTileCache(object):
+    """
+    Short lived cache of the elements shown on the MADmin map, shared by all map sessions.
+    Rectangles requested are split into tiles of tile_size degrees. Tiles missing are fetched from the DB by a single
+    query and kept for ttl_sec seconds, clients panning the map or polling for updates are thereby served by warm
+    tiles. Elements are kept serialized, responses are joined from the serialized elements.
+    """
+    tile_size = 0.05
+    # rectangles spanning more tiles (zoomed out maps) are fetched from the DB directly
+    max_tiles_per_request = 64
+    # tiles kept per kind of element, least recently fetched tiles are dropped first
+    max_tiles = 2048
+
+    def __init__(self, ttl_sec: int):
+        self.__ttl_sec: int = ttl_sec
+        # kind -> (tile x, tile y) -> (fetched at, elements)
+        self.__tiles: Dict[str, OrderedDict] = {}
+        self.__tiles_mutex: Lock = Lock()
+
+    def get_json(self, kind: str, loader: Callable[..., List[MapElement]], neLat, neLon, swLat, swLon,
+                 oNeLat=None, oNeLon=None, oSwLat=None, oSwLon=None, timestamp=None) -> str:
+        """
+        Serialized JSON list of the elements within the rectangle, either excluding the elements within the old
+        rectangle or, if there's no old rectangle, only the elements updated since timestamp.
+        :param kind: name of the elements, tiles are cached by kind
+        :param loader: fetches the elements within a rectangle, called like the get_*_in_rectangle methods of DbWrapper
+        """
+        neLat, neLon, swLat, swLon = float(neLat), float(neLon), float(swLat), float(swLon)
+        old_rectangle = None
+        min_updated = None
+        if oNeLat is not None and oNeLon is not None and oSwLat is not None and oSwLon is not None:
+            old_rectangle = (float(oNeLat), float(oNeLon), float(oSwLat), float(oSwLon))
+        elif timestamp is not None:
+            min_updated = int(timestamp)
+
+        tiles = self.__tiles_within(neLat, neLon, swLat, swLon)
+        if self.__ttl_sec <= 0 or len(tiles) > self.max_tiles_per_request:
+            elements = loader(neLat, neLon, swLat, swLon, oNeLat=oNeLat, oNeLon=oNeLon, oSwLat=oSwLat,
+                              oSwLon=oSwLon, timestamp=timestamp)
+        else:
+            elements = self.__get_elements(kind, loader, tiles)
+            if min_updated is not None:
+                # tiles are up to ttl_sec old. Elements updated after a tile had been fetched are not sent until the
+                # tile is fetched again, the client has already moved its timestamp on by then
+                min_updated -= self.__ttl_sec
+
+        now = time.time()
+        serialized = []
+        for element in elements:
+            if not self.__within(element, neLat, neLon, swLat, swLon):
+                continue
+            if old_rectangle is not None and self.__within(element, *old_rectangle):
+                continue
+            if min_updated is not None and (element.updated is None or element.updated < min_updated):
+                continue
+            if element.expires is not None and element.expires <= now:
+                continue
+            serialized.append(element.json)
+        return "[" + ",".join(serialized) + "]"
+
+    @staticmethod
+    def __within(element: MapElement, neLat, neLon, swLat, swLon) -> bool:
+        return swLat <= element.latitude <= neLat and swLon <= element.longitude <= neLon
+
+    def __tile_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return int(math.floor(latitude / self.tile_size)), int(math.floor(longitude / self.tile_size))
+
+    def __tiles_within(self, neLat, neLon, swLat, swLon) -> List[Tuple[int, int]]:
+        min_x, min_y = self.__tile_of(swLat, swLon)
+        max_x, max_y = self.__tile_of(neLat, neLon)
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def __get_elements(self, kind: str, loader: Callable[..., List[MapElement]],
+                       tiles: List[Tuple[int, int]]) -> List[MapElement]:
+        now = time.time()
+        elements: List[MapElement] = []
+        missing: List[Tuple[int, int]] = []
+        with self.__tiles_mutex:
+            cached_tiles = self.__tiles.setdefault(kind, OrderedDict())
+            for tile in tiles:
+                cached = cached_tiles.get(tile, None)
+                if cached is not None and now - cached[0] < self.__ttl_sec:
+                    elements.extend(cached[1])
+                else:
+                    missing.append(tile)
+
+        if missing:
+            fetched = self.__fetch_tiles(loader, missing)
+            with self.__tiles_mutex:
+                cached_tiles = self.__tiles[kind]
+                for tile, tile_elements in fetched.items():
+                    cached_tiles.pop(tile, None)
+                    cached_tiles[tile] = (now, tile_elements)
+                while len(cached_tiles) > self.max_tiles:
+                    cached_tiles.popitem(last=False)
+            for tile in missing:
+                elements.extend(fetched[tile])
+        return elements
+
+    def __fetch_tiles(self, loader: Callable[..., List[MapElement]],
+                      missing: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[MapElement]]:
+        """
+        Fetches all tiles in the bounding box of the tiles missing by a single query
+        """
+        min_x = min(tile[0] for tile in missing)
+        max_x = max(tile[0] for tile in missing)
+        min_y = min(tile[1] for tile in missing)
+        max_y = max(tile[1] for tile in missing)
+        fetched: Dict[Tuple[int, int], List[MapElement]] = {
+            (x, y): [] for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)
+        }
+        # add a margin for elements on the border of the tiles, elements are assigned to their tile below
+        margin = self.tile_size / 1000
+        elements = loader((max_x + 1) * self.tile_size + margin, (max_y + 1) * self.tile_size + margin,
+                          min_x * self.tile_size - margin, min_y * self.tile_size - margin)
+        for element in elements:
+            tile_elements = fetched.get(self.__tile_of(element.latitude, element.longitude), None)
+            if tile_elements is not None:
+                tile_elements.append(element)
+        logger.debug4("Fetched {} map elements in {} tiles", len(elements), len(fetched))
+        return fetched
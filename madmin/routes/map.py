@@ -2,19 +2,19 @@ import json
 import os
 from typing import List, Optional
 
-from flask import (jsonify, render_template, request, redirect, url_for)
+from flask import (Response, jsonify, render_template, request, redirect, url_for)
 from flask_caching import Cache
 
 from db.DbWrapper import DbWrapper
 from madmin.functions import (auth_required, getCoordFloat, getBoundParameter,
                               get_geofences, generate_coords_from_geofence, Path)
+from madmin.maptilecache import MapElement, MapTileCache
 from utils.MappingManager import MappingManager
 from utils.collections import Location
-from utils.gamemechanicutil import get_raid_boss_cp
 from utils.questGen import generate_quest
 from utils.s2Helper import S2Helper
 from utils.logging import logger
-from utils.language import i8ln
+from utils.language import get_mon_name
 
 cache = Cache(config={'CACHE_TYPE': 'simple'})
 
@@ -31,6 +31,7 @@ class map(object):
 
         self._mapping_manager: MappingManager = mapping_manager
         self._data_manager = data_manager
+        self._tile_cache: MapTileCache = MapTileCache(self._args.madmin_map_cache_ttl)
 
         cache.init_app(self._app)
         self.add_route()
@@ -183,14 +184,13 @@ class map(object):
 
         return jsonify(coords)
 
-    @auth_required
-    def get_gymcoords(self):
+    def _get_cached_map_elements(self, kind, loader):
         neLat, neLon, swLat, swLon, oNeLat, oNeLon, oSwLat, oSwLon = getBoundParameter(request)
         timestamp = request.args.get("timestamp", None)
 
-        coords = []
-
-        data = self._db.get_gyms_in_rectangle(
+        data = self._tile_cache.get_json(
+            kind,
+            loader,
             neLat,
             neLon,
             swLat,
@@ -201,11 +201,14 @@ class map(object):
             oSwLon=oSwLon,
             timestamp=timestamp
         )
+        return Response(data, mimetype="application/json")
 
-        for gymid in data:
-            gym = data[str(gymid)]
+    def _load_gyms(self, *args, **kwargs) -> List[MapElement]:
+        data = self._db.get_gyms_in_rectangle(*args, **kwargs)
 
-            coords.append({
+        elements = []
+        for gymid, gym in data.items():
+            elements.append(MapElement(gym["latitude"], gym["longitude"], gym["last_updated"], None, json.dumps({
                 "id": gymid,
                 "name": gym["name"],
                 "img": gym["url"],
@@ -215,9 +218,13 @@ class map(object):
                 "last_updated": gym["last_updated"],
                 "last_scanned": gym["last_scanned"],
                 "raid": gym["raid"]
-            })
+            })))
 
-        return jsonify(coords)
+        return elements
+
+    @auth_required
+    def get_gymcoords(self):
+        return self._get_cached_map_elements("gyms", self._load_gyms)
 
     @auth_required
     def get_quests(self):
@@ -252,91 +259,52 @@ class map(object):
 
         return jsonify(coords)
 
-    @auth_required
-    def get_map_mons(self):
+    def _load_mons(self, *args, **kwargs) -> List[MapElement]:
         import traceback
-        neLat, neLon, swLat, swLon, oNeLat, oNeLon, oSwLat, oSwLon = getBoundParameter(request)
-        timestamp = request.args.get("timestamp", None)
-
-        data = self._db.get_mons_in_rectangle(
-            neLat=neLat,
-            neLon=neLon,
-            swLat=swLat,
-            swLon=swLon,
-            oNeLat=oNeLat,
-            oNeLon=oNeLon,
-            oSwLat=oSwLat,
-            oSwLon=oSwLon,
-            timestamp=timestamp
-        )
+        data = self._db.get_mons_in_rectangle(*args, **kwargs)
 
-        mons_raw = {}
+        elements = []
 
-        for i, mon in enumerate(data):
+        for mon in data:
             try:
-                id = data[i]["mon_id"]
-                if str(id) in mons_raw:
-                    mon_raw = mons_raw[str(id)]
-                else:
-                    mon_raw = get_raid_boss_cp(id)
-                    mons_raw[str(id)] = mon_raw
-
-                data[i]["encounter_id"] = str(data[i]["encounter_id"])
-                data[i]["name"] = i8ln(mon_raw["name"])
+                mon["encounter_id"] = str(mon["encounter_id"])
+                mon["name"] = get_mon_name(mon["mon_id"])
             except Exception:
                 traceback.print_exc()
 
-        return jsonify(data)
+            elements.append(MapElement(mon["latitude"], mon["longitude"], mon["last_modified"],
+                                       mon["disappear_time"], json.dumps(mon)))
+
+        return elements
 
     @auth_required
-    def get_cells(self):
-        neLat, neLon, swLat, swLon, oNeLat, oNeLon, oSwLat, oSwLon = getBoundParameter(request)
-        timestamp = request.args.get("timestamp", None)
+    def get_map_mons(self):
+        return self._get_cached_map_elements("mons", self._load_mons)
 
-        data = self._db.get_cells_in_rectangle(
-            neLat=neLat,
-            neLon=neLon,
-            swLat=swLat,
-            swLon=swLon,
-            oNeLat=oNeLat,
-            oNeLon=oNeLon,
-            oSwLat=oSwLat,
-            oSwLon=oSwLon,
-            timestamp=timestamp
-        )
+    def _load_cells(self, *args, **kwargs) -> List[MapElement]:
+        data = self._db.get_cells_in_rectangle(*args, **kwargs)
 
-        ret = []
+        elements = []
         for cell in data:
-            ret.append({
-                "id": str(cell["id"]),
-                "polygon": S2Helper.coords_of_cell(cell["id"]),
-                "updated": cell["updated"]
-            })
+            elements.append(MapElement(cell["center_latitude"], cell["center_longitude"], cell["updated"], None,
+                                       json.dumps({
+                                           "id": str(cell["id"]),
+                                           "polygon": S2Helper.coords_of_cell(cell["id"]),
+                                           "updated": cell["updated"]
+                                       })))
 
-        return jsonify(ret)
+        return elements
 
     @auth_required
-    def get_stops(self):
-        neLat, neLon, swLat, swLon, oNeLat, oNeLon, oSwLat, oSwLon = getBoundParameter(request)
-        timestamp = request.args.get("timestamp", None)
-
-        coords = []
+    def get_cells(self):
+        return self._get_cached_map_elements("cells", self._load_cells)
 
-        data = self._db.get_stops_in_rectangle(
-            neLat,
-            neLon,
-            swLat,
-            swLon,
-            oNeLat=oNeLat,
-            oNeLon=oNeLon,
-            oSwLat=oSwLat,
-            oSwLon=oSwLon,
-            timestamp=timestamp
-        )
+    def _load_stops(self, *args, **kwargs) -> List[MapElement]:
+        data = self._db.get_stops_in_rectangle(*args, **kwargs)
 
-        for stopid in data:
-            stop = data[str(stopid)]
-            coords.append({
+        elements = []
+        for stopid, stop in data.items():
+            elements.append(MapElement(stop["latitude"], stop["longitude"], stop["last_updated"], None, json.dumps({
                 "id": stopid,
                 "name": stop["name"],
                 "url": stop['image'],
@@ -348,9 +316,13 @@ class map(object):
                 "incident_start": stop["incident_start"],
                 "incident_expiration": stop["incident_expiration"],
                 "incident_grunt_type": stop["incident_grunt_type"]
-            })
+            })))
 
-        return jsonify(coords)
+        return elements
+
+    @auth_required
+    def get_stops(self):
+        return self._get_cached_map_elements("stops", self._load_stops)
 
     @logger.catch()
     @auth_required
@@ -1,9 +1,12 @@
+import time
 from multiprocessing import Queue, Process
 from datetime import datetime
+from queue import Empty
 
 from db.DbWrapper import DbWrapper
 from db.DbPogoProtoSubmit import DbPogoProtoSubmit
 from mitm_receiver.MitmMapper import MitmMapper
+from mitm_receiver.PlayerStatsAggregator import PlayerStatsAggregator
 from utils.logging import logger
 
 
@@ -15,6 +18,10 @@ class MitmDataProcessor(Process):
         self.__db_submit: DbPogoProtoSubmit = db_wrapper.proto_submit
         self.__application_args = application_args
         self.__mitm_mapper: MitmMapper = mitm_mapper
+        # stats of mons, raids and quests are counted locally and handed to the MitmMapper once per proto or batch
+        self.__stats_aggregator: PlayerStatsAggregator = PlayerStatsAggregator(application_args, mitm_mapper)
+        self.__batch_size: int = max(1, application_args.mitmreceiver_batch_size)
+        self.__batch_timeout: float = application_args.mitmreceiver_batch_timeout / 1000
 
     def run(self):
         # build a private DbWrapper instance...
@@ -37,12 +44,47 @@ class MitmDataProcessor(Process):
                 if item is None:
                     logger.warning("Received none from queue of data")
                     break
+
+                if self.__batch_size > 1:
+                    batch = self.__retrieve_batch(item)
+                    received_none = batch[-1] is None
+                    if received_none:
+                        batch.pop()
+                    self.process_batch(batch)
+                    for _ in range(len(batch) + int(received_none)):
+                        self.__queue.task_done()
+                    if received_none:
+                        logger.warning("Received none from queue of data")
+                        break
+                    continue
+
                 self.process_data(item[0], item[1], item[2])
                 self.__queue.task_done()
             except KeyboardInterrupt as e:
                 logger.info("MITMDataProcessor received keyboard interrupt, stopping")
                 break
 
+    def __retrieve_batch(self, first_item):
+        """
+        Drain further items off the queue until either the batch size is reached or the batch timeout passed.
+        A None retrieved from the queue ends the batch and is kept as the last element.
+        """
+        batch = [first_item]
+        deadline = time.time() + self.__batch_timeout
+        while len(batch) < self.__batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self.__queue.get(timeout=remaining)
+            except Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        logger.debug2("MITM data processing worker retrieved a batch of {} items", len(batch))
+        return batch
+
     def get_queue_items(self):
         try:
             items_left = self.__queue.qsize()
@@ -50,6 +92,37 @@ class MitmDataProcessor(Process):
             items_left = 0
         return items_left
 
+    @logger.catch
+    def process_batch(self, batch):
+        """
+        GMOs of the batch are submitted all at once, every other proto is processed one by one afterwards.
+        """
+        gmos = []
+        others = []
+        for received_timestamp, data, origin in batch:
+            if data.get("type", None) == 106 and not data.get("raw", False):
+                gmos.append((origin, data["payload"], received_timestamp))
+            else:
+                others.append((received_timestamp, data, origin))
+
+        if gmos:
+            for origin, payload, received_timestamp in gmos:
+                logger.debug2("Running stats collector of {}".format(origin))
+                if self.__application_args.game_stats:
+                    self.__mitm_mapper.run_stats_collector(origin)
+                logger.success("Processing GMO received from {}. Received at {}", str(
+                    origin), str(datetime.fromtimestamp(received_timestamp)))
+
+            self.__db_submit.gmos(gmos, self.__stats_aggregator, with_weather=self.__application_args.weather)
+
+            for origin, payload, _ in gmos:
+                self.__mitm_mapper.submit_gmo_for_location(origin, payload)
+            logger.debug2("Done processing batch of {} GMOs", len(gmos))
+
+        for received_timestamp, data, origin in others:
+            self.process_data(received_timestamp, data, origin)
+        self.__stats_aggregator.flush()
+
     @logger.catch
     def process_data(self, received_timestamp, data, origin):
         data_type = data.get("type", None)
@@ -74,11 +147,11 @@ class MitmDataProcessor(Process):
 
                 self.__db_submit.stops(origin, data["payload"])
                 self.__db_submit.gyms(origin, data["payload"])
-                self.__db_submit.raids(origin, data["payload"], self.__mitm_mapper)
+                self.__db_submit.raids(origin, data["payload"], self.__stats_aggregator)
 
                 self.__db_submit.spawnpoints(origin, data["payload"])
                 mon_ids_iv = self.__mitm_mapper.get_mon_ids_iv(origin)
-                self.__db_submit.mons(origin, data["payload"], mon_ids_iv, self.__mitm_mapper)
+                self.__db_submit.mons(origin, data["payload"], mon_ids_iv, self.__stats_aggregator)
                 self.__db_submit.cells(origin, data["payload"])
                 self.__mitm_mapper.submit_gmo_for_location(origin, data["payload"])
                 logger.debug2("Done processing GMO of {}".format(origin))
@@ -86,13 +159,13 @@ class MitmDataProcessor(Process):
                 playerlevel = self.__mitm_mapper.get_playerlevel(origin)
                 if playerlevel >= 30:
                     logger.info("Processing Encounter received from {} at {}", str(origin), str(received_timestamp))
-                    self.__db_submit.mon_iv(origin, received_timestamp, data["payload"], self.__mitm_mapper)
+                    self.__db_submit.mon_iv(origin, received_timestamp, data["payload"], self.__stats_aggregator)
                     logger.debug2("Done processing encounter of {}".format(origin))
                 else:
                     logger.debug('Playerlevel lower than 30 - not processing encounter Data')
             elif data_type == 101:
                 logger.debug2("Processing proto 101 of {}".format(origin))
-                self.__db_submit.quest(origin, data["payload"], self.__mitm_mapper)
+                self.__db_submit.quest(origin, data["payload"], self.__stats_aggregator)
                 logger.debug2("Done processing proto 101 of {}".format(origin))
             elif data_type == 104:
                 logger.debug2("Processing proto 104 of {}".format(origin))
@@ -106,3 +179,4 @@ class MitmDataProcessor(Process):
                 logger.debug2("Processing proto 156 of {}".format(origin))
                 self.__db_submit.gym(origin, data["payload"])
                 logger.debug2("Done processing proto 156 of {}".format(origin))
+            self.__stats_aggregator.flush()
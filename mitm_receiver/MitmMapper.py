@@ -2,7 +2,7 @@ import time
 from queue import Empty
 from multiprocessing import Lock, Queue
 from multiprocessing.managers import SyncManager
-from threading import Thread, Event
+from threading import Condition, Thread, Event
 from typing import Dict
 
 from db.DbStatsSubmit import DbStatsSubmit
@@ -24,6 +24,10 @@ class MitmMapper(object):
         self.__mapping = {}
         self.__playerstats: Dict[str, PlayerStats] = {}
         self.__mapping_mutex = Lock()
+        # counts the updates of the latest data per origin, waiters are notified by the condition of the origin
+        self.__latest_updates: Dict[str, int] = {}
+        self.__latest_conditions: Dict[str, Condition] = {}
+        self.__latest_conditions_mutex = Lock()
         self.__mapping_manager: MappingManager = mapping_manager
         self.__injected = {}
         self.__last_cellsid = {}
@@ -145,8 +149,34 @@ class MitmMapper(object):
                 logger.warning(
                     "Not updating timestamp of {} since origin is unknown", str(origin))
         logger.debug3("Done updating proto {} of {}".format(key, origin))
+        if updated:
+            condition = self.__get_latest_condition(origin)
+            with condition:
+                self.__latest_updates[origin] = self.__latest_updates.get(origin, 0) + 1
+                condition.notify_all()
         return updated
 
+    def __get_latest_condition(self, origin: str) -> Condition:
+        with self.__latest_conditions_mutex:
+            if origin not in self.__latest_conditions:
+                self.__latest_conditions[origin] = Condition()
+            return self.__latest_conditions[origin]
+
+    def wait_for_latest(self, origin: str, last_update: int, timeout: float):
+        """
+        Blocks until the latest data of origin has been updated after the update last_update or until timeout passed.
+        Calls of the manager are handled by a thread per connection, only the calling worker is blocked.
+        :param origin: the origin to wait for
+        :param last_update: counter of the update seen by the caller, -1 to return without waiting
+        :param timeout: seconds to wait at most
+        :return: tuple of the counter of the latest update and the latest data of origin (see request_latest)
+        """
+        condition = self.__get_latest_condition(origin)
+        with condition:
+            condition.wait_for(lambda: self.__latest_updates.get(origin, 0) != last_update, timeout=timeout)
+            update = self.__latest_updates.get(origin, 0)
+        return update, self.request_latest(origin)
+
     def set_injection_status(self, origin, status=True):
         self.__injected[origin] = status
 
@@ -185,6 +215,11 @@ class MitmMapper(object):
         if self.__playerstats.get(origin, None) is not None:
             self.__playerstats.get(origin).stats_collect_quest(stop_id)
 
+    def collect_aggregated_stats(self, aggregated_stats: dict):
+        for origin, aggregated in aggregated_stats.items():
+            if self.__playerstats.get(origin, None) is not None:
+                self.__playerstats.get(origin).stats_collect_aggregated(aggregated)
+
     def generate_player_stats(self, origin: str, inventory_proto: dict):
         if self.__playerstats.get(origin, None) is not None:
             self.__playerstats.get(origin).gen_player_stats(inventory_proto)
@@ -172,6 +172,34 @@ class PlayerStats(object):
             else:
                 self.__stats_collected[106]['quest'][stop_id] += 1
 
+    def stats_collect_aggregated(self, aggregated: dict):
+        """
+        Merge the counts of mons, mon IVs, raids and quests collected by a PlayerStatsAggregator
+        """
+        if not self._generate_stats:
+            return
+        with self.__mapping_mutex:
+            for proto, kinds in aggregated.items():
+                if proto not in self.__stats_collected:
+                    self.__stats_collected[proto] = {}
+
+                for kind, counts in kinds.items():
+                    if kind not in self.__stats_collected[proto]:
+                        self.__stats_collected[proto][kind] = {}
+
+                    if kind + '_count' not in self.__stats_collected[proto]:
+                        self.__stats_collected[proto][kind + '_count'] = 0
+
+                    collected = self.__stats_collected[proto][kind]
+                    for identifier, count in counts.items():
+                        if identifier not in collected:
+                            collected[identifier] = count
+                            self.__stats_collected[proto][kind + '_count'] += 1
+                        elif kind == 'mon_iv':
+                            collected[identifier]['count'] += count['count']
+                        else:
+                            collected[identifier] += count
+
     def stats_collect_location_data(self, location, datarec, start_timestamp, type, rec_timestamp, walker,
                                     transporttype):
         if not self._generate_stats:
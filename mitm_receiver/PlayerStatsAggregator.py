@@ -0,0 +1,51 @@
+from mitm_receiver.MitmMapper import MitmMapper
+from utils.logging import logger
+
+
+class PlayerStatsAggregator(object):
+    """
+    Counts the mons, mon IVs, raids and quests seen by a MitmDataProcessor within its own process.
+    Offers the collect_* methods of MitmMapper used by DbPogoProtoSubmit, the counts of all origins are handed to
+    the PlayerStats of the MitmMapper by a single call in flush instead of a call per entity.
+    """
+
+    def __init__(self, application_args, mitm_mapper: MitmMapper):
+        self.__generate_stats = application_args.game_stats
+        self.__mitm_mapper: MitmMapper = mitm_mapper
+        self.__aggregated: dict = {}
+
+    def __get_counts(self, origin: str, proto: int, kind: str) -> dict:
+        return self.__aggregated.setdefault(origin, {}).setdefault(proto, {}).setdefault(kind, {})
+
+    def __count(self, origin: str, proto: int, kind: str, identifier):
+        counts = self.__get_counts(origin, proto, kind)
+        counts[identifier] = counts.get(identifier, 0) + 1
+
+    def collect_raid_stats(self, origin: str, gym_id: str):
+        if self.__generate_stats:
+            self.__count(origin, 106, 'raid', gym_id)
+
+    def collect_mon_stats(self, origin: str, encounter_id: str):
+        if self.__generate_stats:
+            self.__count(origin, 106, 'mon', encounter_id)
+
+    def collect_mon_iv_stats(self, origin: str, encounter_id: str, shiny: int):
+        if not self.__generate_stats:
+            return
+        counts = self.__get_counts(origin, 102, 'mon_iv')
+        if encounter_id not in counts:
+            counts[encounter_id] = {'count': 1, 'shiny': shiny}
+        else:
+            counts[encounter_id]['count'] += 1
+
+    def collect_quest_stats(self, origin: str, stop_id: str):
+        if self.__generate_stats:
+            self.__count(origin, 106, 'quest', stop_id)
+
+    def flush(self):
+        if not self.__aggregated:
+            return
+        aggregated = self.__aggregated
+        self.__aggregated = {}
+        logger.debug3("Flushing aggregated stats of {} origins", len(aggregated))
+        self.__mitm_mapper.collect_aggregated_stats(aggregated)
@@ -4,10 +4,14 @@ import cv2
 import imutils
 import numpy as np
 sys.path.append("..")
+from utils.image_utils import read_gray_image
 from utils.logging import logger
 from utils.collections import Trash
 from typing import List
 
+# template of the trash icon, read once
+_trash_template = None
+
 
 def get_delete_quest_coords(x):
     click_x = int(x) / 1.07
@@ -20,16 +24,17 @@ def get_delete_item_coords(x):
 
 
 def trash_image_matching(screen_img):
+    global _trash_template
     clicklist: List[Trash] = []
-    screen = cv2.imread(screen_img)
-    # print (screen.shape[:2])
-    screen = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+    screen = read_gray_image(screen_img)
 
     if screen is None:
         logger.error('trash_image_matching: {} appears to be corrupted', str(screen_img))
         return None
 
-    trash = cv2.imread('utils/trashcan.png', 0)
+    if _trash_template is None:
+        _trash_template = cv2.imread('utils/trashcan.png', 0)
+    trash = _trash_template
 
     height, width = screen.shape
     _quest_x = get_delete_quest_coords(width)
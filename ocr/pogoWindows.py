@@ -12,6 +12,7 @@ import pytesseract
 from pytesseract import Output
 from PIL import Image
 
+from utils.image_utils import image_exists, open_image, read_image
 from utils.logging import logger
 from ocr.matching_trash import trash_image_matching
 
@@ -56,7 +57,7 @@ class PogoWindows:
                                       'found.', 'gefunden.', 'Signal']
 
     def __most_present_colour(self, filename, max_colours):
-        with Image.open(filename) as img:
+        with open_image(filename) as img:
             # put a higher value if there are many colors in your image
             colors = img.getcolors(max_colours)
         max_occurrence, most_present = 0, 0
@@ -70,20 +71,20 @@ class PogoWindows:
 
     def is_gps_signal_lost(self, filename, identifier):
         # run the check for the file here once before having the subprocess check it (as well)
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("isGpsSignalLost: {} does not exist", str(filename))
             return None
 
         return self.__thread_pool.apply_async(self.__internal_is_gps_signal_lost, (filename, identifier)).get()
 
     def __internal_is_gps_signal_lost(self, filename, identifier):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("isGpsSignalLost: {} does not exist", str(filename))
             return None
 
         logger.debug("isGpsSignalLost: checking for red bar")
         try:
-            col = cv2.imread(filename)
+            col = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return True
@@ -95,15 +96,10 @@ class PogoWindows:
         width, height, _ = col.shape
 
         gpsError = col[0:int(math.floor(height / 7)), 0:width]
-
-        tempPathColoured = self.temp_dir_path + "/" + str(identifier) + "_gpsError.png"
-        cv2.imwrite(tempPathColoured, gpsError)
-
-        with Image.open(tempPathColoured) as col:
-            width, height = col.size
+        height, width, _ = gpsError.shape
 
         # check for the colour of the GPS error
-        if self.__most_present_colour(tempPathColoured, width * height) == (240, 75, 95):
+        if self.__most_present_colour(gpsError, width * height) == (240, 75, 95):
             return True
         else:
             return False
@@ -113,7 +109,7 @@ class PogoWindows:
         logger.debug("__read_circle_count: Reading circles")
 
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return -1
@@ -186,7 +182,7 @@ class PogoWindows:
         logger.debug("__readCircleCords: Reading circlescords")
 
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return False
@@ -232,14 +228,14 @@ class PogoWindows:
             return False, 0, 0, 0, 0
 
     def get_trash_click_positions(self, filename):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("get_trash_click_positions: {} does not exist", str(filename))
             return None
 
         return self.__thread_pool.apply_async(trash_image_matching, (filename,)).get()
 
     def read_amount_raid_circles(self, filename, identifier, communicator):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("read_amount_raid_circles: {} does not exist", str(filename))
             return 0
 
@@ -267,7 +263,7 @@ class PogoWindows:
         return -1
 
     def look_for_button(self, filename, ratiomin, ratiomax, communicator, upper: bool = False):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("look_for_button: {} does not exist", str(filename))
             return False
 
@@ -278,7 +274,7 @@ class PogoWindows:
         logger.debug("lookForButton: Reading lines")
         disToMiddleMin = None
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
             gray = cv2.cvtColor(screenshot_read, cv2.COLOR_BGR2GRAY)
         except:
             logger.error("Screenshot corrupted :(")
@@ -407,7 +403,7 @@ class PogoWindows:
         if leftSide:
             logger.debug("__check_raid_line: Check nearby open ")
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return False
@@ -415,7 +411,7 @@ class PogoWindows:
             logger.error("Screenshot corrupted :(")
             return False
 
-        if self.__read_circle_count(os.path.join('', filename), identifier, float(11), communicator, xcord=False, crop=True,
+        if self.__read_circle_count(screenshot_read, identifier, float(11), communicator, xcord=False, crop=True,
                                     click=False, canny=True) == -1:
             logger.debug("__check_raid_line: Not active")
             return False
@@ -468,13 +464,13 @@ class PogoWindows:
         return False
 
     def __check_orange_raid_circle_present(self, filename, identifier, communicator):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             return None
 
         logger.debug("__check_orange_raid_circle_present: Cropping circle")
 
         try:
-            image = cv2.imread(filename)
+            image = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return False
@@ -484,25 +480,18 @@ class PogoWindows:
 
         height, width, _ = image.shape
         image = image[int(height / 2 - (height / 3))                      :int(height / 2 + (height / 3)), 0:int(width)]
-        cv2.imwrite(os.path.join(self.temp_dir_path, str(
-            identifier) + '_AmountOfRaids.jpg'), image)
 
-        if self.__read_circle_count(os.path.join(self.temp_dir_path, str(identifier) + '_AmountOfRaids.jpg'), identifier, 18,
-                                    communicator) > 0:
+        if self.__read_circle_count(image, identifier, 18, communicator) > 0:
             logger.info(
                 "__check_orange_raid_circle_present: Raidcircle found, assuming raids nearby")
-            os.remove(os.path.join(self.temp_dir_path,
-                                   str(identifier) + '_AmountOfRaids.jpg'))
             return True
         else:
             logger.info(
                 "__check_orange_raid_circle_present: No raidcircle found, assuming no raids nearby")
-            os.remove(os.path.join(self.temp_dir_path,
-                                   str(identifier) + '_AmountOfRaids.jpg'))
             return False
 
     def check_raidscreen(self, filename, identifier, communicator):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("check_raidscreen: {} does not exist", str(filename))
             return None
 
@@ -526,7 +515,7 @@ class PogoWindows:
         return False
 
     def check_nearby(self, filename, identifier, communicator):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("check_nearby: {} does not exist", str(filename))
             return False
 
@@ -535,7 +524,7 @@ class PogoWindows:
 
     def __internal_check_nearby(self, filename, identifier, communicator):
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             return False
@@ -560,27 +549,24 @@ class PogoWindows:
         return False
 
     def __check_close_present(self, filename, identifier, communicator,  radiusratio=12, Xcord=True):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.warning(
                 "__check_close_present: {} does not exist", str(filename))
             return False
 
         try:
-            image = cv2.imread(filename)
+            image = read_image(filename)
             height, width, _ = image.shape
         except:
             logger.error("Screenshot corrupted :(")
             return False
 
-        cv2.imwrite(os.path.join(self.temp_dir_path,
-                                 str(identifier) + '_exitcircle.jpg'), image)
-
-        if self.__read_circle_count(os.path.join(self.temp_dir_path, str(identifier) + '_exitcircle.jpg'), identifier,
-                                  float(radiusratio), communicator, xcord=False, crop=True, click=True, canny=True) > 0:
+        if self.__read_circle_count(image, identifier, float(radiusratio), communicator, xcord=False, crop=True,
+                                    click=True, canny=True) > 0:
             return True
 
     def check_close_except_nearby_button(self, filename, identifier, communicator, close_raid=False):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("check_close_except_nearby_button: {} does not exist", str(filename))
             return False
 
@@ -593,7 +579,7 @@ class PogoWindows:
             "__internal_check_close_except_nearby_button: Checking close except nearby with: file {}, identifier {}",
                 filename, identifier)
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except:
             logger.error("Screenshot corrupted :(")
             logger.debug(
@@ -607,7 +593,7 @@ class PogoWindows:
         if not close_raid:
             logger.debug(
                 "__internal_check_close_except_nearby_button: Raid is not to be closed...")
-            if (not os.path.isfile(filename)
+            if (not image_exists(filename)
                     or self.__check_raid_line(filename, identifier, communicator)
                     or self.__check_raid_line(filename, identifier, communicator, True)):
                 # file not found or raid tab present
@@ -644,7 +630,7 @@ class PogoWindows:
             return False
         
     def get_inventory_text(self, filename, identifier, x1, x2, y1, y2):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("get_inventory_text: {} does not exist", str(filename))
             return ""
 
@@ -652,8 +638,7 @@ class PogoWindows:
                                               (filename, identifier, x1, x2, y1, y2)).get()
 
     def __internal_get_inventory_text(self, filename, identifier, x1, x2, y1, y2):
-        screenshot_read = cv2.imread(filename)
-        temp_path_item = self.temp_dir_path + "/" + str(identifier) + "_inventory.png"
+        screenshot_read = read_image(filename)
         h = x1 - x2
         w = y1 - y2
         gray = cv2.cvtColor(screenshot_read, cv2.COLOR_BGR2GRAY)
@@ -665,13 +650,12 @@ class PogoWindows:
 
         # resize image
         gray = cv2.resize(gray, dim, interpolation=cv2.INTER_AREA)
-        cv2.imwrite(temp_path_item, gray)
-        with Image.open(temp_path_item) as im:
+        with Image.fromarray(gray) as im:
             text = pytesseract.image_to_string(im)
         return text
 
     def check_pogo_mainscreen(self, filename, identifier):
-        if not os.path.isfile(filename):
+        if not image_exists(filename):
             logger.error("check_pogo_mainscreen: {} does not exist", str(filename))
             return False
 
@@ -683,7 +667,7 @@ class PogoWindows:
                      filename, identifier)
         mainscreen = 0
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             logger.debug(
@@ -720,7 +704,7 @@ class PogoWindows:
         logger.debug(
             "checkCloseButton: Checking close with: file {}, identifier {}", filename, identifier)
         try:
-            screenshot_read = cv2.imread(filename)
+            screenshot_read = read_image(filename)
         except Exception:
             logger.error("Screenshot corrupted :(")
             logger.debug("checkCloseButton: Screenshot corrupted...")
@@ -795,7 +779,7 @@ class PogoWindows:
     def __most_frequent_colour_internal(self, image, identifier):
         logger.debug(
             "most_frequent_colour_internal: Reading screen text - identifier {}", identifier)
-        with Image.open(image) as img:
+        with open_image(image) as img:
             w, h = img.size
             pixels = img.getcolors(w * h)
             most_frequent_pixel = pixels[0]
@@ -821,7 +805,7 @@ class PogoWindows:
         logger.debug(
             "__screendetection_get_type_internal: Detecting screen type - identifier {}", identifier)
 
-        with Image.open(image) as frame_org:
+        with open_image(image) as frame_org:
             width, height = frame_org.size
 
             logger.debug("Screensize of origin {}: W:{} x H:{}".format(str(identifier), str(width), str(height)))
@@ -4,13 +4,13 @@ import re
 
 import xml.etree.ElementTree as ET
 from utils.logging import logger
-from utils.MappingManager import MappingManager
+from utils.MappingManager import DevicemappingsSnapshot, MappingManager
 from typing import Optional, List
 from utils.collections import Login_PTC, Login_GGL
 from enum import Enum
 import numpy as np
+from utils.image_utils import Screenshot, open_image
 from utils.madGlobals import ScreenshotType
-from PIL import Image
 import gc
 
 class ScreenType(Enum):
@@ -51,6 +51,7 @@ class WordToScreenMatching(object):
         self._id = id
         self._applicationArgs = args
         self._mapping_manager = mapping_mananger
+        self._devicemappings: DevicemappingsSnapshot = DevicemappingsSnapshot(mapping_mananger, id)
         self._ratio: float = 0.0
 
         self._logintype: LoginType = -1
@@ -153,7 +154,6 @@ class WordToScreenMatching(object):
     def matchScreen(self):
         globaldict: dict = {}
         pogoTopmost = self._communicator.isPogoTopmost()
-        screenpath = self.get_screenshot_path()
         topmostapp = self._communicator.topmostApp()
         if not topmostapp:
             return ScreenType.ERROR
@@ -180,7 +180,7 @@ class WordToScreenMatching(object):
                 return ScreenType.ERROR
 
             returntype, globaldict, self._width, self._height, diff = \
-                self._pogoWindowManager.screendetection_get_type(screenpath, self._id)
+                self._pogoWindowManager.screendetection_get_type(self.get_screenshot(), self._id)
 
             if not globaldict:
                 self._nextscreen = ScreenType.UNDEFINED
@@ -195,6 +195,7 @@ class WordToScreenMatching(object):
                 logger.error('Error while text detection')
                 return ScreenType.ERROR
 
+        screenpath = self.get_screenshot()
         if ScreenType(returntype) != ScreenType.UNDEFINED:
             logger.info("Processing Screen: {}", str(ScreenType(returntype)))
 
@@ -451,7 +452,7 @@ class WordToScreenMatching(object):
 
     def checkQuest(self, screenpath):
 
-        with Image.open(screenpath) as frame:
+        with open_image(screenpath) as frame:
             frame = frame.convert('LA')
 
             globaldict = self._pogoWindowManager.get_screen_text(frame, self._id)
@@ -531,19 +532,16 @@ class WordToScreenMatching(object):
         return False
 
     def set_devicesettings_value(self, key: str, value):
-        self._mapping_manager.set_devicesetting_value_of(self._id, key, value)
+        self._devicemappings.set_devicesettings_value(key, value)
 
     def get_devicesettings_value(self, key: str, default_value: object = None):
         logger.debug2("Fetching devicemappings of {}".format(self._id))
         try:
-            devicemappings: Optional[dict] = self._mapping_manager.get_devicemappings_of(self._id)
+            return self._devicemappings.get_devicesettings_value(key, default_value)
         except (EOFError, FileNotFoundError) as e:
             logger.warning("Failed fetching devicemappings in worker {} with description: {}. Stopping worker"
                            .format(str(self._id), str(e)))
             return None
-        if devicemappings is None:
-            return default_value
-        return devicemappings.get("settings", {}).get(key, default_value)
     
     def censor_account(self, emailaddress, isPTC=False):
         # PTC account
@@ -581,6 +579,12 @@ class WordToScreenMatching(object):
         return os.path.join(
                 self._applicationArgs.temp_path, screenshot_filename)
 
+    def get_screenshot(self):
+        screenshot: Optional[Screenshot] = self._communicator.get_last_screenshot()
+        if screenshot is not None:
+            return screenshot
+        return self.get_screenshot_path()
+
     def _takeScreenshot(self, delayAfter=0.0, delayBefore=0.0, errorscreen: bool = False):
         logger.debug("Taking screenshot...")
         time.sleep(delayBefore)
@@ -592,10 +596,13 @@ class WordToScreenMatching(object):
 
         screenshot_quality: int = 80
 
-        take_screenshot = self._communicator.get_screenshot(self.get_screenshot_path(fileaddon=errorscreen),
-                                                            screenshot_quality, screenshot_type)
+        screenshot: Optional[Screenshot] = self._communicator.get_screenshot_in_memory(screenshot_quality,
+                                                                                      screenshot_type)
+        if screenshot is not None and (errorscreen or self._applicationArgs.save_screenshots
+                                       or self._applicationArgs.with_madmin):
+            screenshot.save(self.get_screenshot_path(fileaddon=errorscreen))
 
-        if not take_screenshot:
+        if screenshot is None:
             logger.error("takeScreenshot: Failed retrieving screenshot")
             logger.debug("Failed retrieving screenshot")
             return False
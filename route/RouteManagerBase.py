@@ -100,7 +100,8 @@ class RouteManagerBase(ABC):
                 fenced_coords = self.geofence_helper.get_geofenced_coordinates(
                     coords)
             new_coords = self._route_resource.getJsonRoute(fenced_coords, max_radius, max_coords_within_radius,
-                                                           algorithm=calctype)
+                                                           algorithm=calctype,
+                                                           local_search_time=args.route_calc_local_search_time)
             for coord in new_coords:
                 self._route.append(Location(coord["lat"], coord["lng"]))
         self._current_index_of_route = 0
@@ -116,6 +117,11 @@ class RouteManagerBase(ABC):
 
         # initialize priority queue variables
         self._prio_queue = None
+        # clusters of the priority queue along with the events they cover, the events clustered and the number of
+        # events changed since the entire queue has been clustered. Only touched by the thread updating the queue
+        self._prio_queue_clusters: List[Tuple[tuple, List[tuple]]] = []
+        self._prio_queue_events = set()
+        self._prio_queue_changes_since_clustered = 0
         self._update_prio_queue_thread = None
         self._check_routepools_thread = None
         self._stop_update_thread = Event()
@@ -246,6 +252,9 @@ class RouteManagerBase(ABC):
             if self._stop_update_thread.is_set():
                 self._stop_update_thread.clear()
             self._prio_queue = []
+            self._prio_queue_clusters = []
+            self._prio_queue_events = set()
+            self._prio_queue_changes_since_clustered = 0
             if self.mode not in ["iv_mitm", "pokestops"]:
                 self.clustering_helper = ClusteringHelper(self._max_radius,
                                                           self._max_coords_within_radius,
@@ -280,7 +289,8 @@ class RouteManagerBase(ABC):
                                                             delete_old_route, self._calctype, self.useS2, self.S2level,
                                                             num_procs=0,
                                                             overwrite_calculation=self._overwrite_calculation,
-                                                            in_memory=in_memory)
+                                                            in_memory=in_memory,
+                                                            local_search_time=args.route_calc_local_search_time)
         if self._overwrite_calculation:
             self._overwrite_calculation = False
         return new_route
@@ -314,21 +324,17 @@ class RouteManagerBase(ABC):
             # newQueue = self._db_wrapper.get_next_raid_hatches(self._delayAfterHatch, self._geofenceHelper)
             new_queue = self._retrieve_latest_priority_queue()
             self._merge_priority_queue(new_queue)
-            redocounter = 0
-            while redocounter <= self._priority_queue_update_interval() and not self._stop_update_thread.is_set():
-                redocounter += 1
-                time.sleep(1)
-                if self._stop_update_thread.is_set():
-                    logger.info("Kill Prio Queue loop while sleeping")
-                    break
+            if self._stop_update_thread.wait(self._priority_queue_update_interval() + 1):
+                logger.info("Kill Prio Queue loop while sleeping")
 
     def _merge_priority_queue(self, new_queue):
         if new_queue is not None:
+            merged = list(new_queue)
+            logger.info("New raw priority queue with {} entries", len(merged))
+            # clustering is done without holding the manager mutex, workers only wait for the queue to be swapped
+            merged = self._filter_priority_queue_internal(merged)
+            heapq.heapify(merged)
             with self._manager_mutex:
-                merged = list(new_queue)
-                logger.info("New raw priority queue with {} entries", len(merged))
-                merged = self._filter_priority_queue_internal(merged)
-                heapq.heapify(merged)
                 self._prio_queue = merged
             logger.info("New clustered priority queue with {} entries", len(merged))
             logger.debug("Priority queue entries: {}", str(merged))
@@ -450,10 +456,7 @@ class RouteManagerBase(ABC):
             # exclude IV prioQ to also pass encounterIDs since we do not pass additional information through when
             # clustering
             return latest
-        delete_seconds_passed = 0
-        if self.settings is not None:
-            delete_seconds_passed = self.settings.get(
-                "remove_from_queue_backlog", 0)
+        delete_seconds_passed = self.__get_priority_queue_backlog()
 
         if delete_seconds_passed is not None:
             delete_before = time.time() - delete_seconds_passed
@@ -462,9 +465,56 @@ class RouteManagerBase(ABC):
         latest = [to_keep for to_keep in latest if not to_keep[0] < delete_before]
         # TODO: sort latest by modified flag of event
         # merged = self._merge_queue(latest, self._max_radius, 2, timedelta_seconds)
-        merged = self.clustering_helper.get_clustered(latest)
+        merged = self.__update_priority_queue_clusters(latest)
         return merged
 
+    def __update_priority_queue_clusters(self, latest):
+        """
+        Clusters the events of the latest priority queue. Events are mostly the same in between consecutive updates,
+        only the neighbourhood of events added or removed since the last update is clustered again. Clustering
+        neighbourhoods is not as thorough as clustering the entire queue, the entire queue is clustered again once
+        half of it has been changed
+        """
+        # drop duplicates, keeping the order of the queue
+        latest_events = set()
+        latest = [event for event in latest if not (event in latest_events or latest_events.add(event))]
+        added = [event for event in latest if event not in self._prio_queue_events]
+        removed = [event for event in self._prio_queue_events if event not in latest_events]
+
+        self._prio_queue_changes_since_clustered += len(added) + len(removed)
+        if not self._prio_queue_clusters or self._prio_queue_changes_since_clustered > len(latest) / 2:
+            clusters = self.clustering_helper.get_clustered_with_members(latest)
+            self._prio_queue_changes_since_clustered = 0
+        else:
+            logger.debug("Updating clustered priority queue of route {}: {} events added, {} events removed",
+                         self.name, len(added), len(removed))
+            clusters = self.clustering_helper.update_clustered(self._prio_queue_clusters, added, removed)
+
+        self._prio_queue_clusters = clusters
+        self._prio_queue_events = latest_events
+        return [cluster[0] for cluster in clusters]
+
+    def __get_priority_queue_backlog(self):
+        delete_seconds_passed = 0
+        if self.settings is not None:
+            delete_seconds_passed = self.settings.get(
+                "remove_from_queue_backlog", 0)
+        return delete_seconds_passed
+
+    def __drop_expired_priority_events(self):
+        """
+        Drops events at the top of the priority queue that have been due for more than remove_from_queue_backlog
+        seconds, events of the queue are dropped lazily in between updates of the queue. Needs the manager mutex
+        """
+        delete_seconds_passed = self.__get_priority_queue_backlog()
+        if not delete_seconds_passed or self.mode == "iv_mitm" or not self._prio_queue:
+            return
+        delete_before = time.time() - delete_seconds_passed
+        while self._prio_queue and self._prio_queue[0][0] < delete_before:
+            dropped = heapq.heappop(self._prio_queue)
+            logger.debug("Dropping expired priority event at {}, {} of route {}", dropped[1].lat, dropped[1].lng,
+                         self.name)
+
     def __set_routepool_entry_location(self, origin: str, pos: Location):
         with self._manager_mutex:
             if self._routepool.get(origin, None) is not None:
@@ -526,6 +576,7 @@ class RouteManagerBase(ABC):
             # check priority queue for items of priority that are past our time...
             # if that is not the case, simply increase the index in route and return the location on route
 
+            self.__drop_expired_priority_events()
             # determine whether we move to the next location or the prio queue top's item
             if (self.delay_after_timestamp_prio is not None and ((not self._last_round_prio.get(origin, False)
                                                                   or self.starve_route)
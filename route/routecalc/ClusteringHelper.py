@@ -1,5 +1,11 @@
+import math
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
 from utils.collections import Relation
-from utils.geo import (get_distance_of_two_points_in_meters,
+from utils.geo import (EARTH_RADIUS_METERS,
+                       get_distances_to_point_in_meters,
                        get_middle_of_coord_list)
 import s2sphere
 from utils.s2Helper import S2Helper
@@ -14,30 +20,69 @@ class ClusteringHelper:
         self.S2level = S2level
 
     def _get_relations_in_range_within_time(self, queue, max_radius):
+        """
+        Build the relations of every event to the events within 2 * max_radius and max_timedelta_seconds before it.
+        Events are bucketed in a grid with cells of 2 * max_radius metres, sorted by timestamp, so only the events
+        of the neighbouring cells within the time window need to be inspected.
+        """
         relations = {}
+        if not queue:
+            return relations
+
+        # 1 metre of slack covers the error of the planar projection compared to the haversine distance
+        cell_size = max_radius * 2 + 1
+        # use the smallest scale of longitudes amongst the events, this way projected distances never exceed the real
+        # distances and every event within range is located in a neighbouring cell
+        lng_factor = min(math.cos(math.radians(event[1].lat)) for event in queue)
+        grid = {}
+        for index, event in enumerate(queue):
+            grid.setdefault(self._get_grid_cell(event[1], cell_size, lng_factor), []).append((event[0], index, event))
+        for cell_events in grid.values():
+            cell_events.sort(key=lambda cell_event: cell_event[0])
+        grid = {cell: ([cell_event[0] for cell_event in cell_events], cell_events)
+                for cell, cell_events in grid.items()}
+
         for event in queue:
-            for other_event in queue:
-                if (event[1].lat == other_event[1].lat and event[1].lng == other_event[1].lng
-                        and event not in relations.keys()):
-                    relations[event] = []
-                distance = get_distance_of_two_points_in_meters(event[1].lat, event[1].lng,
-                                                                other_event[1].lat, other_event[1].lng)
-                # we will always build relations from the event at hand subtracted by the event inspected
-                timedelta = event[0] - other_event[0]
-                if 0 <= distance <= max_radius * 2 and 0 <= timedelta <= self.max_timedelta_seconds:
-                    if event not in relations.keys():
-                        relations[event] = []
-                    # avoid duplicates
-                    already_present = False
-                    for relation in relations[event]:
-                        if (relation[0][1].lat == other_event[1].lat
-                                and relation[0][1].lng == other_event[1].lng):
-                            already_present = True
-                    if not already_present:
-                        relations[event].append(
-                            Relation(other_event, distance, timedelta))
+            if event in relations:
+                continue
+            cell_lat, cell_lng = self._get_grid_cell(event[1], cell_size, lng_factor)
+            candidates = []
+            for neighbour_lat in range(cell_lat - 1, cell_lat + 2):
+                for neighbour_lng in range(cell_lng - 1, cell_lng + 2):
+                    neighbour = grid.get((neighbour_lat, neighbour_lng), None)
+                    if neighbour is None:
+                        continue
+                    timestamps, cell_events = neighbour
+                    # we will always build relations from the event at hand subtracted by the event inspected
+                    start = bisect_left(timestamps, event[0] - self.max_timedelta_seconds)
+                    end = bisect_right(timestamps, event[0])
+                    candidates.extend(cell_events[start:end])
+            # inspect in order of the queue, the first event at given coords is the one to keep
+            candidates.sort(key=lambda cell_event: cell_event[1])
+
+            distances = get_distances_to_point_in_meters(
+                event[1].lat, event[1].lng,
+                [(other_event[1].lat, other_event[1].lng) for _, _, other_event in candidates]).tolist()
+
+            event_relations = set()
+            related_coords = set()
+            for (timestamp, _, other_event), distance in zip(candidates, distances):
+                coords = (other_event[1].lat, other_event[1].lng)
+                # avoid duplicates
+                if coords in related_coords:
+                    continue
+                if 0 <= distance <= max_radius * 2:
+                    related_coords.add(coords)
+                    event_relations.add(Relation(other_event, distance, event[0] - timestamp))
+            relations[event] = event_relations
         return relations
 
+    @staticmethod
+    def _get_grid_cell(location, cell_size, lng_factor):
+        meters_per_degree = EARTH_RADIUS_METERS * math.pi / 180
+        return (int(math.floor(location.lat * meters_per_degree / cell_size)),
+                int(math.floor(location.lng * meters_per_degree * lng_factor / cell_size)))
+
     def _get_most_west_amongst_relations(self, relations):
         selected = list(relations.keys())[0]
         for event in relations.keys():
@@ -67,14 +112,14 @@ class ClusteringHelper:
         if self.useS2: 
             region = s2sphere.CellUnion(S2Helper.get_S2cells_from_circle(middle.lat, middle.lng, self.max_radius, self.S2level))
 
-        for event_relations in relations:
+        events = list(relations)
+        distances = get_distances_to_point_in_meters(
+            middle.lat, middle.lng, [(event[1].lat, event[1].lng) for event in events]).tolist()
+        for event_relations, distance in zip(events, distances):
             # exclude previously clustered events...
             if len(event_relations) == 4 and event_relations[3]:
                 inside_circle.append(event_relations)
                 continue
-            distance = get_distance_of_two_points_in_meters(middle.lat, middle.lng,
-                                                            event_relations[1].lat,
-                                                            event_relations[1].lng)
             event_in_range = 0 <= distance <= max_radius
             if self.useS2: event_in_range = region.contains(s2sphere.LatLng.from_degrees(event_relations[1].lat, event_relations[1].lng).to_point())
             # timedelta of event being inspected to the earliest timestamp
@@ -165,26 +210,29 @@ class ClusteringHelper:
             return middle_event, events_in_circle
 
     def _remove_coords_from_relations(self, relations, events_to_be_removed):
+        events_to_be_removed = set(events_to_be_removed)
+        coords_to_be_removed = set(event[1] for event in events_to_be_removed)
         for source_event, relations_to_source in list(relations.items()):
             # iterate relations, remove anything matching events_to_be_removed
-            for event in events_to_be_removed:
-                if event == source_event:
-                    relations.pop(source_event)
-                    break
-                # iterate through the entire distance relations as well...
-                for relation in relations_to_source:
-                    if relation.other_event[1] == event[1]:
-                        relations[source_event].remove(relation)
+            if source_event in events_to_be_removed:
+                relations.pop(source_event)
+                continue
+            # iterate through the entire distance relations as well...
+            relations[source_event] = set(relation for relation in relations_to_source
+                                          if relation.other_event[1] not in coords_to_be_removed)
         return relations
 
-    def _sum_up_relations(self, relations):
+    def _sum_up_relations(self, relations, with_members=False):
         final_set = []
 
         while len(relations) > 0:
             next = self._get_most_west_amongst_relations(relations)
             middle_event, events_to_be_removed = self._get_circle(
                 next, relations[next], relations, self.max_radius)
-            final_set.append(middle_event)
+            if with_members:
+                final_set.append((middle_event, list(events_to_be_removed)))
+            else:
+                final_set.append(middle_event)
             relations = self._remove_coords_from_relations(
                 relations, events_to_be_removed)
         return final_set
@@ -194,3 +242,42 @@ class ClusteringHelper:
             queue, max_radius=self.max_radius)
         summed_up = self._sum_up_relations(relations)
         return summed_up
+
+    def get_clustered_with_members(self, queue):
+        """
+        Like get_clustered, every clustered event is returned along with the events of the queue it covers
+        :return: list of (clustered event, events covered)
+        """
+        relations = self._get_relations_in_range_within_time(
+            queue, max_radius=self.max_radius)
+        return self._sum_up_relations(relations, with_members=True)
+
+    def update_clustered(self, clustered, added, removed):
+        """
+        Updates the clusters returned by get_clustered_with_members for events added to or removed from the queue.
+        Only the clusters covering events within 2 * max_radius and max_timedelta_seconds of an event added or removed
+        are clustered again, along with the events added.
+        :return: list of (clustered event, events covered)
+        """
+        changed = list(added) + list(removed)
+        if not changed:
+            return clustered
+        removed = set(removed)
+
+        members = [(index, event) for index, (_, events) in enumerate(clustered) for event in events]
+        affected = set()
+        if members:
+            member_coords = np.array([(event[1].lat, event[1].lng) for _, event in members])
+            member_timestamps = np.array([event[0] for _, event in members])
+            member_clusters = np.array([index for index, _ in members])
+            for event in changed:
+                distances = get_distances_to_point_in_meters(event[1].lat, event[1].lng, member_coords)
+                in_neighbourhood = ((distances <= self.max_radius * 2)
+                                    & (np.abs(member_timestamps - event[0]) <= self.max_timedelta_seconds))
+                affected.update(member_clusters[in_neighbourhood].tolist())
+
+        to_be_clustered = [event for index in sorted(affected) for event in clustered[index][1]
+                           if event not in removed]
+        to_be_clustered.extend(event for event in added if event not in removed)
+        unaffected = [cluster for index, cluster in enumerate(clustered) if index not in affected]
+        return unaffected + self.get_clustered_with_members(to_be_clustered)
@@ -0,0 +1,236 @@
+import collections
+import time
+
+from utils.logging import logger
+from .util import *
+
+# amount of nearest locations inspected as candidates for new edges of a location
+NEIGHBOUR_COUNT = 10
+# longest segment Or-opt moves to another place of the tour
+OR_OPT_MAX_SEGMENT_LENGTH = 3
+# amount of positions a perturbation of a local optimum spans
+PERTURBATION_WINDOW = 50
+# improvements below this are considered rounding errors
+EPSILON = 1e-7
+
+
+def route_calc_impl(coords, num_processes=1, time_budget=30, seed=None):
+    """
+    Builds a nearest neighbour tour and improves it by 2-opt and Or-opt moves restricted to the nearest neighbours of
+    every location, using don't-look bits to only revisit locations next to changed edges. Once no move shortens the
+    tour, the rest of time_budget (seconds) is spent perturbing small parts of the tour and improving it again,
+    keeping the perturbations leading to a shorter tour.
+    The calculation runs single-threaded, num_processes is accepted to be interchangeable with the other algorithms.
+    """
+    start = time.time()
+    deadline = start + time_budget
+    num_location = coords.shape[0]
+    if num_location <= 3:
+        return np.arange(num_location)
+    rng = np.random.default_rng(seed)
+    distmat = get_distmat(coords)
+    neighbours = _get_neighbours(distmat, min(NEIGHBOUR_COUNT, num_location - 1))
+
+    tour = _get_nearest_neighbour_tour(distmat)
+    search = _LocalSearch(distmat, neighbours, tour)
+    search.optimize(range(num_location), deadline)
+    logger.info("Local optimum of {} found after {} seconds", search.cost, round(time.time() - start, 2))
+
+    best_tour = list(search.tour)
+    best_cost = search.cost
+    failed_perturbations = 0
+    # perturb the local optimum until the time budget is used up or perturbing stopped paying off
+    while time.time() < deadline and failed_perturbations < max(100, num_location):
+        touched = search.perturb(rng)
+        search.optimize(touched, deadline)
+        if search.cost < best_cost - EPSILON:
+            best_tour = list(search.tour)
+            best_cost = search.cost
+            failed_perturbations = 0
+        else:
+            search.set_tour(best_tour, best_cost)
+            failed_perturbations += 1
+
+    logger.info("Found {} long solution in {} seconds", best_cost, round(time.time() - start, 2))
+    return np.array(best_tour)
+
+
+def _get_neighbours(distmat, count):
+    # the count nearest locations of every location, sorted by distance
+    num_location = distmat.shape[0]
+    neighbours = []
+    for location in range(num_location):
+        distances = distmat[location].copy()
+        distances[location] = np.inf
+        nearest = np.argpartition(distances, count - 1)[:count]
+        neighbours.append(nearest[np.argsort(distances[nearest])].tolist())
+    return neighbours
+
+
+def _get_nearest_neighbour_tour(distmat):
+    num_location = distmat.shape[0]
+    visited = np.zeros(num_location, dtype=bool)
+    current = 0
+    visited[current] = True
+    tour = [current]
+    for _ in range(num_location - 1):
+        current = int(np.argmin(np.where(visited, np.inf, distmat[current])))
+        visited[current] = True
+        tour.append(current)
+    return tour
+
+
+class _LocalSearch:
+    def __init__(self, distmat, neighbours, tour):
+        self._distmat = distmat
+        self._neighbours = neighbours
+        self._num_location = len(tour)
+        self.tour = []
+        self._pos = [0] * self._num_location
+        self.cost = 0.0
+        self.set_tour(tour, sum_distmat(np.array(tour), distmat))
+
+        self._queue = collections.deque()
+        self._queued = [False] * self._num_location
+
+    def set_tour(self, tour, cost):
+        self.tour = list(tour)
+        for position, location in enumerate(self.tour):
+            self._pos[location] = position
+        self.cost = cost
+
+    def optimize(self, locations, deadline):
+        # every location in the queue has its don't-look bit cleared
+        for location in locations:
+            self._push(location)
+        while self._queue and time.time() < deadline:
+            location = self._queue.popleft()
+            self._queued[location] = False
+            if self._improve_2opt(location) or self._improve_or_opt(location):
+                self._push(location)
+
+    def perturb(self, rng):
+        # swap two consecutive segments within a small window of the tour, the equivalent of a double bridge move
+        num_location = self._num_location
+        window = min(PERTURBATION_WINDOW, num_location - 2)
+        first = int(rng.integers(num_location))
+        first_length, second_length = (int(length) for length in rng.integers(1, max(2, window // 2), size=2))
+        second = (first + first_length) % num_location
+        end = (second + second_length - 1) % num_location
+        before = self.tour[first - 1]
+        after = self.tour[(end + 1) % num_location]
+        first_start, first_end = self.tour[first], self.tour[second - 1]
+        second_start, second_end = self.tour[second], self.tour[end]
+        d = self._distmat
+        self.cost += (d[before, second_start] + d[second_end, first_start] + d[first_end, after]
+                      - d[before, first_start] - d[first_end, second_start] - d[second_end, after])
+        self._rotate(first, second, end)
+        return before, after, first_start, first_end, second_start, second_end
+
+    def _push(self, location):
+        if not self._queued[location]:
+            self._queued[location] = True
+            self._queue.append(location)
+
+    def _succ(self, location):
+        return self.tour[(self._pos[location] + 1) % self._num_location]
+
+    def _pred(self, location):
+        return self.tour[self._pos[location] - 1]
+
+    def _reverse(self, first, last):
+        # reverse the positions first to last (inclusive) going forward in the tour, wrapping around the end
+        num_location = self._num_location
+        tour = self.tour
+        pos = self._pos
+        for _ in range(((last - first) % num_location + 1) // 2):
+            tour[first], tour[last] = tour[last], tour[first]
+            pos[tour[first]] = first
+            pos[tour[last]] = last
+            first = (first + 1) % num_location
+            last = (last - 1) % num_location
+
+    def _rotate(self, first, second, last):
+        # move the positions first to second - 1 after last, keeping the order of both parts
+        self._reverse(first, (second - 1) % self._num_location)
+        self._reverse(second, last)
+        self._reverse(first, last)
+
+    def _improve_2opt(self, a):
+        d = self._distmat
+        num_location = self._num_location
+        for forward in (True, False):
+            b = self._succ(a) if forward else self._pred(a)
+            distance_ab = d[a, b]
+            for c in self._neighbours[a]:
+                distance_ac = d[a, c]
+                if distance_ac >= distance_ab:
+                    break
+                other = self._succ(c) if forward else self._pred(c)
+                if other == a or c == b:
+                    continue
+                delta = distance_ac + d[b, other] - distance_ab - d[c, other]
+                if delta < -EPSILON:
+                    # forward: a b ... c other -> a c ... b other, backward: other c ... b a -> other b ... c a
+                    if forward:
+                        first, last = self._pos[b], self._pos[c]
+                    else:
+                        first, last = self._pos[c], self._pos[b]
+                    if (last - first) % num_location * 2 > num_location:
+                        # reversing the rest of the tour results in the same tour walked in the other direction
+                        first, last = (last + 1) % num_location, (first - 1) % num_location
+                    self._reverse(first, last)
+                    self.cost += delta
+                    for location in (a, b, c, other):
+                        self._push(location)
+                    return True
+        return False
+
+    def _improve_or_opt(self, a):
+        d = self._distmat
+        num_location = self._num_location
+        for length in range(1, min(OR_OPT_MAX_SEGMENT_LENGTH, num_location - 3) + 1):
+            for start in {self._pos[a], (self._pos[a] - length + 1) % num_location}:
+                s1 = self.tour[start]
+                s2 = self.tour[(start + length - 1) % num_location]
+                before = self.tour[start - 1]
+                after = self.tour[(start + length) % num_location]
+                removal_gain = d[before, s1] + d[s2, after] - d[before, after]
+                if removal_gain <= EPSILON:
+                    continue
+                for end in (s1, s2):
+                    for c in self._neighbours[end]:
+                        if d[end, c] >= removal_gain:
+                            break
+                        if (self._pos[c] - start) % num_location < length:
+                            continue
+                        for u, v in ((c, self._succ(c)), (self._pred(c), c)):
+                            if (self._pos[u] - start) % num_location < length \
+                                    or (self._pos[v] - start) % num_location < length:
+                                continue
+                            insertion = d[u, v]
+                            delta_kept = d[u, s1] + d[s2, v] - insertion - removal_gain
+                            delta_reversed = d[u, s2] + d[s1, v] - insertion - removal_gain
+                            delta = min(delta_kept, delta_reversed)
+                            if delta < -EPSILON:
+                                self._move_segment(start, length, u, v)
+                                if delta_reversed < delta_kept:
+                                    self._reverse(self._pos[s1], self._pos[s2])
+                                self.cost += delta
+                                for location in (s1, s2, before, after, u, v):
+                                    self._push(location)
+                                return True
+        return False
+
+    def _move_segment(self, start, length, u, v):
+        # move the segment of length starting at start in between u and v (v following u), keeping its order
+        num_location = self._num_location
+        end = (start + length - 1) % num_location
+        forward_distance = (self._pos[u] - end) % num_location
+        backward_distance = (start - self._pos[v]) % num_location
+        if forward_distance <= backward_distance:
+            # segment after ... u
+            self._rotate(start, (end + 1) % num_location, self._pos[u])
+        else:
+            # v ... before segment
+            self._rotate(self._pos[v], start, end)
@@ -1,11 +1,20 @@
 import math
 import multiprocessing
-import secrets
 
 from utils.logging import logger
 from .util import *
 
-def route_calc_impl(lessCoordinates, num_processes):
+# distance matrix of the route being calculated, set in the processes of the pool by __init_pool_process to avoid
+# transferring the matrix along with every task
+_pool_distmat = None
+
+
+def __init_pool_process(distmat):
+    global _pool_distmat
+    _pool_distmat = distmat
+
+
+def route_calc_impl(lessCoordinates, num_processes, seed=None):
     init_temp = 100
     halt = 120
     markov_coefficient = 10
@@ -21,9 +30,12 @@ def route_calc_impl(lessCoordinates, num_processes):
     T_NUM_CYCLE = 1
     # Build distance matrix to accelerate cost computing
     distmat = get_distmat(coordinates)
-    # States: New, Current and Best
-    sol_new, sol_current, sol_best = (np.arange(num_location),) * 3
-    cost_new, cost_current, cost_best = (float('inf'),) * 3
+    # Random numbers of this calculation and the ones of every subprocess task are derived from a single seed
+    seed_sequence = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed_sequence)
+    # States: Best
+    sol_best = np.arange(num_location)
+    cost_best = sum_distmat(sol_best, distmat)
     # Record costs during the process
     costs = []
     # previous cost_best
@@ -39,7 +51,7 @@ def route_calc_impl(lessCoordinates, num_processes):
         else:
             num_cores = multiprocessing.cpu_count()
 
-        thread_pool = Pool(processes=num_cores)
+        thread_pool = Pool(processes=num_cores, initializer=__init_pool_process, initargs=(distmat,))
     else:
         num_cores = 1
         thread_pool = None
@@ -50,26 +62,25 @@ def route_calc_impl(lessCoordinates, num_processes):
 
         if num_cores and num_cores != 1 and thread_pool and cost_best_counter > 0:
             running_calculations = []
-            full = secrets.randbelow(2)
+            full = rng.integers(2)
 
-            for i in range(num_cores):
-                # method = np.random.randint(NUM_NEW_SOLUTION_METHODS)
-                method = secrets.randbelow(NUM_NEW_SOLUTION_METHODS)
+            for task_seed in seed_sequence.spawn(num_cores):
+                method = rng.integers(NUM_NEW_SOLUTION_METHODS)
                 if full == 0:
                     calculation = thread_pool.apply_async(__generate_new_solution, args=(
-                        method, int(round(markov_step / (num_cores * 2 / 3))), distmat, T,
-                        cost_best, sol_best))
+                        method, int(round(markov_step / (num_cores * 2 / 3))), None, T,
+                        cost_best, sol_best, task_seed))
                 elif cost_best_counter > halt * 0.3:
                     calculation = thread_pool.apply_async(__generate_new_solution,
-                                                          args=(-1, markov_step, distmat, T,
-                                                                cost_best, sol_best))
+                                                          args=(-1, markov_step, None, T,
+                                                                cost_best, sol_best, task_seed))
                 else:
                     calculation = thread_pool.apply_async(__generate_new_solution,
                                                           args=(
                                                               -1, int(round(markov_step / round(num_cores / 2))),
-                                                              distmat,
+                                                              None,
                                                               T,
-                                                              cost_best, sol_best))
+                                                              cost_best, sol_best, task_seed))
                 running_calculations.append(calculation)
 
             # thread_pool.close()
@@ -119,7 +130,7 @@ def route_calc_impl(lessCoordinates, num_processes):
                     cost_best = sum_distmat(sol_best, distmat)
         else:
             cost_best, sol_best = __generate_new_solution(
-                -1, int(round(num_location * 2)), distmat, T, cost_best, sol_best)
+                -1, int(round(num_location * 2)), distmat, T, cost_best, sol_best, rng)
 
         # Lower the temperature
         alpha = 1 + math.log(1 + T_NUM_CYCLE + 1)
@@ -149,46 +160,70 @@ def route_calc_impl(lessCoordinates, num_processes):
     return sol_best
 
 
-def __generate_new_solution(method, markov_steps, distmat, temp_current, cost_current, solution_current):
+def __generate_new_solution(method, markov_steps, distmat, temp_current, cost_current, solution_current, seed):
     # Constant Definitions
     NUM_NEW_SOLUTION_METHODS = 3
     SWAP, REVERSE, TRANSPOSE = 0, 1, 2
 
+    if distmat is None:
+        distmat = _pool_distmat
+    rng = np.random.default_rng(seed)
+    num_location = solution_current.shape[0]
+
     sol_best = solution_current.copy()
     sol_current = solution_current.copy()
     cost_best = cost_current
     cost_cur = cost_current
-    sol_new = solution_current.copy()
-    for i in np.arange(markov_steps):
-        if method == -1:
-            # choice = np.random.randint(NUM_NEW_SOLUTION_METHODS)
-            choice = secrets.randbelow(NUM_NEW_SOLUTION_METHODS)
+    improved = False
+
+    # draw all random numbers at once, moves are only scored by the change of the tour length they would cause and
+    # applied to sol_current in place once accepted
+    if method == -1:
+        choices = rng.integers(NUM_NEW_SOLUTION_METHODS, size=markov_steps)
+    else:
+        choices = np.full(markov_steps, method)
+    positions = rng.integers(num_location, size=(markov_steps, 3))
+    random_values = rng.random(markov_steps)
+    for choice, (n1, n2, n3), random_value in zip(choices.tolist(), positions.tolist(), random_values.tolist()):
+        if choice == TRANSPOSE:
+            while n1 == n2 or n2 == n3 or n1 == n3:
+                n1, n2, n3 = rng.integers(num_location, size=3).tolist()
+            # Let n1 < n2 < n3
+            n1, n2, n3 = sorted([n1, n2, n3])
         else:
-            choice = method
+            while n1 == n2:
+                n1, n2 = rng.integers(num_location, size=2).tolist()
+            n1, n2 = min(n1, n2), max(n1, n2)
+
         if choice == SWAP:
-            sol_new = swap(sol_new)
+            delta = swap_delta(sol_current, distmat, n1, n2)
         elif choice == REVERSE:
-            sol_new = reverse(sol_new)
+            delta = reverse_delta(sol_current, distmat, n1, n2)
         elif choice == TRANSPOSE:
-            sol_new = transpose(sol_new)
+            delta = transpose_delta(sol_current, distmat, n1, n2, n3)
         else:
             # logger.debug("ERROR: new solution method %d is not defined" % choice)
             exit(2)
-        # Get the total distance of new route
-        cost_new = sum_distmat(sol_new, distmat)
 
-        if accept(cost_new, cost_cur, temp_current):
+        if accept(delta, temp_current, random_value):
             # Update sol_current
-            sol_current = sol_new.copy()
-            cost_cur = cost_new
+            if choice == SWAP:
+                swap(sol_current, n1, n2)
+            elif choice == REVERSE:
+                reverse(sol_current, n1, n2)
+            else:
+                transpose(sol_current, n1, n2, n3)
+            cost_cur += delta
             # TODO: reduce iterator to get more rounds...
-            if cost_new < cost_best:
-                sol_best = sol_new.copy()
-                cost_best = cost_new
-        else:
-            sol_new = sol_current.copy()
+            if cost_cur < cost_best:
+                sol_best = sol_current.copy()
+                cost_best = cost_cur
+                improved = True
 
-    return cost_best, sol_best.copy()
+    if improved:
+        # get rid of rounding errors summed up by applying the deltas
+        cost_best = sum_distmat(sol_best, distmat)
+    return cost_best, sol_best
 
 
 def get_index_array_numpy_compary(arr_orig, arr_new):
@@ -49,20 +49,11 @@ def tsp(data):
     return length, path
 
 
-def get_length(x1, y1, x2, y2):
-    return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** (1 / 2)
-
-
 def build_graph(data):
     graph = {}
-    for this in range(len(data)):
-        for another_point in range(len(data)):
-            if this != another_point:
-                if this not in graph:
-                    graph[this] = {}
-
-                graph[this][another_point] = get_length(data[this][0], data[this][1], data[another_point][0],
-                                                        data[another_point][1])
+    for this, distances in enumerate(get_distmat(data).tolist()):
+        graph[this] = {another_point: distance for another_point, distance in enumerate(distances)
+                       if this != another_point}
 
     return graph
 
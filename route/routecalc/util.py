@@ -1,72 +1,88 @@
 
 import numpy as np
 
+from utils.geo import get_distance_matrix_in_meters
+
 
 def isclose(a, b, rel_tol=1e-09, abs_tol=0.0):
     return abs(a-b) <= max(rel_tol * max(abs(a), abs(b)), abs_tol)
 
 
 def sum_distmat(p, distmat):
-    dist = 0
-    num_location = p.shape[0]
-    for i in range(num_location-1):
-        dist += distmat[p[i]][p[i+1]]
-    dist += distmat[p[0]][p[num_location-1]]
-    return dist
+    # length of the closed tour visiting the locations in the order given by p
+    return distmat[p[:-1], p[1:]].sum() + distmat[p[0], p[-1]]
 
 
 def get_distmat(p):
-    num_location = p.shape[0]
-    # 1 degree of lat/lon ~ 111km = 111000m in Taiwan
-    p *= 111000
-    distmat = np.zeros((num_location, num_location))
-    for i in range(num_location):
-        for j in range(i, num_location):
-            distmat[i][j] = distmat[j][i] = np.linalg.norm(p[i] - p[j])
-    return distmat
-
-
-def swap(sol_new):
-    while True:
-        n1 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        n2 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        if n1 != n2:
-            break
-    sol_new[n1], sol_new[n2] = sol_new[n2], sol_new[n1]
-    return sol_new
-
-
-def reverse(sol_new):
-    while True:
-        n1 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        n2 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        if n1 != n2:
-            break
-    sol_new[n1:n2] = sol_new[n1:n2][::-1]
-
-    return sol_new
-
-
-def transpose(sol_new):
-    while True:
-        n1 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        n2 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        n3 = np.int(np.floor(np.random.uniform(0, sol_new.shape[0])))
-        if n1 != n2 != n3 != n1:
-            break
-    # Let n1 < n2 < n3
-    n1, n2, n3 = sorted([n1, n2, n3])
-
-    # Insert data between [n1,n2) after n3
-    tmplist = sol_new[n1:n2].copy()
-    sol_new[n1: n1+n3-n2+1] = sol_new[n2: n3+1].copy()
-    sol_new[n3-n2+1+n1: n3+1] = tmplist.copy()
-    return sol_new
-
-
-def accept(cost_new, cost_current, T):
+    return get_distance_matrix_in_meters(p)
+
+
+def swap(sol, n1, n2):
+    # swap the locations at n1 and n2, in place
+    sol[n1], sol[n2] = sol[n2], sol[n1]
+    return sol
+
+
+def swap_delta(sol, distmat, n1, n2):
+    # change of the tour length swap(sol, n1, n2) would cause, without touching sol
+    num_location = sol.shape[0]
+
+    def location_after_swap(position):
+        if position == n1:
+            return sol[n2]
+        elif position == n2:
+            return sol[n1]
+        return sol[position]
+
+    delta = 0.0
+    # the edges starting at these positions are the only ones touched by the swap
+    for position in {(n1 - 1) % num_location, n1, (n2 - 1) % num_location, n2}:
+        next_position = (position + 1) % num_location
+        delta += (distmat[location_after_swap(position), location_after_swap(next_position)]
+                  - distmat[sol[position], sol[next_position]])
+    return delta
+
+
+def reverse(sol, n1, n2):
+    # reverse the locations in [n1, n2), in place. Requires n1 < n2
+    sol[n1:n2] = sol[n1:n2][::-1]
+    return sol
+
+
+def reverse_delta(sol, distmat, n1, n2):
+    # change of the tour length reverse(sol, n1, n2) would cause, without touching sol
+    num_location = sol.shape[0]
+    if n2 - n1 >= num_location - 1:
+        # reversing (almost) the entire tour only changes the direction it is walked in
+        return 0.0
+    before, first = sol[n1 - 1], sol[n1]
+    last, after = sol[n2 - 1], sol[n2 % num_location]
+    return distmat[before, last] + distmat[first, after] - distmat[before, first] - distmat[last, after]
+
+
+def transpose(sol, n1, n2, n3):
+    # move the locations in [n1, n2) after n3, in place. Requires n1 < n2 <= n3
+    # rotating [n1, n3] by reversing both parts and the whole range does not need a temporary copy
+    reverse(sol, n1, n2)
+    reverse(sol, n2, n3 + 1)
+    reverse(sol, n1, n3 + 1)
+    return sol
+
+
+def transpose_delta(sol, distmat, n1, n2, n3):
+    # change of the tour length transpose(sol, n1, n2, n3) would cause, without touching sol
+    num_location = sol.shape[0]
+    if n1 == 0 and n3 == num_location - 1:
+        # rotating the entire tour does not change its length
+        return 0.0
+    before, first_start, first_end = sol[n1 - 1], sol[n1], sol[n2 - 1]
+    second_start, second_end, after = sol[n2], sol[n3], sol[(n3 + 1) % num_location]
+    return (distmat[before, second_start] + distmat[second_end, first_start] + distmat[first_end, after]
+            - distmat[before, first_start] - distmat[first_end, second_start] - distmat[second_end, after])
+
+
+def accept(delta, T, random_value):
     # If new cost better than current, accept it
     # If new cost not better than current, accept it by probability P(dE)
     # P(dE) = exp(dE/(kT)), defined by Metropolis
-    return (cost_new <= cost_current or
-            np.random.rand() <= np.exp(-(cost_new - cost_current) / T))
+    return delta <= 0 or random_value <= np.exp(-delta / T)
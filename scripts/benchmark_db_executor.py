@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Compares the queries per second of PooledQueryExecutor (threads blocking on the pool) and
+AsyncPooledQueryExecutor (coroutines on a single event loop) for several pool sizes.
+Requires aiomysql and a DB configured in configs/config.ini, run from within the scripts folder.
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append("..")
+from db.AsyncPooledQueryExecutor import AsyncPooledQueryExecutor
+from db.PooledQueryExecutor import PooledQueryExecutor
+
+configfile = open("../configs/config.ini", "r")
+config = configfile.read()
+
+
+def get_value_for(regex_string, force_exit=True):
+    res = re.findall(regex_string, config)
+    if res is None or len(res) != 1 or res == []:
+        if force_exit:
+            if res is None or res == []:
+                sys.exit("Check your config.ini for %s - this field is required!" % re.search('\\\s\+(.*):', regex_string).group(1))
+            else:
+                sys.exit("Found more than one value for %s in config.ini, fix that." % re.search('\\\s\+(.*):', regex_string).group(1))
+        return None
+    else:
+        return res[0]
+
+
+def get_db_config():
+    dbport = get_value_for(r'\s+dbport:\s+([^.\s]*)', False)
+    return {
+        "host": get_value_for(r'\s+dbip:\s+([^\s]+)'),
+        "port": int(dbport) if dbport is not None else 3306,
+        "username": get_value_for(r'\s+dbusername:\s+([^.\s]*)'),
+        "password": get_value_for(r'\s+dbpassword:\s+([^.\s]*)'),
+        "database": get_value_for(r'\s+dbname:\s+([^.\s]*)')
+    }
+
+
+def benchmark_sync(db_config, poolsize, clients, queries, query):
+    executor = PooledQueryExecutor(poolsize=poolsize, **db_config)
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(lambda _: executor.execute(query), range(queries)))
+    return queries / (time.time() - start)
+
+
+async def benchmark_async(db_config, poolsize, clients, queries, query):
+    executor = AsyncPooledQueryExecutor(poolsize=poolsize, **db_config)
+    await executor.init_pool()
+    semaphore = asyncio.Semaphore(clients)
+
+    async def run_query():
+        async with semaphore:
+            await executor.execute(query)
+
+    start = time.time()
+    await asyncio.gather(*[run_query() for _ in range(queries)])
+    qps = queries / (time.time() - start)
+    await executor.close_pool()
+    return qps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sync and async DB executors")
+    parser.add_argument("--poolsizes", default="4,8,16,32,64",
+                        help="Comma-separated list of pool sizes to benchmark (Default: 4,8,16,32,64)")
+    parser.add_argument("--clients", type=int, default=128,
+                        help="Amount of concurrent callers (threads or coroutines) (Default: 128)")
+    parser.add_argument("--queries", type=int, default=10000,
+                        help="Amount of queries per run (Default: 10000)")
+    parser.add_argument("--query", default="SELECT 1",
+                        help="Query to be executed (Default: SELECT 1)")
+    benchmark_args = parser.parse_args()
+
+    if not AsyncPooledQueryExecutor.is_available():
+        sys.exit("aiomysql is required for this benchmark. Install it with 'pip install aiomysql'")
+
+    db_config = get_db_config()
+    print("{:>8} | {:>12} | {:>12}".format("poolsize", "sync q/s", "async q/s"))
+    for poolsize in [int(size) for size in benchmark_args.poolsizes.split(",")]:
+        try:
+            sync_qps = "{:.1f}".format(benchmark_sync(db_config, poolsize, benchmark_args.clients,
+                                                      benchmark_args.queries, benchmark_args.query))
+        except Exception as e:
+            # mysql-connector limits the size of a pool to 32 connections
+            sync_qps = "n/a"
+            print("Sync executor failed with poolsize {}: {}".format(poolsize, e))
+        loop = asyncio.new_event_loop()
+        async_qps = loop.run_until_complete(
+            benchmark_async(db_config, poolsize, benchmark_args.clients, benchmark_args.queries,
+                            benchmark_args.query))
+        loop.close()
+        print("{:>8} | {:>12} | {:>12.1f}".format(poolsize, sync_qps, async_qps))
+
+
+if __name__ == "__main__":
+    main()
@@ -152,7 +152,12 @@ if __name__ == "__main__":
     # TODO: globally destroy all threads upon sys.exit() for example
     install_thread_excepthook()
 
-    db_wrapper, db_pool_manager = DbFactory.get_wrapper(args)
+    webhook_change_feed = None
+    if args.webhook and args.webhook_change_feed:
+        from webhook.webhookchangefeed import WebhookChangeFeed
+
+        webhook_change_feed = WebhookChangeFeed(args.webhook_change_feed_size)
+    db_wrapper, db_pool_manager = DbFactory.get_wrapper(args, webhook_change_feed)
     instance_id = db_wrapper.get_instance_id()
     data_manager = utils.data_manager.DataManager(db_wrapper, instance_id)
     version = MADVersion(args, data_manager)
@@ -240,7 +245,7 @@ if __name__ == "__main__":
                 rarity.start_dynamic_rarity()
 
                 webhook_worker = WebhookWorker(
-                    args, data_manager, mapping_manager, rarity, db_wrapper.webhook_reader)
+                    args, data_manager, mapping_manager, rarity, db_wrapper.webhook_reader, webhook_change_feed)
                 t_whw = Thread(name="webhook_worker",
                                target=webhook_worker.run_worker)
                 t_whw.daemon = True
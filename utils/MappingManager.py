@@ -1,5 +1,8 @@
+import ctypes
+import multiprocessing
 import os
 import time
+import zlib
 from queue import Empty, Queue
 from multiprocessing import Lock, Event, Queue
 from multiprocessing.managers import SyncManager
@@ -13,6 +16,7 @@ from geofence.geofenceHelper import GeofenceHelper
 from route import RouteManagerBase, RouteManagerIV
 from route.RouteManagerFactory import RouteManagerFactory
 from utils.collections import Location
+from utils.data_manager import ResourceGenerations, _set_resource_generations, resource_generations
 from utils.logging import logger
 from utils.s2Helper import S2Helper
 
@@ -73,8 +77,89 @@ class JoinQueue(object):
         self._joinqueue.put(item)
 
 
+class DevicemappingsVersions(object):
+    """
+    Versions of the devicemappings held by the MappingManager, kept in shared memory so workers can check for changes
+    of the mappings of their device without calling the MappingManager process. Devices are assigned to a fixed
+    number of slots by their name, devices sharing a slot merely cause additional fetches of their mappings.
+    """
+    slots = 1024
+
+    def __init__(self):
+        self.__versions = multiprocessing.Array(ctypes.c_uint64, self.slots)
+
+    def __get_slot(self, device_name: str) -> int:
+        return zlib.crc32(str(device_name).encode("utf-8")) % self.slots
+
+    def get(self, device_name: str) -> int:
+        return self.__versions[self.__get_slot(device_name)]
+
+    def increment(self, device_name: str):
+        slot = self.__get_slot(device_name)
+        with self.__versions.get_lock():
+            self.__versions[slot] += 1
+
+    def increment_all(self):
+        with self.__versions.get_lock():
+            for slot in range(self.slots):
+                self.__versions[slot] += 1
+
+
+# created before MappingManagerManager is started and handed to its process, see MappingManagerManager.start
+devicemappings_versions: DevicemappingsVersions = DevicemappingsVersions()
+
+
+def _set_shared_versions(versions: DevicemappingsVersions, generations: ResourceGenerations, initializer=None,
+                         initargs=()):
+    global devicemappings_versions
+    devicemappings_versions = versions
+    _set_resource_generations(generations)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class DevicemappingsSnapshot(object):
+    """
+    Worker-local copy of the devicemappings of a device. The mappings are only fetched from the MappingManager again
+    once they have been changed by MappingManager.update or by settings being set.
+    """
+
+    def __init__(self, mapping_manager, device_name: str):
+        self.__mapping_manager = mapping_manager
+        self.__device_name: str = device_name
+        self.__version: Optional[int] = None
+        self.__devicemappings: Optional[dict] = None
+
+    def get_devicemappings(self) -> Optional[dict]:
+        version = devicemappings_versions.get(self.__device_name)
+        if version != self.__version:
+            # the version is read before fetching, changes made while fetching result in fetching again
+            self.__devicemappings = self.__mapping_manager.get_devicemappings_of(self.__device_name)
+            self.__version = version
+        return self.__devicemappings
+
+    def get_devicesettings_value(self, key: str, default_value: object = None):
+        devicemappings: Optional[dict] = self.get_devicemappings()
+        if devicemappings is None:
+            return default_value
+        return devicemappings.get("settings", {}).get(key, default_value)
+
+    def set_devicesettings_value(self, key: str, value):
+        self.__mapping_manager.set_devicesetting_value_of(self.__device_name, key, value)
+        # the MappingManager sets values asynchronously, reads following are served by the local copy right away
+        if self.__devicemappings is not None:
+            if self.__devicemappings.get("settings", None) is None:
+                self.__devicemappings["settings"] = {}
+            self.__devicemappings["settings"][key] = value
+
+
 class MappingManagerManager(SyncManager):
-    pass
+    def start(self, initializer=None, initargs=()):
+        """
+        Starts the process of the MappingManager handing it the devicemappings versions and the generations of the
+        resources cached by the DataManager of this process. The initializer passed is run afterwards
+        """
+        super().start(_set_shared_versions, (devicemappings_versions, resource_generations, initializer, initargs))
 
 
 class MappingManager:
@@ -123,6 +208,7 @@ class MappingManager:
         with self.__mappings_mutex:
             if self._devicemappings.get(device_name, None) is not None:
                 self._devicemappings[device_name][key] = value
+                devicemappings_versions.increment(device_name)
 
     def get_devicesettings_of(self, device_name: str) -> Optional[dict]:
         return self._devicemappings.get(device_name, None).get('settings', None)
@@ -146,6 +232,7 @@ class MappingManager:
                         if self._devicemappings[device_name].get("settings", None) is None:
                             self._devicemappings[device_name]["settings"] = {}
                         self._devicemappings[device_name]['settings'][key] = value
+                        devicemappings_versions.increment(device_name)
 
     def set_devicesetting_value_of(self, device_name: str, key: str, value):
         if self._devicemappings.get(device_name, None) is not None:
@@ -568,6 +655,7 @@ class MappingManager:
                 self._devicemappings = self.__get_latest_devicemappings()
                 self._auths = self.__get_latest_auths()
 
+        devicemappings_versions.increment_all()
         logger.info("Mappings have been updated")
 
     def __file_watcher(self):
@@ -1,14 +1,65 @@
 from . import modules
 from .dm_exceptions import *
 import collections
+import copy
+import ctypes
+import multiprocessing
+import zlib
+from threading import Lock
+from typing import Optional
 from utils.logging import logger
 
+
+class ResourceGenerations(object):
+    """
+    Generations of the tables of the resources, kept in shared memory so rows cached by the DataManager of any
+    process are dropped once a resource of the same table has been saved or deleted by another process. Tables are
+    assigned to a fixed number of slots by their name, tables sharing a slot merely cause additional fetches.
+    """
+    slots = 64
+
+    def __init__(self):
+        self.__generations = multiprocessing.Array(ctypes.c_uint64, self.slots)
+
+    def __get_slot(self, table: str) -> int:
+        return zlib.crc32(table.encode("utf-8")) % self.slots
+
+    def get(self, table: str) -> int:
+        return self.__generations[self.__get_slot(table)]
+
+    def increment(self, table: str):
+        slot = self.__get_slot(table)
+        with self.__generations.get_lock():
+            self.__generations[slot] += 1
+
+
+# created on import and thereby shared with the processes started later on, see MappingManagerManager.start
+resource_generations: ResourceGenerations = ResourceGenerations()
+
+
+def _set_resource_generations(generations: ResourceGenerations):
+    global resource_generations
+    resource_generations = generations
+
+
 # This is still known as the data manager but its more of a Resource Factory.  Its sole purpose is to produce a
 # single resource or a list of resources
 class DataManager(object):
     def __init__(self, dbc, instance_id):
         self.dbc = dbc
         self.instance_id = instance_id
+        # identity map of the rows loaded: table -> (generation, identifier -> row)
+        self.__rows = {}
+        # identifiers of all resources of a table in the order listed: (table, sort) -> (generation, identifiers)
+        self.__listings = {}
+        self.__cache_mutex = Lock()
+
+    def __getstate__(self):
+        # the DataManager is handed to the MappingManager process, the rows cached are not
+        return {'dbc': self.dbc, 'instance_id': self.instance_id}
+
+    def __setstate__(self, state):
+        self.__init__(state['dbc'], state['instance_id'])
 
     def get_resource(self, section, identifier=None, **kwargs):
         if section == 'area':
@@ -37,33 +88,91 @@ class DataManager(object):
         default_sort = kwargs.get('default_sort', None)
         backend = kwargs.get('backend', False)
         resource_class = None
-        table = None
-        primary_key = None
+        row_class = None
         if section == 'area':
             resource_class = modules.AreaFactory
-            table = modules.Area.table
-            primary_key = modules.Area.primary_key
+            row_class = modules.Area
             default_sort = 'name'
         else:
             resource_class = modules.MAPPINGS[section]
-            table = resource_class.table
-            primary_key = resource_class.primary_key
-        sql = 'SELECT `%s` FROM `%s` WHERE `instance_id` = %%s'
-        args = [primary_key, table]
+            row_class = resource_class
         if default_sort is None and hasattr(resource_class, 'search_field'):
             default_sort = resource_class.search_field
-        if default_sort:
-            sql += ' ORDER BY `%s`'
-            args.append(default_sort)
-        identifiers = self.dbc.autofetch_column(sql % tuple(args), args=(self.instance_id,))
+        # all rows are loaded at once, the resources are built from the rows cached
+        rows = self.__get_listed_rows(row_class, default_sort)
         data = collections.OrderedDict()
-        for identifier in identifiers:
+        for row in rows:
+            identifier = row[row_class.primary_key]
             elem = resource_class(self, identifier=identifier)
             if backend:
                 elem = elem.get_resource()
             data[identifier] = elem
         return data
 
+    def get_row(self, resource_class, identifier) -> Optional[dict]:
+        """
+        Row of a resource including the data of its related tables as loaded by Resource._load. The row is taken from
+        the rows cached unless the table of the resource has been written since.
+        :return: a copy of the row which may be modified or None if the resource does not exist
+        """
+        try:
+            identifier = int(identifier)
+        except (TypeError, ValueError):
+            return None
+        generation = resource_generations.get(resource_class.table)
+        with self.__cache_mutex:
+            row = self.__get_cached_rows(resource_class.table, generation).get(identifier, None)
+        if row is None:
+            sql = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (resource_class.table,
+                                                                                   resource_class.primary_key)
+            rows = self.__fetch_rows(resource_class, generation, sql, (identifier, self.instance_id))
+            if not rows:
+                return None
+            row = rows[0]
+        return copy.deepcopy(row)
+
+    def resource_changed(self, resource):
+        """ Drops the rows cached of the table of the resource saved or deleted in every process """
+        resource_generations.increment(resource.table)
+
+    def __get_cached_rows(self, table, generation) -> dict:
+        cached = self.__rows.get(table, None)
+        if cached is None or cached[0] != generation:
+            cached = (generation, {})
+            self.__rows[table] = cached
+        return cached[1]
+
+    def __get_listed_rows(self, resource_class, sort) -> list:
+        table = resource_class.table
+        generation = resource_generations.get(table)
+        with self.__cache_mutex:
+            listing = self.__listings.get((table, sort), None)
+            if listing is not None and listing[0] == generation:
+                rows = self.__get_cached_rows(table, generation)
+                if all(identifier in rows for identifier in listing[1]):
+                    return [rows[identifier] for identifier in listing[1]]
+        sql = "SELECT * FROM `%s` WHERE `instance_id` = %%s" % (table,)
+        if sort:
+            sql += " ORDER BY `%s`" % (sort,)
+        rows = self.__fetch_rows(resource_class, generation, sql, (self.instance_id,))
+        with self.__cache_mutex:
+            self.__listings[(table, sort)] = (generation, [row[resource_class.primary_key] for row in rows])
+        return rows
+
+    def __fetch_rows(self, resource_class, generation, sql, args) -> list:
+        """
+        Fetches the rows of the query along with the data of their related tables and adds them to the rows cached.
+        The generation has to be read before fetching, rows written meanwhile are thereby dropped on the next access
+        """
+        rows = self.dbc.autofetch_all(sql, args=args)
+        resource_class.load_related(self.dbc, rows)
+        logger.debug4("Loaded {} rows of {}", len(rows), resource_class.table)
+        with self.__cache_mutex:
+            cached = self.__get_cached_rows(resource_class.table, generation)
+            for row in rows:
+                cached[row[resource_class.primary_key]] = row
+        return rows
+
     def get_settings(self, section, **kwargs):
         resource_class = self.get_resource_def(section, **kwargs)
         config = resource_class.configuration
@@ -14,8 +14,8 @@ def AreaFactory(data_manager, identifier=None, mode=None):
     if identifier is None and mode is None:
         raise dm_exceptions.InvalidArea(mode)
     elif identifier is not None:
-        sql = "SELECT `mode` FROM `settings_area` WHERE `area_id` = %s and `instance_id` = %s"
-        mode = data_manager.dbc.autofetch_value(sql, args=(identifier, data_manager.instance_id))
+        row = data_manager.get_row(Area, identifier)
+        mode = row['mode'] if row else None
     try:
         return AREA_MAPPINGS[mode](data_manager, identifier=identifier)
     except KeyError:
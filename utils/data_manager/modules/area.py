@@ -22,18 +22,24 @@ class Area(resource.Resource):
         resource['mode'] = self.area_type
         return resource
 
-    def _load(self):
-        super()._load()
-        mode_query = "SELECT * FROM `%s` WHERE `area_id` = %%s" % (self.area_table,)
-        mode_data = self._dbc.autofetch_row(mode_query, args=(self.identifier))
-        mode_data = self.translate_keys(mode_data, 'load')
-        for field, val in mode_data.items():
-            if field in self.configuration['fields']:
-                self._data['fields'][field] = val
-            elif 'settings' in self.configuration and field in self.configuration['settings'] and val is not None:
-                self._data['settings'][field] = val
-            else:
+    @classmethod
+    def load_related(cls, dbc, rows):
+        # Areas of every mode are loaded by a single query per mode table
+        from . import AREA_MAPPINGS
+        areas_by_mode = {}
+        for row in rows:
+            areas_by_mode.setdefault(row['mode'], {})[row['area_id']] = row
+        for mode, areas in areas_by_mode.items():
+            try:
+                area_table = AREA_MAPPINGS[mode].area_table
+            except KeyError:
                 continue
+            mode_query = "SELECT * FROM `%s` WHERE `area_id` IN ({})" % (area_table,)
+            mode_rows = dbc.execute_in_chunks(mode_query, list(areas.keys()), get_dict=True)
+            if mode_rows is None:
+                raise dm_exceptions.DataManagerException('Unable to load the areas from %s' % (area_table,))
+            for mode_data in mode_rows:
+                areas[mode_data['area_id']].update(mode_data)
 
     def save(self, force_insert=False, ignore_issues=[]):
         has_identifier = True if self.identifier else False
@@ -65,6 +71,7 @@ class Area(resource.Resource):
                     save_data['routecalc'] = routecalc.identifier
                 save_data = self.translate_keys(save_data, 'save')
                 res = self._dbc.autoexec_insert(self.area_table, save_data, optype="ON DUPLICATE")
+            self._data_manager.resource_changed(self)
             return self.identifier
         except Exception as err:
             if not has_identifier and self.identifier:
@@ -69,9 +69,10 @@ class AreaPokestops(area.Area):
             "route_calc_algorithm": {
                 "settings": {
                     "type": "option",
-                    "values": ['optimized','quick'],
+                    "values": ['optimized','quick','local_search'],
                     "require": False,
-                    "description": "Method of calculation for routes. (Default optimized)",
+                    "description": "Method of calculation for routes. local_search improves the route for "
+                                   "route_calc_local_search_time seconds of the config (Default optimized)",
                     "expected": str
                 }
             }
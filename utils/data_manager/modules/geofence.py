@@ -1,5 +1,4 @@
 from . import resource
-from .. import dm_exceptions
 import json
 
 class GeoFence(resource.Resource):
@@ -61,11 +60,7 @@ class GeoFence(resource.Resource):
                     pass
         return dependencies
 
-    def _load(self):
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
-        if not data:
-            raise dm_exceptions.UnknownIdentifier()
+    def _load_row(self, data):
         data = self.translate_keys(data, 'load')
         self._data['fields']['name'] = data['name']
         self._data['fields']['fence_type'] = data['fence_type']
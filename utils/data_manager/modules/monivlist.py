@@ -42,11 +42,19 @@ class MonIVList(resource.Resource):
                 dependencies.append(('area', area_id))
         return dependencies
 
-    def _load(self):
-        super()._load()
-        mon_query = "SELECT `mon_id` FROM `settings_monivlist_to_mon` WHERE `monlist_id` = %s ORDER BY `mon_order` ASC"
-        mons = self._dbc.autofetch_column(mon_query, args=(self.identifier))
-        self._data['fields']['mon_ids_iv'] = mons
+    @classmethod
+    def load_related(cls, dbc, rows):
+        mon_query = "SELECT `monlist_id`, `mon_id`\n"\
+                    "FROM `settings_monivlist_to_mon`\n"\
+                    "WHERE `monlist_id` IN ({}) ORDER BY `monlist_id`, `mon_order` ASC"
+        mons = {row['monlist_id']: [] for row in rows}
+        mon_rows = dbc.execute_in_chunks(mon_query, list(mons.keys()), get_dict=True)
+        if mon_rows is None:
+            raise dm_exceptions.DataManagerException('Unable to load the mons of the IV lists')
+        for mon in mon_rows:
+            mons[mon['monlist_id']].append(mon['mon_id'])
+        for row in rows:
+            row['mon_ids_iv'] = mons[row['monlist_id']]
 
     def save(self, force_insert=False, ignore_issues=[]):
         self.presave_validation(ignore_issues=ignore_issues)
@@ -68,4 +76,5 @@ class MonIVList(resource.Resource):
                 self._dbc.autoexec_insert('settings_monivlist_to_mon', mon_data)
             except:
                 logger.info('Duplicate pokemon %s detected in list %s' % (mon, self.identifier,))
+        self._data_manager.resource_changed(self)
         return self.identifier
@@ -281,6 +281,7 @@ class Resource(object):
             'instance_id': self.instance_id
         }
         self._dbc.autoexec_delete(self.table, del_data)
+        self._data_manager.resource_changed(self)
 
     def get_dependencies(self):
         return []
@@ -299,10 +300,12 @@ class Resource(object):
         return user_data
 
     def _load(self):
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
+        data = self._data_manager.get_row(self.__class__, self.identifier)
         if not data:
             raise dm_exceptions.UnknownIdentifier()
+        self._load_row(data)
+
+    def _load_row(self, data):
         data = self.translate_keys(data, 'load')
         for field, val in data.items():
             if 'settings' in self.configuration and field in self.configuration['settings']:
@@ -385,8 +388,14 @@ class Resource(object):
                 self._dbc.autoexec_update(self.table, data, where_keyvals=where)
         except mysql.connector.Error as err:
             raise dm_exceptions.SaveIssue(err)
+        self._data_manager.resource_changed(self)
         return self.identifier
 
+    @classmethod
+    def load_related(cls, dbc, rows):
+        """ Adds the data of related tables to the rows loaded, done for all rows at once """
+        pass
+
     @classmethod
     def search(cls, dbc, res_obj, *args, **kwargs):
 
@@ -1,5 +1,4 @@
 from . import resource
-from .. import dm_exceptions
 import json
 from route.routecalc.ClusteringHelper import ClusteringHelper
 from utils.collections import Location
@@ -43,11 +42,7 @@ class RouteCalc(resource.Resource):
                 pass
         return dependencies
 
-    def _load(self):
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
-        if not data:
-            raise dm_exceptions.UnknownIdentifier()
+    def _load_row(self, data):
         data = self.translate_keys(data, 'load')
         self._data['fields']['routefile'] = json.loads(data['routefile'])
 
@@ -62,7 +57,8 @@ class RouteCalc(resource.Resource):
     # =====================================================
 
     def calculate_new_route(self, coords, max_radius, max_coords_within_radius, delete_old_route, calc_type,
-                            useS2, S2level, num_procs=0, overwrite_calculation=False, in_memory=False):
+                            useS2, S2level, num_procs=0, overwrite_calculation=False, in_memory=False,
+                            local_search_time: int = 30):
         if overwrite_calculation:
             calc_type = 'quick'
         if delete_old_route and in_memory is False:
@@ -70,11 +66,12 @@ class RouteCalc(resource.Resource):
             self._data['fields']['routefile'] = []
             self.save()
         new_route = self.getJsonRoute(coords, max_radius, max_coords_within_radius, in_memory, num_processes=num_procs,
-                                      algorithm=calc_type, useS2=useS2, S2level=S2level)
+                                      algorithm=calc_type, useS2=useS2, S2level=S2level,
+                                      local_search_time=local_search_time)
         return new_route
 
     def getJsonRoute(self, coords, maxRadius, maxCoordsInRadius, in_memory, num_processes=1, algorithm='optimized',
-                     useS2: bool = False, S2level: int=15):
+                     useS2: bool = False, S2level: int=15, local_search_time: int = 30):
         export_data = []
         if useS2: logger.debug("Using S2 method for calculation with S2 level: {}", S2level)
         if not in_memory and \
@@ -112,9 +109,13 @@ class RouteCalc(resource.Resource):
         start = timer()
         if algorithm == 'quick':
             from route.routecalc.calculate_route_quick import route_calc_impl
+            sol_best = route_calc_impl(lessCoordinates, num_processes)
+        elif algorithm == 'local_search':
+            from route.routecalc.calculate_route_local_search import route_calc_impl
+            sol_best = route_calc_impl(lessCoordinates, num_processes, time_budget=local_search_time)
         else:
             from route.routecalc.calculate_route_optimized import route_calc_impl
-        sol_best = route_calc_impl(lessCoordinates, num_processes)
+            sol_best = route_calc_impl(lessCoordinates, num_processes)
         end = timer()
         logger.info("Calculated route in {} minutes", str((end - start) / 60))
         calc_coords = []
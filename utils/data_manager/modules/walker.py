@@ -55,13 +55,19 @@ class Walker(resource.Resource):
                 walkerarea = WalkerArea(self._data_manager, identifier=walkerarea_id)
                 walkerarea.delete()
 
-    def _load(self):
-        super()._load()
-        mon_query = "SELECT `walkerarea_id`\n"\
+    @classmethod
+    def load_related(cls, dbc, rows):
+        mon_query = "SELECT `walker_id`, `walkerarea_id`\n"\
                     "FROM `settings_walker_to_walkerarea`\n"\
-                    "WHERE `walker_id` = %s ORDER BY `area_order` ASC"
-        mons = self._dbc.autofetch_column(mon_query, args=(self.identifier))
-        self._data['fields']['setup'] = mons
+                    "WHERE `walker_id` IN ({}) ORDER BY `walker_id`, `area_order` ASC"
+        setups = {row['walker_id']: [] for row in rows}
+        walkerarea_rows = dbc.execute_in_chunks(mon_query, list(setups.keys()), get_dict=True)
+        if walkerarea_rows is None:
+            raise dm_exceptions.DataManagerException('Unable to load the walkerareas of the walkers')
+        for walkerarea in walkerarea_rows:
+            setups[walkerarea['walker_id']].append(walkerarea['walkerarea_id'])
+        for row in rows:
+            row['setup'] = setups[row['walker_id']]
 
     def save(self, force_insert=False, ignore_issues=[]):
         self.presave_validation(ignore_issues=ignore_issues)
@@ -91,4 +97,5 @@ class Walker(resource.Resource):
                 resource.delete()
             except:
                 pass
+        self._data_manager.resource_changed(self)
         return self.identifier
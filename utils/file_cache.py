@@ -0,0 +1,54 @@
+import os
+import weakref
+from threading import Lock
+from typing import Iterator
+
+from utils.logging import logger
+
+
+class FileContent(object):
+    """
+    Content of a file read into memory once, shared by all sends of the file. Must not be modified.
+    """
+
+    def __init__(self, path: str, mtime: float, size: int, data: bytes):
+        self.path: str = path
+        self.mtime: float = mtime
+        self.size: int = size
+        self.data: bytes = data
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        """ The content in chunks of chunk_size bytes, chunks are copied from the shared content as they are sent """
+        view = memoryview(self.data)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset:offset + chunk_size])
+
+
+class FileContentCache(object):
+    """
+    Files sent to devices kept in memory as long as any send of them is in progress. Devices receiving the same file
+    at the same time (e.g. an APK rolled out to all devices) share a single copy instead of each reading the whole
+    file. A file is read again once it has been modified.
+    """
+
+    def __init__(self):
+        self.__contents: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self.__mutex: Lock = Lock()
+
+    def get(self, path: str) -> FileContent:
+        """
+        :raises OSError: if the file cannot be read
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self.__mutex:
+            content = self.__contents.get(path, None)
+            if content is None or content.mtime != stat.st_mtime or content.size != stat.st_size:
+                logger.debug("Reading {} ({} bytes) into memory", path, stat.st_size)
+                with open(path, "rb") as file:
+                    content = FileContent(path, stat.st_mtime, stat.st_size, file.read())
+                self.__contents[path] = content
+            return content
+
+
+file_content_cache: FileContentCache = FileContentCache()
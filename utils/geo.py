@@ -1,7 +1,14 @@
 import math
 
+import numpy as np
+
 from utils.collections import Location
 
+# approximate radius of earth in meters, matching get_distance_of_two_points_in_meters
+EARTH_RADIUS_METERS = 6373000.0
+# rows of a distance matrix computed at once, bounds the memory of temporary arrays to block_size * n
+DISTANCE_MATRIX_BLOCK_SIZE = 1024
+
 
 def get_lat_lng_offsets_by_distance(distance):
     earth = 6373.0
@@ -59,3 +66,68 @@ def get_middle_of_coord_list(list_of_coords):
     central_lat = math.atan2(z, central_square_root)
 
     return Location(math.degrees(central_lat), math.degrees(central_lng))
+
+
+def _split_coords(coords):
+    coords = np.asarray(coords, dtype=np.float64)
+    if coords.size == 0:
+        coords = coords.reshape(0, 2)
+    return np.radians(coords[:, 0]), np.radians(coords[:, 1])
+
+
+def _haversine_in_meters(lat1, lng1, lat2, lng2):
+    # all arguments in radians, broadcasted against each other
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    a = np.clip(a, 0.0, 1.0)
+    return EARTH_RADIUS_METERS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _equirectangular_in_meters(lat1, lng1, lat2, lng2):
+    # all arguments in radians, broadcasted against each other
+    x = (lng2 - lng1) * np.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return EARTH_RADIUS_METERS * np.sqrt(x * x + y * y)
+
+
+_DISTANCE_METHODS = {
+    "haversine": _haversine_in_meters,
+    "equirectangular": _equirectangular_in_meters
+}
+
+
+def get_distances_to_point_in_meters(lat, lng, coords, method="haversine"):
+    """
+    Distances of a single point to many.
+    :param lat: latitude of the point in degrees
+    :param lng: longitude of the point in degrees
+    :param coords: array-like of shape (n, 2) holding lat, lng in degrees
+    :param method: "haversine" or the faster, less accurate "equirectangular" approximation
+    :return: np.ndarray of shape (n,) with the distances in meters
+    """
+    lats, lngs = _split_coords(coords)
+    return _DISTANCE_METHODS[method](math.radians(lat), math.radians(lng), lats, lngs)
+
+
+def get_distance_matrix_in_meters(coords, method="haversine", block_size=DISTANCE_MATRIX_BLOCK_SIZE,
+                                  dtype=np.float64):
+    """
+    Symmetric matrix of the distances between all coords. The input is not modified.
+    The matrix is filled in blocks of block_size rows to keep temporary arrays small for large n, the result
+    itself needs n * n * dtype size of memory.
+    :param coords: array-like of shape (n, 2) holding lat, lng in degrees
+    :param method: "haversine" or the faster, less accurate "equirectangular" approximation
+    :param block_size: amount of rows computed at once
+    :param dtype: dtype of the resulting matrix
+    :return: np.ndarray of shape (n, n) with the distances in meters
+    """
+    lats, lngs = _split_coords(coords)
+    distance_function = _DISTANCE_METHODS[method]
+    num_location = lats.shape[0]
+    block_size = max(1, int(block_size))
+    distmat = np.empty((num_location, num_location), dtype=dtype)
+    for start in range(0, num_location, block_size):
+        end = min(start + block_size, num_location)
+        distmat[start:end] = distance_function(lats[start:end, np.newaxis], lngs[start:end, np.newaxis],
+                                               lats[np.newaxis, :], lngs[np.newaxis, :])
+    np.fill_diagonal(distmat, 0)
+    return distmat
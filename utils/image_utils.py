@@ -1,12 +1,101 @@
+import os
+from threading import Lock
+from typing import Optional
+
 import cv2
+import numpy as np
 from imagehash import dhash
 from PIL import Image
 from utils.logging import logger
 
 
+class Screenshot:
+    """
+    Screenshot of a device kept in memory. The raw (JPEG/PNG) bytes are decoded at most once, the decoded image is
+    shared by all consumers (OCR, hashing, template matching) and must therefore not be modified in place.
+    Storing the screenshot on disk is only needed for MADmin and debugging.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw: bytes = raw
+        self.__image: Optional[np.ndarray] = None
+        self.__gray: Optional[np.ndarray] = None
+        self.__decoded: bool = False
+        self.__decode_mutex: Lock = Lock()
+
+    @property
+    def image(self) -> Optional[np.ndarray]:
+        """ The screenshot decoded to a BGR array like cv2.imread, None if the screenshot is corrupted """
+        if not self.__decoded:
+            with self.__decode_mutex:
+                if not self.__decoded:
+                    self.__image = cv2.imdecode(np.frombuffer(self.raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    self.__decoded = True
+        return self.__image
+
+    @property
+    def gray(self) -> Optional[np.ndarray]:
+        if self.__gray is None and self.image is not None:
+            self.__gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self.__gray
+
+    def to_pil(self) -> Optional[Image.Image]:
+        """ A new RGB PIL image of the screenshot, the screenshot is not decoded again """
+        if self.image is None:
+            return None
+        return Image.fromarray(cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+
+    def save(self, path: str):
+        with open(path, "wb") as fh:
+            fh.write(self.raw)
+
+
+def image_exists(image) -> bool:
+    """ Whether the image passed (Screenshot, decoded array or path) is present """
+    if isinstance(image, (Screenshot, np.ndarray)):
+        return True
+    return image is not None and os.path.isfile(image)
+
+
+def read_image(image) -> Optional[np.ndarray]:
+    """
+    The image passed as BGR array. Screenshots are decoded once, paths are read like cv2.imread
+    :param image: Screenshot, decoded array or path of an image
+    """
+    if isinstance(image, Screenshot):
+        return image.image
+    if isinstance(image, np.ndarray):
+        return image
+    return cv2.imread(image)
+
+
+def read_gray_image(image) -> Optional[np.ndarray]:
+    if isinstance(image, Screenshot):
+        return image.gray
+    image = read_image(image)
+    if image is None:
+        return None
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def open_image(image) -> Image.Image:
+    """
+    The image passed as PIL image, to be used as context manager like Image.open
+    :param image: Screenshot, decoded array or path of an image
+    """
+    if isinstance(image, Screenshot):
+        pil_image = image.to_pil()
+        if pil_image is None:
+            raise IOError("Screenshot corrupted")
+        return pil_image
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return Image.open(image)
+
+
 def getImageHash(image, hashSize=8):
     try:
-        image_temp = cv2.imread(image)
+        image_temp = read_image(image)
     except Exception as e:
         logger.error("Screenshot corrupted :(")
         logger.debug(e)
@@ -15,6 +104,6 @@ def getImageHash(image, hashSize=8):
         logger.error("Screenshot corrupted :(")
         return '0'
 
-    with Image.open(image) as hashPic:
+    with open_image(image) as hashPic:
         imageHash = dhash(hashPic, hashSize)
         return imageHash
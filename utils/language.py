@@ -1,24 +1,88 @@
 import json
 import os
+import time
+from typing import Callable, Dict, Optional, Tuple
 
+from utils.logging import logger
 
-def open_json_file(jsonfile):
+# seconds until the modification time of a file loaded is checked again
+mtime_check_interval_sec = 10
+
+# parsed files kept in memory by path: path -> (mtime, checked at, content)
+_json_files: Dict[str, Tuple[Optional[float], float, object]] = {}
+# tables derived from the files loaded: key -> (contents derived from, table)
+_derived_tables: Dict[tuple, Tuple[tuple, object]] = {}
+
+
+def _load_json_file(path: str):
+    """
+    Parsed content of a JSON file, kept in memory for the whole process. The file is parsed again once it has been
+    modified. The content is shared by all callers and must not be modified.
+    :return: the content or None if the file does not exist or cannot be parsed
+    """
+    now = time.time()
+    cached = _json_files.get(path, None)
+    if cached is not None and now - cached[1] < mtime_check_interval_sec:
+        return cached[2]
     try:
-        with open('locale/' + os.environ['LANGUAGE'] + '/' + jsonfile + '.json') as f:
-            file_open = json.load(f)
-    except:
-        with open('locale/en/' + jsonfile + '.json') as f:
-            file_open = json.load(f)
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    if cached is not None and cached[0] == mtime:
+        _json_files[path] = (mtime, now, cached[2])
+        return cached[2]
+
+    content = None
+    if mtime is not None:
+        try:
+            with open(path) as f:
+                content = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed loading {}: {}", path, e)
+    _json_files[path] = (mtime, now, content)
+    return content
+
+
+def _get_derived_table(key: tuple, sources: tuple, build: Callable):
+    """ Table built from the contents of files loaded, built again once any of the files has been reloaded """
+    cached = _derived_tables.get(key, None)
+    if cached is not None and all(cached_source is source for cached_source, source in zip(cached[0], sources)):
+        return cached[1]
+    table = build(*sources)
+    _derived_tables[key] = (sources, table)
+    return table
+
+
+def open_json_file(jsonfile):
+    file_open = _load_json_file('locale/' + os.environ['LANGUAGE'] + '/' + jsonfile + '.json')
+    if file_open is None:
+        file_open = _load_json_file('locale/en/' + jsonfile + '.json')
+        if file_open is None:
+            raise IOError("Failed loading game data file " + jsonfile)
 
     return file_open
 
 
 def i8ln(word):
-    lang_file = 'locale/' + os.environ['LANGUAGE'] + '/mad.json'
-    if os.path.isfile(lang_file):
-        with open(lang_file) as f:
-            language_file = json.load(f)
-        if word in language_file:
-            return language_file[word]
+    language_file = _load_json_file('locale/' + os.environ['LANGUAGE'] + '/mad.json')
+    if language_file is not None and word in language_file:
+        return language_file[word]
 
     return word
+
+
+def get_mon_name(mon_id) -> str:
+    """
+    Localized name of a mon, looked up in a table of all mons built once per language
+    :raises KeyError: if the mon is unknown
+    """
+    language = os.environ['LANGUAGE']
+    pokemon_file = open_json_file('pokemon')
+    language_file = _load_json_file('locale/' + language + '/mad.json')
+
+    def build(pokemon, translations):
+        translations = translations if translations is not None else {}
+        return {mon: translations.get(data["name"], data["name"]) for mon, data in pokemon.items()}
+
+    mon_names = _get_derived_table(('mon_names', language), (pokemon_file, language_file), build)
+    return mon_names[str(mon_id)]
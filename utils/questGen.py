@@ -1,5 +1,6 @@
 import gettext
 import json
+import os
 import re
 
 from utils.language import i8ln, open_json_file
@@ -9,7 +10,60 @@ lang = gettext.translation('quest', localedir='locale', fallback=True)
 lang.install()
 
 
+# rendered quest texts by language and the quest fields they're rendered from.
+# Quests only change once a day and are shared by most stops, entries do not have to be invalidated since any
+# quest written differing from a known one results in a new key
+_rendered_quests = {}
+_rendered_quests_max_size = 10000
+
+
+def _get_rendered(key, render):
+    key = (os.environ.get('LANGUAGE'),) + key
+    rendered = _rendered_quests.get(key, None)
+    if rendered is None:
+        rendered = render()
+        if len(_rendered_quests) >= _rendered_quests_max_size:
+            _rendered_quests.clear()
+        _rendered_quests[key] = rendered
+    return rendered
+
+
 def generate_quest(quest):
+    rendered = _get_rendered(
+        ('quest', quest['quest_type'], quest['quest_reward_type'], quest['quest_target'], quest['quest_condition'],
+         quest['quest_reward'], quest['quest_item_id'], quest['quest_item_amount'], quest['quest_stardust'],
+         quest['quest_pokemon_id'], quest['task']),
+        lambda: _render_quest(quest))
+
+    quest_raw = ({
+        'pokestop_id': quest['pokestop_id'],
+        'name': quest['name'],
+        'url': quest['image'],
+        'latitude': quest['latitude'],
+        'longitude': quest['longitude'],
+        'timestamp': quest['quest_timestamp'],
+        'item_id': rendered['item_id'],
+        'item_amount': rendered['item_amount'],
+        'item_type': rendered['item_type'],
+        'pokemon_id': rendered['pokemon_id'],
+        'pokemon_name': rendered['pokemon_name'],
+        'pokemon_form': rendered['pokemon_form'],
+        'quest_type': rendered['quest_type'],
+        'quest_type_raw': quest['quest_type'],
+        'quest_reward_type': rendered['quest_reward_type'],
+        'quest_reward_type_raw': quest['quest_reward_type'],
+        'quest_task': rendered['quest_task'],
+        'quest_target': quest['quest_target'],
+        'quest_condition': quest['quest_condition'],
+        'quest_template': quest['quest_template']
+    })
+    return quest_raw
+
+
+def _render_quest(quest):
+    """
+    Renders the texts of a quest not depending on the stop, see generate_quest
+    """
     gettext.find('quest', 'locales', all=True)
     lang = gettext.translation('quest', localedir='locale', fallback=True)
     lang.install()
@@ -44,13 +98,7 @@ def generate_quest(quest):
     else:
         quest_task = quest['task']
 
-    quest_raw = ({
-        'pokestop_id': quest['pokestop_id'],
-        'name': quest['name'],
-        'url': quest['image'],
-        'latitude': quest['latitude'],
-        'longitude': quest['longitude'],
-        'timestamp': quest['quest_timestamp'],
+    return {
         'item_id': item_id,
         'item_amount': item_amount,
         'item_type': item_type,
@@ -58,15 +106,9 @@ def generate_quest(quest):
         'pokemon_name': pokemon_name,
         'pokemon_form': pokemon_form,
         'quest_type': quest_type,
-        'quest_type_raw': quest['quest_type'],
         'quest_reward_type': quest_reward_type,
-        'quest_reward_type_raw': quest['quest_reward_type'],
-        'quest_task': quest_task,
-        'quest_target': quest['quest_target'],
-        'quest_condition': quest['quest_condition'],
-        'quest_template': quest['quest_template']
-    })
-    return quest_raw
+        'quest_task': quest_task
+    }
 
 
 def extractForm(quest_reward_json):
@@ -105,6 +147,10 @@ def pokemonname(id):
 
 
 def questtask(typeid, condition, target):
+    return _get_rendered(('task', typeid, condition, target), lambda: _render_questtask(typeid, condition, target))
+
+
+def _render_questtask(typeid, condition, target):
     gettext.find('quest', 'locales', all=True)
     lang = gettext.translation('quest', localedir='locale', fallback=True)
     lang.install()
@@ -1,13 +1,15 @@
+import heapq
 import json
 import os
 import glob
 import time
+from collections import deque
 from datetime import datetime, timedelta
 from enum import Enum
-from multiprocessing import Queue
-from threading import RLock, Thread
+from threading import Condition, Event, Lock, RLock, Thread
+from typing import Dict, List, Set
 from utils.logging import logger
-from queue import Empty
+from queue import Queue
 
 class jobType(Enum):
     INSTALLATION = 0
@@ -28,16 +30,29 @@ class jobReturn(Enum):
 
 
 class deviceUpdater(object):
+    # seconds to wait before checking a job again which waits for the previous job of its chain
+    chain_recheck_sec = 5
+    # seconds to collect changes of the job log before writing update_log.json
+    status_log_delay_sec = 2
+
     def __init__(self, websocket, args, returning):
         self._websocket = websocket
-        self._update_queue = Queue()
+        # jobs ready to be processed
+        self._update_queue: Queue = Queue()
         self._update_mutex = RLock()
         self._log = {}
         self._args = args
         self._commands: dict = {}
         self._globaljoblog: dict = {}
-        self._current_job_id: int = None
+        self._current_job_ids: Set[str] = set()
         self._returning = returning
+        # jobs waiting for their processing date: heap of (processing date, job id)
+        self._job_timers: list = []
+        self._job_timers_condition: Condition = Condition()
+        # devices a job is processed for and the jobs of the device ready in the meantime
+        self._origins_processing: Dict[str, deque] = {}
+        self._origins_mutex: Lock = Lock()
+        self._status_log_changed: Event = Event()
         if os.path.exists('update_log.json'):
             with open('update_log.json') as logfile:
                 self._log = json.load(logfile)
@@ -46,10 +61,19 @@ class deviceUpdater(object):
         self.kill_old_jobs()
         self.load_automatic_jobs()
 
-        self.t_updater = None
-        self.t_updater = Thread(name='apk_updater', target=self.process_update_queue)
-        self.t_updater.daemon = True
-        self.t_updater.start()
+        self.t_updater: List[Thread] = []
+        for i in range(max(1, args.job_thread_count)):
+            t_processor = Thread(name='apk_updater_' + str(i), target=self.process_update_queue)
+            t_processor.daemon = True
+            self.t_updater.append(t_processor)
+        t_timers = Thread(name='apk_updater_timers', target=self.process_job_timers)
+        t_timers.daemon = True
+        self.t_updater.append(t_timers)
+        t_status_log = Thread(name='apk_updater_log', target=self.process_status_log)
+        t_status_log.daemon = True
+        self.t_updater.append(t_status_log)
+        for thread in self.t_updater:
+            thread.start()
 
     def init_jobs(self):
         self._commands = {}
@@ -124,211 +148,262 @@ class deviceUpdater(object):
 
     @logger.catch()
     def process_update_queue(self):
+        """
+        Processes the jobs ready. Jobs of a device are processed one after another in the order they became ready,
+        jobs of different devices are processed by the threads at the same time.
+        """
         logger.info("Starting Device Job processor")
         time.sleep(10)
         while True:
             try:
-                jobstatus = jobReturn.UNKNOWN
-                try:
-                    item = self._update_queue.get()
-                except Empty:
-                    time.sleep(2)
-                    continue
-
-                if item not in self._log:
-                    continue
-
-                id_ = item
-                origin = self._log[str(id_)]['origin']
-                file_ = self._log[str(id_)]['file']
-                counter = self._log[str(id_)]['counter']
-                jobtype = self._log[str(id_)]['jobtype']
-                waittime = self._log[str(id_)].get('waittime', 0)
-                processtime = self._log[str(id_)].get('processingdate', None)
-                globalid = self._log[str(id_)]['globalid']
-                redo = self._log[str(id_)].get('redo', False)
-
-                laststatus = self._globaljoblog[globalid]['laststatus']
-                lastjobid = self._globaljoblog[globalid].get('lastjobid', 0)
-                startwithinit = self._globaljoblog[globalid].get('startwithinit', False)
-
-                if laststatus is not None and laststatus == 'faulty' and  \
-                        self._globaljoblog[globalid].get('autojob', False):
-                    # breakup job because last job in chain is faulty
-                    logger.error(
-                        'Breakup job {} on device {} - File/Job: {} - previous job in chain was broken (ID: {})'
-                            .format(str(jobtype), str(origin), str(file_), str(id_)))
-                    self.write_status_log(str(id_), field='status', value='terminated')
-                    self.send_webhook(id_=id_, status=jobReturn.TERMINATED)
-                    continue
-
-                if (laststatus is None or laststatus == 'future') and not startwithinit and processtime is None and \
-                        self._globaljoblog[globalid].get('autojob', False):
-                    logger.debug('Autjob (no init run) {} on device {} - File/Job: {} - queued to real starttime (ID: {})'
-                                 .format(str(jobtype), str(origin), str(file_), str(id_)))
-                    # just schedule job - not process the first time
-                    processtime = datetime.timestamp(
-                        datetime.now() + timedelta(minutes=self._globaljoblog[globalid].get('algo', 0) + waittime))
-                    self.write_status_log(str(id_), field='processingdate', value=processtime)
+                item = self._update_queue.get()
+                origin = self.__claim_origin(item)
+                while origin is not None and item is not None:
+                    self.process_job(item)
+                    item = self.__release_origin(origin)
 
-                    self._globaljoblog[globalid]['lastjobid'] = id_
-                    self._globaljoblog[globalid]['laststatus'] = 'future'
+            except KeyboardInterrupt as e:
+                logger.info("process_update_queue received keyboard interrupt, stopping")
+                break
 
-                    self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
-                                 status='future', waittime=waittime, processtime=processtime, redo=redo)
+    def __claim_origin(self, item):
+        """
+        Claims the device of a job for the calling thread
+        :return: the origin or None if the job is unknown or another thread is processing a job of the device, the
+                 job is processed by that thread afterwards in the latter case
+        """
+        with self._origins_mutex:
+            origin = self._log.get(item, {}).get('origin', None)
+            if origin is None:
+                return None
+            if origin in self._origins_processing:
+                self._origins_processing[origin].append(item)
+                return None
+            self._origins_processing[origin] = deque()
+            return origin
+
+    def __release_origin(self, origin):
+        """
+        :return: the next job of the device to be processed by the calling thread or None if the device is released
+        """
+        with self._origins_mutex:
+            waiting = self._origins_processing[origin]
+            if waiting:
+                return waiting.popleft()
+            del self._origins_processing[origin]
+            return None
+
+    def __enqueue_job(self, id_):
+        processtime = self._log.get(id_, {}).get('processingdate', None)
+        if processtime is not None and processtime > time.time():
+            self.__schedule_job(id_, processtime)
+        else:
+            self._update_queue.put(id_)
 
-                    continue
+    def __schedule_job(self, id_, processtime):
+        with self._job_timers_condition:
+            heapq.heappush(self._job_timers, (processtime, id_))
+            self._job_timers_condition.notify()
 
-                if (laststatus is None or laststatus == 'success') and waittime > 0 and processtime is None:
-                    # set sleeptime for this job
-                    logger.debug('Job {} on device {} - File/Job: {} - queued to real starttime (ID: {})'
-                                 .format(str(jobtype), str(origin), str(file_), str(id_)))
+    @logger.catch()
+    def process_job_timers(self):
+        """ Hands jobs scheduled for later on to the job processor once they are due """
+        while True:
+            with self._job_timers_condition:
+                while not self._job_timers or self._job_timers[0][0] > time.time():
+                    timeout = self._job_timers[0][0] - time.time() if self._job_timers else None
+                    self._job_timers_condition.wait(timeout)
+                _, id_ = heapq.heappop(self._job_timers)
+            self._update_queue.put(id_)
 
-                    self._log[str(id_)]['processingdate'] = datetime.timestamp(
-                        datetime.now() + timedelta(minutes=waittime))
+    @logger.catch()
+    def process_job(self, item):
+        jobstatus = jobReturn.UNKNOWN
+        if item not in self._log:
+            return
 
-                    self._globaljoblog[globalid]['lastjobid'] = id_
-                    self._globaljoblog[globalid]['laststatus'] = 'success'
+        id_ = item
+        origin = self._log[str(id_)]['origin']
+        file_ = self._log[str(id_)]['file']
+        counter = self._log[str(id_)]['counter']
+        jobtype = self._log[str(id_)]['jobtype']
+        waittime = self._log[str(id_)].get('waittime', 0)
+        processtime = self._log[str(id_)].get('processingdate', None)
+        globalid = self._log[str(id_)]['globalid']
+        redo = self._log[str(id_)].get('redo', False)
+
+        laststatus = self._globaljoblog[globalid]['laststatus']
+        lastjobid = self._globaljoblog[globalid].get('lastjobid', 0)
+        startwithinit = self._globaljoblog[globalid].get('startwithinit', False)
+
+        if laststatus is not None and laststatus == 'faulty' and  \
+                self._globaljoblog[globalid].get('autojob', False):
+            # breakup job because last job in chain is faulty
+            logger.error(
+                'Breakup job {} on device {} - File/Job: {} - previous job in chain was broken (ID: {})'
+                    .format(str(jobtype), str(origin), str(file_), str(id_)))
+            self.write_status_log(str(id_), field='status', value='terminated')
+            self.send_webhook(id_=id_, status=jobReturn.TERMINATED)
+            return
 
-                    self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
-                                 status='future', waittime=waittime, processtime=processtime, redo=redo)
+        if (laststatus is None or laststatus == 'future') and not startwithinit and processtime is None and \
+                self._globaljoblog[globalid].get('autojob', False):
+            logger.debug('Autjob (no init run) {} on device {} - File/Job: {} - queued to real starttime (ID: {})'
+                         .format(str(jobtype), str(origin), str(file_), str(id_)))
+            # just schedule job - not process the first time
+            processtime = datetime.timestamp(
+                datetime.now() + timedelta(minutes=self._globaljoblog[globalid].get('algo', 0) + waittime))
+            self.write_status_log(str(id_), field='processingdate', value=processtime)
 
-                    continue
+            self._globaljoblog[globalid]['lastjobid'] = id_
+            self._globaljoblog[globalid]['laststatus'] = 'future'
 
-                if laststatus is not None and laststatus in ('pending', 'future', 'failure', 'interrupted',
-                                                             'not connected') and lastjobid != id_ \
-                        and processtime is None:
-                    logger.debug('Job {} on device {} - File/Job: {} - queued because last job in jobchain '
-                                 'is not processed till now (ID: {})'
-                                 .format(str(jobtype), str(origin), str(file_), str(id_)))
-                    # skipping because last job in jobchain is not processed till now
-                    self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
-                                 status='future', waittime=waittime, processtime=processtime, redo=redo)
+            self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
+                         status='future', waittime=waittime, processtime=processtime, redo=redo)
 
-                    continue
+            return
 
-                if processtime is not None and datetime.fromtimestamp(processtime) > datetime.now():
-                    time.sleep(1)
-                    logger.debug('Job {} on device {} - File/Job: {} - queued of processtime in future (ID: {})'
-                                 .format(str(jobtype), str(origin), str(file_), str(id_)))
-                    self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
-                                 status='future', waittime=waittime, processtime=processtime, redo=redo)
+        if (laststatus is None or laststatus == 'success') and waittime > 0 and processtime is None:
+            # set sleeptime for this job
+            logger.debug('Job {} on device {} - File/Job: {} - queued to real starttime (ID: {})'
+                         .format(str(jobtype), str(origin), str(file_), str(id_)))
 
-                    continue
+            self.write_status_log(str(id_), field='processingdate',
+                                  value=datetime.timestamp(datetime.now() + timedelta(minutes=waittime)))
 
-                if id_ in self._log:
-                    self._current_job_id = id_
+            self._globaljoblog[globalid]['lastjobid'] = id_
+            self._globaljoblog[globalid]['laststatus'] = 'success'
 
-                    if 'processingdate' in self._log[id_]:
-                        self.write_status_log(str(id_), field='processingdate', delete=True)
+            self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
+                         status='future', waittime=waittime, processtime=processtime, redo=redo)
 
-                    logger.info(
-                        "Job for {} (File/Job: {}) started (ID: {})".format(str(origin), str(file_), str(id_)))
-                    self.write_status_log(str(id_), field='status', value='processing')
-                    self.write_status_log(str(id_), field='lastprocess', value=int(time.time()))
+            return
 
-                    errorcount = 0
+        if laststatus is not None and laststatus in ('pending', 'future', 'failure', 'interrupted',
+                                                     'not connected') and lastjobid != id_ \
+                and processtime is None:
+            logger.debug('Job {} on device {} - File/Job: {} - queued because last job in jobchain '
+                         'is not processed till now (ID: {})'
+                         .format(str(jobtype), str(origin), str(file_), str(id_)))
+            # skipping because last job in jobchain is not processed till now, check again later on
+            self.write_status_log(str(id_), field='status', value='future')
+            self.__schedule_job(str(id_), time.time() + self.chain_recheck_sec)
 
-                    while jobstatus != jobReturn.SUCCESS and errorcount < 3:
+            return
 
-                        temp_comm = self._websocket.get_origin_communicator(origin)
+        if processtime is not None and datetime.fromtimestamp(processtime) > datetime.now():
+            logger.debug('Job {} on device {} - File/Job: {} - queued of processtime in future (ID: {})'
+                         .format(str(jobtype), str(origin), str(file_), str(id_)))
+            self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype, counter=counter,
+                         status='future', waittime=waittime, processtime=processtime, redo=redo)
 
-                        if temp_comm is None:
-                            errorcount += 1
-                            logger.error(
-                                'Cannot start job {} on device {} - File/Job: {} - Device not connected (ID: {})'
+            return
+
+        if id_ in self._log:
+            self._current_job_ids.add(str(id_))
+
+            if 'processingdate' in self._log[id_]:
+                self.write_status_log(str(id_), field='processingdate', delete=True)
+
+            logger.info(
+                "Job for {} (File/Job: {}) started (ID: {})".format(str(origin), str(file_), str(id_)))
+            self.write_status_log(str(id_), field='status', value='processing')
+            self.write_status_log(str(id_), field='lastprocess', value=int(time.time()))
+
+            errorcount = 0
+
+            while jobstatus != jobReturn.SUCCESS and errorcount < 3:
+
+                temp_comm = self._websocket.get_origin_communicator(origin)
+
+                if temp_comm is None:
+                    errorcount += 1
+                    logger.error(
+                        'Cannot start job {} on device {} - File/Job: {} - Device not connected (ID: {})'
+                            .format(str(jobtype), str(origin), str(file_), str(id_)))
+                    self._globaljoblog[globalid]['laststatus'] = 'not connected'
+                    self.write_status_log(str(id_), field='laststatus', value='not connected')
+                    self._globaljoblog[globalid]['lastjobid'] = id_
+                    jobstatus = jobReturn.NOCONNECT
+                    time.sleep(5)
+
+                else:
+                    # stop worker
+                    self._websocket.set_job_activated(origin)
+                    self.write_status_log(str(id_), field='status', value='starting')
+                    try:
+                        if self.start_job_type(item, jobtype, temp_comm):
+                            logger.info(
+                                'Job {} executed successfully - Device {} - File/Job {} (ID: {})'
                                     .format(str(jobtype), str(origin), str(file_), str(id_)))
-                            self._globaljoblog[globalid]['laststatus'] = 'not connected'
-                            self.write_status_log(str(id_), field='laststatus', value='not connected')
+                            self.write_status_log(str(id_), field='status', value='success')
+                            self.write_status_log(str(id_), field='laststatus', value='success')
+                            self._globaljoblog[globalid]['laststatus'] = 'success'
                             self._globaljoblog[globalid]['lastjobid'] = id_
-                            jobstatus = jobReturn.NOCONNECT
-                            time.sleep(5)
+                            jobstatus = jobReturn.SUCCESS
 
                         else:
-                            # stop worker
-                            self._websocket.set_job_activated(origin)
-                            self.write_status_log(str(id_), field='status', value='starting')
-                            try:
-                                if self.start_job_type(item, jobtype, temp_comm):
-                                    logger.info(
-                                        'Job {} executed successfully - Device {} - File/Job {} (ID: {})'
-                                            .format(str(jobtype), str(origin), str(file_), str(id_)))
-                                    self.write_status_log(str(id_), field='status', value='success')
-                                    self.write_status_log(str(id_), field='laststatus', value='success')
-                                    self._globaljoblog[globalid]['laststatus'] = 'success'
-                                    self._globaljoblog[globalid]['lastjobid'] = id_
-                                    jobstatus = jobReturn.SUCCESS
-
-                                else:
-                                    logger.error(
-                                        'Job {} could not be executed successfully - Device {} - File/Job {} (ID: {})'
-                                            .format(str(jobtype), str(origin), str(file_), str(id_)))
-                                    errorcount += 1
-                                    self._globaljoblog[globalid]['laststatus'] = 'failure'
-                                    self.write_status_log(str(id_), field='laststatus', value='failure')
-                                    self._globaljoblog[globalid]['lastjobid'] = id_
-                                    jobstatus = jobReturn.FAILURE
-
-                                # start worker
-                                self._websocket.set_job_deactivated(origin)
-
-                            except:
-                                logger.error('Job {} could not be executed successfully (fatal error) '
-                                             '- Device {} - File/Job {} (ID: {})'
-                                             .format(str(jobtype), str(origin), str(file_), str(id_)))
-                                errorcount += 1
-                                self._globaljoblog[globalid]['laststatus'] = 'interrupted'
-                                self.write_status_log(str(id_), field='status', value='interrupted')
-                                self._globaljoblog[globalid]['lastjobid'] = id_
-                                jobstatus = jobReturn.FAILURE
-
-                    # check jobstatus and readd if possible
-                    if jobstatus != jobReturn.SUCCESS and (jobstatus == jobReturn.NOCONNECT
-                                                           and self._args.job_restart_notconnect == 0):
-                        logger.error("Job for {} (File/Job: {} - Type {}) failed 3 times in row - aborting (ID: {})"
-                                     .format(str(origin), str(file_), str(jobtype), str(id_)))
-                        self._globaljoblog[globalid]['laststatus'] = 'faulty'
-                        self.write_status_log(str(id_), field='status', value='faulty')
-
-                        if redo and self._globaljoblog[globalid].get('redoonerror', False):
-                            logger.info('Readd this automatic job for {} (File/Job: {} - Type {})  (ID: {})'
-                                        .format(str(origin), str(file_), str(jobtype), str(id_)))
-                            self.restart_job(id_=id_)
+                            logger.error(
+                                'Job {} could not be executed successfully - Device {} - File/Job {} (ID: {})'
+                                    .format(str(jobtype), str(origin), str(file_), str(id_)))
+                            errorcount += 1
+                            self._globaljoblog[globalid]['laststatus'] = 'failure'
+                            self.write_status_log(str(id_), field='laststatus', value='failure')
                             self._globaljoblog[globalid]['lastjobid'] = id_
-                            self._globaljoblog[globalid]['laststatus'] = 'success'
-
-                    elif jobstatus == jobReturn.SUCCESS and redo:
-                        logger.info('Readd this automatic job for {} (File/Job: {} - Type {})  (ID: {})'
-                                    .format(str(origin), str(file_), str(jobtype), str(id_)))
-                        self.restart_job(id_=id_)
-
-                    elif jobstatus == jobReturn.NOCONNECT and self._args.job_restart_notconnect > 0:
-                        logger.error("Job for {} (File/Job: {} - Type {}) failed 3 times in row - requeued it (ID: {})"
-                                     .format(str(origin), str(file_), str(jobtype), str(id_)))
-                        processtime = datetime.timestamp(
-                            datetime.now() + timedelta(minutes=self._args.job_restart_notconnect))
-                        self.write_status_log(str(id_), field='processingdate', value=processtime)
-
+                            jobstatus = jobReturn.FAILURE
+
+                        # start worker
+                        self._websocket.set_job_deactivated(origin)
+
+                    except:
+                        logger.error('Job {} could not be executed successfully (fatal error) '
+                                     '- Device {} - File/Job {} (ID: {})'
+                                     .format(str(jobtype), str(origin), str(file_), str(id_)))
+                        errorcount += 1
+                        self._globaljoblog[globalid]['laststatus'] = 'interrupted'
+                        self.write_status_log(str(id_), field='status', value='interrupted')
                         self._globaljoblog[globalid]['lastjobid'] = id_
-                        self._globaljoblog[globalid]['laststatus'] = 'future'
+                        jobstatus = jobReturn.FAILURE
+
+            # check jobstatus and readd if possible
+            if jobstatus != jobReturn.SUCCESS and (jobstatus == jobReturn.NOCONNECT
+                                                   and self._args.job_restart_notconnect == 0):
+                logger.error("Job for {} (File/Job: {} - Type {}) failed 3 times in row - aborting (ID: {})"
+                             .format(str(origin), str(file_), str(jobtype), str(id_)))
+                self._globaljoblog[globalid]['laststatus'] = 'faulty'
+                self.write_status_log(str(id_), field='status', value='faulty')
+
+                if redo and self._globaljoblog[globalid].get('redoonerror', False):
+                    logger.info('Readd this automatic job for {} (File/Job: {} - Type {})  (ID: {})'
+                                .format(str(origin), str(file_), str(jobtype), str(id_)))
+                    self.restart_job(id_=id_)
+                    self._globaljoblog[globalid]['lastjobid'] = id_
+                    self._globaljoblog[globalid]['laststatus'] = 'success'
 
-                        self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype,
-                                     counter=counter,
-                                     status='future', waittime=waittime, processtime=processtime, redo=redo)
+            elif jobstatus == jobReturn.SUCCESS and redo:
+                logger.info('Readd this automatic job for {} (File/Job: {} - Type {})  (ID: {})'
+                            .format(str(origin), str(file_), str(jobtype), str(id_)))
+                self.restart_job(id_=id_)
 
-                    self.send_webhook(id_=id_, status=jobstatus)
+            elif jobstatus == jobReturn.NOCONNECT and self._args.job_restart_notconnect > 0:
+                logger.error("Job for {} (File/Job: {} - Type {}) failed 3 times in row - requeued it (ID: {})"
+                             .format(str(origin), str(file_), str(jobtype), str(id_)))
+                processtime = datetime.timestamp(
+                    datetime.now() + timedelta(minutes=self._args.job_restart_notconnect))
+                self.write_status_log(str(id_), field='processingdate', value=processtime)
 
-                    self._current_job_id = 0
-                    errorcount = 0
-                    time.sleep(10)
+                self._globaljoblog[globalid]['lastjobid'] = id_
+                self._globaljoblog[globalid]['laststatus'] = 'future'
 
-            except KeyboardInterrupt as e:
-                logger.info("process_update_queue received keyboard interrupt, stopping")
-                if self.t_updater is not None:
-                    self.t_updater.join()
-                break
+                self.add_job(globalid=globalid, origin=origin, file=file_, id_=id_, type=jobtype,
+                             counter=counter,
+                             status='future', waittime=waittime, processtime=processtime, redo=redo)
+
+            self.send_webhook(id_=id_, status=jobstatus)
 
-            time.sleep(5)
+            self._current_job_ids.discard(str(id_))
+            errorcount = 0
+            time.sleep(10)
 
     @logger.catch()
     def preadd_job(self, origin, job, id_, type, globalid=None):
@@ -379,7 +454,7 @@ class deviceUpdater(object):
             self.write_status_log(str(id_), field='status', value=status)
             self.write_status_log(str(id_), field='counter', value=counter)
 
-        self._update_queue.put(str(id_))
+        self.__enqueue_job(str(id_))
 
     def write_status_log(self, id_, field=None, value=None, delete=False):
         self._update_mutex.acquire()
@@ -400,15 +475,30 @@ class deviceUpdater(object):
         finally:
             self._update_mutex.release()
 
-        self.update_status_log()
+        self._status_log_changed.set()
 
     def update_status_log(self):
-        with open('update_log.json', 'w') as outfile:
-            json.dump(self._log, outfile, indent=4)
+        with self._update_mutex:
+            status_log = json.dumps(self._log, indent=4)
+        with open('update_log.json.tmp', 'w') as outfile:
+            outfile.write(status_log)
+        os.replace('update_log.json.tmp', 'update_log.json')
+
+    @logger.catch()
+    def process_status_log(self):
+        """ Writes update_log.json once the job log has changed, changes made shortly after another are written once """
+        while True:
+            self._status_log_changed.wait()
+            time.sleep(self.status_log_delay_sec)
+            self._status_log_changed.clear()
+            try:
+                self.update_status_log()
+            except OSError as e:
+                logger.error('Failed writing update_log.json: {}', str(e))
 
     @logger.catch()
     def delete_log_id(self, id_: str):
-        if id_ != self._current_job_id:
+        if str(id_) not in self._current_job_ids:
             self.write_status_log(str(id_), delete=True)
             return True
         return False
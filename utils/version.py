@@ -12,7 +12,7 @@ import copy
 from db.DbWrapper import DbWrapper
 from db.DbSchemaUpdater import DbSchemaUpdater
 
-current_version = 19
+current_version = 21
 
 class MADVersion(object):
 
@@ -565,6 +565,27 @@ class MADVersion(object):
                     self.dbwrapper.execute(alter_query, commit=True)
                 except Exception as e:
                     logger.exception("Unexpected error: {}", e)
+        if self._version < 20:
+            query = (
+                "ALTER TABLE `settings_area_pokestops` "
+                "CHANGE `route_calc_algorithm` `route_calc_algorithm` "
+                "ENUM('optimized','quick','local_search') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL;"
+            )
+            try:
+                self.dbwrapper.execute(query, commit=True)
+            except Exception as e:
+                logger.exception("Unexpected error: {}", e)
+        if self._version < 21:
+            # MADmin map fetches cells by rectangle
+            if not self._schema_updater.check_index_exists('trs_s2cells', 'trs_s2cells_center'):
+                query = (
+                    "ALTER TABLE trs_s2cells "
+                    "ADD INDEX trs_s2cells_center (center_latitude, center_longitude)"
+                )
+                try:
+                    self.dbwrapper.execute(query, commit=True)
+                except Exception as e:
+                    logger.exception("Unexpected error: {}", e)
 
         self.set_version(current_version)
 
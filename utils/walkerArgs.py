@@ -58,6 +58,12 @@ def parseArgs():
                         help='Port to listen on for proto data (MITM data). Default: 8000.')
     parser.add_argument('-mrdw', '--mitmreceiver_data_workers', type=int, default=2,
                         help='Amount of workers to work off the data that queues up. Default: 2.')
+    parser.add_argument('-mrbs', '--mitmreceiver_batch_size', type=int, default=1,
+                        help='Max amount of queued GMOs a data worker merges and commits in a single transaction. '
+                             'Default: 1 (no batching).')
+    parser.add_argument('-mrbt', '--mitmreceiver_batch_timeout', type=int, default=200,
+                        help='Max time in milliseconds a data worker waits for further GMOs to fill a batch. '
+                             'Default: 200.')
 
     # WEBSOCKET
     parser.add_argument('-wsip', '--ws_ip', required=False, default="0.0.0.0", type=str,
@@ -79,6 +85,8 @@ def parseArgs():
                         help=(
                             'The delay in minutes to wait after an egg has hatched to move to the location of the '
                             'gym. Default: 3.5'))
+    parser.add_argument('-rclst', '--route_calc_local_search_time', required=False, type=int, default=30,
+                        help='Seconds the local_search route calculation spends improving a route. Default: 30')
 
     # job processor
     parser.add_argument('-jobdtwh', '--job_dt_wh', action='store_true', default=False,
@@ -90,6 +98,8 @@ def parseArgs():
                                        '(Default: SUCCESS|FAILURE|NOCONNECT|TERMINATED)')
     parser.add_argument('-jobrtnc', '--job_restart_notconnect', required=False, type=int, default=0,
                         help='Restart job if device is not connected (in minutes). Default: 0 (Off)')
+    parser.add_argument('-jobtc', '--job_thread_count', required=False, type=int, default=10,
+                        help='Maximum number of devices jobs are processed for at the same time. Default: 10')
 
     # Runtypes
     parser.add_argument('-os', '--only_scan', action='store_true', default=True,
@@ -100,6 +110,10 @@ def parseArgs():
                         help='Running OCR in sub-processes (module multiprocessing) to speed up analysis of raids.')
     parser.add_argument('-otc', '--ocr_thread_count', type=int, default=2,
                         help='Amount of threads/processes to be used for screenshot-analysis.')
+    parser.add_argument('-ssc', '--save_screenshots', action='store_true', default=False,
+                        help='Store the screenshots taken by workers in the temp folder to have them shown in MADmin. '
+                             'Always enabled with with_madmin, screenshots are analysed in memory regardless. '
+                             'Default: False')
     parser.add_argument('-wm', '--with_madmin', action='store_true', default=False,
                         help='Start madmin as instance.')
     parser.add_argument('-or', '--only_routes', action='store_true', default=False,
@@ -196,6 +210,13 @@ def parseArgs():
                         help='Debug: Set initial timestamp to fetch changed elements from the DB to send via WH.')
     parser.add_argument('-whmps', '--webhook_max_payload_size', default=0, type=int,
                         help='Split up the payload into chunks and send multiple requests. Default: 0 (unlimited)')
+    parser.add_argument('-whcf', '--webhook_change_feed', action='store_true', default=False,
+                        help='Hand changed elements from the data processing to the webhook worker directly instead '
+                             'of polling the DB for changes every 10 seconds. The DB is still polled if the feed '
+                             'overflows. Default: False')
+    parser.add_argument('-whcfs', '--webhook_change_feed_size', default=10000, type=int,
+                        help='Amount of pending changes the webhook change feed holds before falling back to polling '
+                             'the DB. Default: 10000')
     # weather
     parser.add_argument('-w', '--weather', action='store_true', default=False,
                         help='Read weather and post to db - if supported! (Default: False)')
@@ -236,6 +257,9 @@ def parseArgs():
 
     parser.add_argument('-mmbp', '--madmin_base_path', default='/',
                         help='Base path for madmin')
+    parser.add_argument('-mmmct', '--madmin_map_cache_ttl', default=5, type=int,
+                        help='Seconds to keep map elements fetched for MADmin map sessions, shared by all sessions. '
+                             '0 to disable (Default: 5)')
 
     parser.add_argument('-pfile', '--position_file', default='current',
                         help='Filename for bot\'s current position (Default: current)')
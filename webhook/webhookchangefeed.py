@@ -0,0 +1,52 @@
+import multiprocessing
+from queue import Empty, Full
+from typing import Dict, Iterable, Set, Tuple
+
+from utils.logging import logger
+
+CHANGE_TYPES = ("pokemon", "raid", "gym", "pokestop", "weather", "quest")
+
+
+class WebhookChangeFeed:
+    """
+    Hands the keys of entities written by DbPogoProtoSubmit to the webhook worker. Every published change is a
+    dict of type -> keys (encounter IDs, gym IDs, pokestop IDs or S2 cell IDs) of the rows which have been written.
+    The feed is created before the MITMReceiver is started and thereby shared with the processes submitting data.
+    Publishing never blocks, if the feed is full the change is dropped and the feed is marked as overflowed. The
+    consumer then has to fall back to fetching everything changed since its last check from the DB.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.__queue = multiprocessing.Queue(maxsize=max_size)
+        self.__overflowed = multiprocessing.Event()
+
+    def publish(self, changes: Dict[str, Iterable]):
+        changes = {change_type: list(keys) for change_type, keys in changes.items() if keys}
+        if not changes:
+            return
+        try:
+            self.__queue.put_nowait(changes)
+        except Full:
+            if not self.__overflowed.is_set():
+                logger.warning("Webhook change feed is full, webhook worker falls back to polling the DB once")
+            self.__overflowed.set()
+
+    def consume(self, timeout: float) -> Tuple[Dict[str, Set], bool]:
+        """
+        Waits up to timeout seconds for changes and drains all changes published so far.
+        :return: the keys per change type and whether changes have been dropped since the last call
+        """
+        collected: Dict[str, Set] = {change_type: set() for change_type in CHANGE_TYPES}
+        try:
+            changes = self.__queue.get(timeout=timeout)
+            while True:
+                for change_type, keys in changes.items():
+                    collected.setdefault(change_type, set()).update(keys)
+                changes = self.__queue.get_nowait()
+        except Empty:
+            pass
+
+        overflowed = self.__overflowed.is_set()
+        if overflowed:
+            self.__overflowed.clear()
+        return collected, overflowed
@@ -0,0 +1,188 @@
+import heapq
+import itertools
+import json
+import time
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import Dict, List
+
+import requests
+
+from utils.logging import logger
+from utils.madGlobals import terminate_mad
+
+
+def payload_type_count(payload):
+    count = {}
+
+    for elem in payload:
+        count[elem["type"]] = count.get(elem["type"], 0) + 1
+
+    return count
+
+
+def payload_chunk(payload, size):
+    if size == 0:
+        return [payload]
+
+    return [payload[x: x + size] for x in range(0, len(payload), size)]
+
+
+class WebhookDestination:
+    """
+    A single webhook URL. Chunks are posted by a thread of its own using a persistent session (keep-alive), so a
+    slow receiver does not delay any other destination. Chunks waiting to be sent are bounded, chunks exceeding the
+    bound are dropped instead of blocking the webhook worker. Failed chunks are retried with exponential backoff.
+    """
+    # chunks waiting to be sent
+    queue_size = 100
+    # failed chunks waiting to be retried
+    retry_queue_size = 100
+    max_retries = 5
+    # seconds to wait before the first retry, doubled with every further retry
+    retry_backoff_sec = 2
+    timeout_sec = 5
+
+    def __init__(self, url: str, sub_types: str = "all"):
+        self.url = url
+        self.sub_types = sub_types
+        self.name = url if sub_types == "all" else sub_types + url
+        self.__session = requests.Session()
+        self.__session.headers.update({"Content-Type": "application/json"})
+        self.__queue: Queue = Queue(maxsize=self.queue_size)
+        # (due timestamp, sequence, attempt, chunk), only touched by the sender thread
+        self.__retries: list = []
+        self.__retry_sequence = itertools.count()
+        self.__metrics = {
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "dropped": 0,
+            "last_success": None,
+            "avg_latency_ms": None
+        }
+        # metrics are updated by the sender thread and by the webhook worker dropping chunks
+        self.__metrics_mutex = Lock()
+        self.__sender: Thread = Thread(name="webhook_sender", target=self.__run_sender)
+        self.__sender.daemon = True
+
+    def start(self):
+        self.__sender.start()
+
+    def filter_payload(self, payload) -> list:
+        if self.sub_types == "all":
+            return payload
+        return [payload_data for payload_data in payload if payload_data["type"] in self.sub_types]
+
+    def enqueue(self, chunk) -> bool:
+        try:
+            self.__queue.put_nowait(chunk)
+            return True
+        except Full:
+            with self.__metrics_mutex:
+                self.__metrics["dropped"] += 1
+            logger.warning("Webhook destination {} is falling behind, dropping payload of {} elements",
+                           self.url, len(chunk))
+            return False
+
+    def get_metrics(self) -> dict:
+        with self.__metrics_mutex:
+            metrics = self.__metrics.copy()
+        metrics["queued"] = self.__queue.qsize()
+        metrics["retry_queued"] = len(self.__retries)
+        return metrics
+
+    def __run_sender(self):
+        while not terminate_mad.is_set():
+            now = time.time()
+            if self.__retries and self.__retries[0][0] <= now:
+                _, _, attempt, chunk = heapq.heappop(self.__retries)
+            else:
+                wait = 1 if not self.__retries else min(1, self.__retries[0][0] - now)
+                try:
+                    chunk = self.__queue.get(timeout=wait)
+                    attempt = 0
+                except Empty:
+                    continue
+            self.__deliver(chunk, attempt)
+        self.__session.close()
+
+    def __deliver(self, chunk, attempt: int):
+        logger.debug4("Python data for payload: {}", str(chunk))
+        start = time.time()
+        success = False
+        try:
+            response = self.__session.post(self.url, data=json.dumps(chunk), timeout=self.timeout_sec)
+            if response.status_code != 200:
+                logger.warning("Got status code other than 200 OK from webhook destination {}: {}",
+                               self.url, str(response.status_code))
+            else:
+                success = True
+        except Exception as e:
+            logger.warning("Exception occured while sending webhook to {}: {}", self.url, str(e))
+
+        if success:
+            latency_ms = (time.time() - start) * 1000
+            with self.__metrics_mutex:
+                avg_latency_ms = self.__metrics["avg_latency_ms"]
+                self.__metrics["avg_latency_ms"] = latency_ms if avg_latency_ms is None \
+                    else avg_latency_ms * 0.9 + latency_ms * 0.1
+                self.__metrics["sent"] += 1
+                self.__metrics["last_success"] = time.time()
+            logger.success("Successfully sent payload to webhook {}{}. Stats: {}", self.url,
+                           " [retry {}]".format(attempt) if attempt > 0 else "",
+                           json.dumps(payload_type_count(chunk)))
+            return
+
+        drop = attempt >= self.max_retries or len(self.__retries) >= self.retry_queue_size
+        with self.__metrics_mutex:
+            self.__metrics["failed"] += 1
+            self.__metrics["dropped" if drop else "retried"] += 1
+        if drop:
+            logger.warning("Dropping payload of {} elements for webhook {} after {} attempts",
+                           len(chunk), self.url, attempt + 1)
+            return
+        due = time.time() + self.retry_backoff_sec * 2 ** attempt
+        heapq.heappush(self.__retries, (due, next(self.__retry_sequence), attempt + 1, chunk))
+
+
+class WebhookDelivery:
+    """
+    Hands payloads to every configured webhook destination, each sending on its own.
+    """
+
+    def __init__(self, webhook_url: str, max_payload_size: int):
+        self.__max_payload_size = max_payload_size
+        self.__destinations: List[WebhookDestination] = []
+        for webhook in webhook_url.replace(" ", "").split(","):
+            if not webhook:
+                continue
+            sub_types = "all"
+            url = webhook.strip()
+
+            if url.startswith("["):
+                end_index = webhook.rindex("]")
+                end_index += 1
+                sub_types = webhook[:end_index]
+                url = url[end_index:]
+
+            self.__destinations.append(WebhookDestination(url, sub_types))
+
+    def start(self):
+        for destination in self.__destinations:
+            destination.start()
+
+    def send(self, payload):
+        for destination in self.__destinations:
+            payload_to_send = destination.filter_payload(payload)
+            if len(payload_to_send) == 0:
+                logger.debug("Payload empty. Skip sending to: {} (Filter: {})", destination.url,
+                             destination.sub_types)
+                continue
+            logger.debug("Queueing payload for webhook url: {} (Filter: {})", destination.url,
+                         destination.sub_types)
+            for chunk in payload_chunk(payload_to_send, self.__max_payload_size):
+                destination.enqueue(chunk)
+
+    def get_metrics(self) -> Dict[str, dict]:
+        return {destination.name: destination.get_metrics() for destination in self.__destinations}
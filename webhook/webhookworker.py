@@ -1,8 +1,6 @@
 import json
 import time
-from typing import Optional, List
-
-import requests
+from typing import Dict, List, Optional, Set
 
 from db.DbWebhookReader import DbWebhookReader
 from geofence.geofenceHelper import GeofenceHelper
@@ -12,20 +10,31 @@ from utils.logging import logger
 from utils.madGlobals import terminate_mad
 from utils.questGen import generate_quest
 from utils.s2Helper import S2Helper
+from webhook.webhookchangefeed import WebhookChangeFeed
+from webhook.webhookdelivery import WebhookDelivery
 
 
 class WebhookWorker:
     __IV_MON: List[int] = List[int]
     __excluded_areas = {}
 
-    def __init__(self, args, data_manager, mapping_manager: MappingManager, rarity, db_webhook_reader: DbWebhookReader):
+    def __init__(self, args, data_manager, mapping_manager: MappingManager, rarity, db_webhook_reader: DbWebhookReader,
+                 change_feed: Optional[WebhookChangeFeed] = None):
         self.__worker_interval_sec = 10
+        # seconds the change feed is waited for before checking for termination again
+        self.__feed_interval_sec = 1
+        # seconds between the delivery stats of the destinations being logged
+        self.__metrics_interval_sec = 300
+        self.__last_metrics_log = time.time()
         self.__args = args
         self.__data_manager = data_manager
         self.__db_wrapper = self.__data_manager.dbc
         self._db_reader = db_webhook_reader
+        # feed of the entities written, None if the DB is polled for changes
+        self.__change_feed = change_feed
         self.__rarity = rarity
         self.__last_check = int(time.time())
+        self.__delivery = WebhookDelivery(self.__args.webhook_url, self.__args.webhook_max_payload_size)
 
         self.__build_ivmon_list(mapping_manager)
         self.__build_excluded_areas(mapping_manager)
@@ -37,20 +46,6 @@ class WebhookWorker:
         self.__build_ivmon_list(mapping_manager)
         self.__build_excluded_areas(mapping_manager)
 
-    def __payload_type_count(self, payload):
-        count = {}
-
-        for elem in payload:
-            count[elem["type"]] = count.get(elem["type"], 0) + 1
-
-        return count
-
-    def __payload_chunk(self, payload, size):
-        if size == 0:
-            return [payload]
-
-        return [payload[x: x + size] for x in range(0, len(payload), size)]
-
     def __is_in_excluded_area(self, coordinate):
         for gfh in self.__excluded_areas:
             if gfh.is_coord_inside_include_geofence(coordinate):
@@ -63,87 +58,22 @@ class WebhookWorker:
             logger.debug("Payload empty. Skip sending to webhook.")
             return
 
-        # get list of urls
-        webhooks = self.__args.webhook_url.replace(" ", "").split(",")
-
-        webhook_count = len(webhooks)
-        current_wh_num = 1
-
-        for webhook in webhooks:
-            payloadToSend = []
-            subTypes = "all"
-            url = webhook.strip()
-
-            if url.startswith("["):
-                endIndex = webhook.rindex("]")
-                endIndex += 1
-                subTypes = webhook[:endIndex]
-                url = url[endIndex:]
+        self.__delivery.send(payload)
 
-                for payloadData in payload:
-                    if payloadData["type"] in subTypes:
-                        payloadToSend.append(payloadData)
-            else:
-                payloadToSend = payload
-
-            if len(payloadToSend) == 0:
-                logger.debug(
-                    "Payload empty. Skip sending to: {} (Filter: {})", url, subTypes
-                )
-                continue
-            else:
-                logger.debug("Sending to webhook url: {} (Filter: {})", url, subTypes)
+    def get_delivery_metrics(self):
+        return self.__delivery.get_metrics()
 
-            payload_list = self.__payload_chunk(
-                payloadToSend, self.__args.webhook_max_payload_size
-            )
-
-            current_pl_num = 1
-            for payload_chunk in payload_list:
-                logger.debug4("Python data for payload: {}", str(payload_chunk))
-                logger.debug3("Payload: {}", str(json.dumps(payload_chunk)))
-
-                try:
-                    response = requests.post(
-                        url,
-                        data=json.dumps(payload_chunk),
-                        headers={"Content-Type": "application/json"},
-                        timeout=5,
-                    )
-
-                    if response.status_code != 200:
-                        logger.warning(
-                            "Got status code other than 200 OK from webhook destination: {}",
-                            str(response.status_code),
-                        )
-                    else:
-                        if webhook_count > 1:
-                            whcount_text = " [wh {}/{}]".format(
-                                current_wh_num, webhook_count
-                            )
-                        else:
-                            whcount_text = ""
-
-                        if len(payload_list) > 1:
-                            whchunk_text = " [pl {}/{}]".format(
-                                current_pl_num, len(payload_list)
-                            )
-                        else:
-                            whchunk_text = ""
-
-                        logger.success(
-                            "Successfully sent payload to webhook{}{}. Stats: {}",
-                            whchunk_text,
-                            whcount_text,
-                            json.dumps(self.__payload_type_count(payload_chunk)),
-                        )
-                except Exception as e:
-                    logger.warning(
-                        "Exception occured while sending webhook: {}", str(e)
-                    )
-
-                current_pl_num += 1
-            current_wh_num += 1
+    def __log_delivery_metrics(self):
+        now = time.time()
+        if now - self.__last_metrics_log < self.__metrics_interval_sec:
+            return
+        self.__last_metrics_log = now
+        for destination, metrics in self.get_delivery_metrics().items():
+            avg_latency_ms = metrics["avg_latency_ms"]
+            logger.info("Webhook {}: {} sent, {} failed, {} retried, {} dropped, {} queued, {} to retry, "
+                        "avg latency {}", destination, metrics["sent"], metrics["failed"], metrics["retried"],
+                        metrics["dropped"], metrics["queued"], metrics["retry_queued"],
+                        "-" if avg_latency_ms is None else "{:.0f}ms".format(avg_latency_ms))
 
     def __prepare_quest_data(self, quest_data):
         ret = []
@@ -546,8 +476,16 @@ class WebhookWorker:
         if len(self.__excluded_areas) > 0:
             logger.info("Excluding {} areas from webhooks", len(self.__excluded_areas))
 
-    def __create_payload(self):
-        logger.debug("Fetching data changed since {}", self.__last_check)
+    def __create_payload(self, changes: Optional[Dict[str, Set]] = None):
+        """
+        Fetches the elements changed since the last check or, if changes of the change feed are passed, the elements
+        with the keys passed.
+        """
+        if changes is None:
+            logger.debug("Fetching data changed since {}", self.__last_check)
+        else:
+            logger.debug("Fetching {} elements of the change feed",
+                         sum(len(keys) for keys in changes.values()))
 
         # the payload that is about to be sent
         full_payload = []
@@ -555,12 +493,14 @@ class WebhookWorker:
         try:
             # raids
             raids = self.__prepare_raid_data(
-                self._db_reader.get_raids_changed_since(self.__last_check)
+                self._db_reader.get_raids_changed_since(self.__last_check) if changes is None
+                else self._db_reader.get_raids_by_gym_ids(changes["raid"])
             )
             full_payload += raids
 
             # quests
-            if self.__args.quest_webhook:
+            # quests are rarely changed, the feed only tells whether there are new ones to be fetched
+            if self.__args.quest_webhook and (changes is None or changes["quest"]):
                 quest = self.__prepare_quest_data(
                     self._db_reader.get_quests_changed_since(self.__last_check)
                 )
@@ -569,28 +509,32 @@ class WebhookWorker:
             # weather
             if self.__args.weather_webhook:
                 weather = self.__prepare_weather_data(
-                    self._db_reader.get_weather_changed_since(self.__last_check)
+                    self._db_reader.get_weather_changed_since(self.__last_check) if changes is None
+                    else self._db_reader.get_weather_by_cell_ids(changes["weather"])
                 )
                 full_payload += weather
 
             # gyms
             if self.__args.gym_webhook:
                 gyms = self.__prepare_gyms_data(
-                    self._db_reader.get_gyms_changed_since(self.__last_check)
+                    self._db_reader.get_gyms_changed_since(self.__last_check) if changes is None
+                    else self._db_reader.get_gyms_by_ids(changes["gym"])
                 )
                 full_payload += gyms
 
             # stops
             if self.__args.pokestop_webhook:
                 pokestops = self.__prepare_stops_data(
-                    self._db_reader.get_stops_changed_since(self.__last_check)
+                    self._db_reader.get_stops_changed_since(self.__last_check) if changes is None
+                    else self._db_reader.get_stops_by_ids(changes["pokestop"])
                 )
                 full_payload += pokestops
 
             # mon
             if self.__args.pokemon_webhook:
                 mon = self.__prepare_mon_data(
-                    self._db_reader.get_mon_changed_since(self.__last_check)
+                    self._db_reader.get_mon_changed_since(self.__last_check) if changes is None
+                    else self._db_reader.get_mon_by_encounter_ids(changes["pokemon"])
                 )
                 full_payload += mon
         except Exception:
@@ -602,17 +546,30 @@ class WebhookWorker:
 
     def run_worker(self):
         logger.info("Starting webhook worker thread")
+        self.__delivery.start()
+        change_feed = self.__change_feed
+        if change_feed is not None:
+            logger.info("Webhook worker is using the change feed, the DB is only polled if the feed overflows")
+        # the first run catches up with everything changed since the start time
+        poll = True
 
         while not terminate_mad.is_set():
             preparing_timestamp = int(time.time())
 
             # fetch data and create payload
-            full_payload = self.__create_payload()
+            if change_feed is None or poll:
+                full_payload = self.__create_payload()
+            else:
+                changes, overflowed = change_feed.consume(self.__feed_interval_sec)
+                full_payload = self.__create_payload(None if overflowed else changes)
 
             # send our payload
             self.__send_webhook(full_payload)
+            self.__log_delivery_metrics()
 
             self.__last_check = preparing_timestamp
-            time.sleep(self.__worker_interval_sec)
+            if change_feed is None:
+                time.sleep(self.__worker_interval_sec)
+            poll = False
 
         logger.info("Stopping webhook worker thread")
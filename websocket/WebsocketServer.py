@@ -1,6 +1,7 @@
 import asyncio
 import collections
 import functools
+import itertools
 import math
 import queue
 from queue import Empty
@@ -9,7 +10,7 @@ import time
 import logging
 from asyncio import Handle
 from threading import Event, Thread, current_thread, Lock
-from typing import Optional
+from typing import Dict, Optional
 
 import websockets
 
@@ -45,14 +46,13 @@ class WebsocketServer(object):
         self.__listen_address = args.ws_ip
         self.__listen_port = int(args.ws_port)
 
-        self.__received = {}
-        self.__requests = {}
+        # message ID -> future resolved with the response to the message
+        # only touched within the event loop, thus not guarded by any lock
+        self.__requests: Dict[int, asyncio.Future] = {}
+        # origin -> queue of messages to be sent to the origin, consumed by the producer of its connection
+        self.__send_queues: Dict[str, asyncio.Queue] = {}
 
         self.__users_mutex: Optional[asyncio.Lock] = None
-        self.__id_mutex: Optional[asyncio.Lock] = None
-        self.__send_queue: Optional[asyncio.Queue] = None
-        self.__received_mutex: Optional[asyncio.Lock] = None
-        self.__requests_mutex: Optional[asyncio.Lock] = None
 
         self.__db_wrapper = db_wrapper
         self.__mapping_manager: MappingManager = mapping_manager
@@ -100,10 +100,6 @@ class WebsocketServer(object):
 
     async def __setup_first_loop(self):
         self.__users_mutex = asyncio.Lock()
-        self.__id_mutex = asyncio.Lock()
-        self.__send_queue: asyncio.Queue = asyncio.Queue()
-        self.__received_mutex = asyncio.Lock()
-        self.__requests_mutex = asyncio.Lock()
 
     def start_server(self):
         logger.info("Starting websocket server...")
@@ -372,47 +368,30 @@ class WebsocketServer(object):
             if worker is not None:
                 worker[1].stop_worker()
                 self.__current_users.pop(worker_id)
+            self.__send_queues.pop(worker_id, None)
         logger.info("Worker {} unregistered", str(worker_id))
         self.__worker_shutdown_queue.put(worker[0])
         # TODO ? worker_thread.join()
 
     async def __producer_handler(self, websocket_client_connection):
+        origin = str(websocket_client_connection.request_headers.get_all("Origin")[0])
+        send_queue: asyncio.Queue = self.__get_send_queue(origin)
         while websocket_client_connection.open:
-            # logger.debug("Connection still open, trying to send next message")
-            # retrieve next message from queue to be sent, block if empty
-            next = None
-            while next is None and websocket_client_connection.open:
-                logger.debug("Fetching next message to send")
-                next = await self.__retrieve_next_send(websocket_client_connection)
-                if next is None:
-                    # logger.debug("next is None, stopping connection...")
-                    return
-                await self.__send_specific(websocket_client_connection, next.id, next.message)
-
-    async def __send_specific(self, websocket_client_connection, id, message):
-        # await websocket_client_connection.send(message)
-        try:
-            user = None
-            async with self.__users_mutex:
-                for key, value in self.__current_users.items():
-                    if key == id and value[2].open:
-                        user = value
-            if user is not None:
-                await user[2].send(message)
-        except Exception as e:
-            logger.error("Failed sending message in send_specific: {}".format(str(e)))
-
-    async def __retrieve_next_send(self, websocket_client_connection):
-        found = None
-        while found is None and websocket_client_connection.open:
+            # wait for the next message to be sent, the task is cancelled once the consumer stopped
+            next = await send_queue.get()
+            logger.debug("Sending next message to {}", origin)
             try:
-                found = self.__send_queue.get_nowait()
+                await websocket_client_connection.send(next.message)
             except Exception as e:
-                await asyncio.sleep(0.02)
-        if not websocket_client_connection.open:
-            logger.debug(
-                "retrieve_next_send: connection closed, returning None")
-        return found
+                logger.error("Failed sending message in producer_handler: {}".format(str(e)))
+        logger.debug("producer_handler: connection of {} closed", origin)
+
+    def __get_send_queue(self, origin) -> asyncio.Queue:
+        send_queue = self.__send_queues.get(origin, None)
+        if send_queue is None:
+            send_queue = asyncio.Queue()
+            self.__send_queues[origin] = send_queue
+        return send_queue
 
     async def __consumer_handler(self, websocket_client_connection):
         if websocket_client_connection is None:
@@ -477,43 +456,26 @@ class WebsocketServer(object):
             logger.debug("Received binary values.")
             id = int.from_bytes(message[:4], byteorder='big', signed=False)
             response = message[4:]
-        await self.__set_response(id, response)
-        if not await self.__set_event(id):
-            # remove the response again - though that is kinda stupid
-            await self.__pop_response(id)
-
-    async def __set_event(self, id):
-        result = False
-        async with self.__requests_mutex:
-            if id in self.__requests:
-                self.__requests[id].set()
-                result = True
-            else:
-                # the request has already been deleted due to a timeout...
-                logger.error("Request has already been deleted...")
-        return result
+        self.__set_response(id, response)
+
+    def __set_response(self, id, message):
+        future = self.__requests.get(id, None)
+        if future is None or future.done():
+            # the request has already been deleted due to a timeout...
+            logger.error("Request has already been deleted...")
+            return
+        future.set_result(message)
 
-    async def __set_response(self, id, message):
-        async with self.__received_mutex:
-            self.__received[id] = message
-
-    async def __pop_response(self, id):
-        async with self.__received_mutex:
-            message = self.__received.pop(id)
-        return message
-
-    async def __get_new_message_id(self):
-        async with self.__id_mutex:
-            self.__next_id += 1
-            self.__next_id = int(math.fmod(self.__next_id, 100000))
-            if self.__next_id == 100000:
-                self.__next_id = 1
-            toBeReturned = self.__next_id
-        return toBeReturned
-
-    async def __send(self, id, to_be_sent):
+    def __get_new_message_id(self):
+        self.__next_id += 1
+        self.__next_id = int(math.fmod(self.__next_id, 100000))
+        if self.__next_id == 100000:
+            self.__next_id = 1
+        return self.__next_id
+
+    def __send(self, id, to_be_sent):
         next_message = OutgoingMessage(id, to_be_sent)
-        await self.__send_queue.put(next_message)
+        self.__get_send_queue(id).put_nowait(next_message)
 
     async def __send_and_wait_internal(self, id, worker_instance, message, timeout, byte_command: int = None):
         async with self.__users_mutex:
@@ -522,31 +484,36 @@ class WebsocketServer(object):
         if user_entry is None or user_entry[1] != worker_instance and worker_instance != 'madmin':
             raise WebsocketWorkerRemovedException
 
-        message_id = await self.__get_new_message_id()
-        message_event = asyncio.Event()
-        message_event.clear()
-
-        await self.__set_request(message_id, message_event)
+        message_id = self.__get_new_message_id()
+        response_future = self.__loop.create_future()
+        self.__requests[message_id] = response_future
 
         if isinstance(message, str):
             to_be_sent: str = u"%s;%s" % (str(message_id), message)
             logger.debug("To be sent to {}: {}", id, to_be_sent.strip())
-        elif byte_command is not None:
+        elif byte_command is not None and isinstance(message, bytes):
             to_be_sent: bytes = (int(message_id)).to_bytes(4, byteorder='big')
             to_be_sent += (int(byte_command)).to_bytes(4, byteorder='big')
             to_be_sent += message
             logger.debug("To be sent to {} (message ID: {}): {}", id, message_id, str(to_be_sent[:10]))
+        elif byte_command is not None:
+            # chunks of a file, sent as fragmented message without joining the chunks. The chunks are taken as the
+            # frames are written, writing waits for the connection to drain its buffer
+            header: bytes = (int(message_id)).to_bytes(4, byteorder='big')
+            header += (int(byte_command)).to_bytes(4, byteorder='big')
+            to_be_sent = itertools.chain([header], message)
+            logger.debug("To be sent to {} (message ID: {}): chunked binary", id, message_id)
         else:
             logger.fatal("Tried to send invalid message (bytes without byte command or no byte/str passed)")
+            self.__requests.pop(message_id, None)
             return None
-        await self.__send(id, to_be_sent)
+        self.__send(id, to_be_sent)
 
         # now wait for the response!
         result = None
         logger.debug("Timeout: {}", str(timeout))
-        event_triggered = None
         try:
-            event_triggered = await asyncio.wait_for(message_event.wait(), timeout=timeout)
+            result = await asyncio.wait_for(response_future, timeout=timeout)
         except asyncio.TimeoutError as te:
             logger.warning("Timeout, increasing timeout-counter")
             # TODO: why is the user removed here?
@@ -555,27 +522,28 @@ class WebsocketServer(object):
                 logger.error("5 consecutive timeouts to {} or origin is not longer connected, cleanup", str(id))
                 await self.__internal_clean_up_user(id, None)
                 await self.__reset_fail_counter(id)
-                await self.__remove_request(message_id)
                 raise WebsocketWorkerTimeoutException
+            return None
+        finally:
+            self.__requests.pop(message_id, None)
 
-        if event_triggered:
-            logger.debug("Received answer in time, popping response")
-            await self.__reset_fail_counter(id)
-            await self.__remove_request(message_id)
-            result = await self.__pop_response(message_id)
-            if isinstance(result, str):
-                logger.debug("Response to {}: {}",
-                             str(id), str(result.strip()))
-            else:
-                logger.debug("Received binary data to {}, starting with {}", str(
-                        id), str(result[:10]))
+        logger.debug("Received answer in time")
+        await self.__reset_fail_counter(id)
+        if isinstance(result, str):
+            logger.debug("Response to {}: {}",
+                         str(id), str(result.strip()))
+        else:
+            logger.debug("Received binary data to {}, starting with {}", str(
+                    id), str(result[:10]))
         return result
 
     def send_and_wait(self, id, worker_instance, message, timeout, byte_command: int = None):
         if isinstance(message, bytes):
             logger.debug("{} sending binary: {}", str(id), str(message[:10]))
-        else:
+        elif isinstance(message, str):
             logger.debug("{} sending command: {}", str(id), message.strip())
+        else:
+            logger.debug("{} sending chunked binary", str(id))
         try:
             # future: Handle = self._add_task_to_loop(self.__send_and_wait_internal(id, worker_instance, message,
             #                                                                       timeout))
@@ -592,10 +560,6 @@ class WebsocketServer(object):
             raise WebsocketWorkerTimeoutException
         return result
 
-    async def __set_request(self, id, event):
-        async with self.__requests_mutex:
-            self.__requests[id] = event
-
     async def __reset_fail_counter(self, id):
         async with self.__users_mutex:
             if id in self.__current_users.keys():
@@ -610,10 +574,6 @@ class WebsocketServer(object):
                     new_count = 100
         return new_count
 
-    async def __remove_request(self, message_id):
-        async with self.__requests_mutex:
-            self.__requests.pop(message_id)
-
     def get_reg_origins(self):
         return self.__current_users
 
@@ -1,12 +1,17 @@
 from threading import Lock
+from typing import Optional
 
+from utils.file_cache import FileContent, file_content_cache
 from utils.geo import get_distance_of_two_points_in_meters
+from utils.image_utils import Screenshot
 from utils.logging import logger
 from utils.madGlobals import ScreenshotType
 
 
 class Communicator:
     UPDATE_INTERVAL = 0.4
+    # files are sent as fragmented message, one frame per chunk
+    FILE_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, websocket_handler, worker_id: str, worker_instance_ref, command_timeout: float):
         # Throws ValueError if unable to connect!
@@ -16,6 +21,8 @@ class Communicator:
         self.websocket_handler = websocket_handler
         self.__command_timeout: float = command_timeout
         self.__sendMutex = Lock()
+        # the screenshot retrieved last, shared by the worker and its screen detection
+        self.__last_screenshot: Optional[Screenshot] = None
 
     def cleanup_websocket(self):
         logger.info(
@@ -41,10 +48,13 @@ class Communicator:
             self.__sendMutex.release()
 
     def install_apk(self, filepath: str, timeout: float) -> bool:
-        # TODO: check if file exists...
-        with open(filepath, "rb") as file:  # opening for [r]eading as [b]inary
-            data = file.read()  # if you only wanted to read 512 bytes, do .read(512)
-        return self.__run_and_ok_bytes(message=data, timeout=timeout, byte_command=1)
+        try:
+            content: FileContent = file_content_cache.get(filepath)
+        except OSError as e:
+            logger.error("Failed reading APK {}: {}", filepath, str(e))
+            return False
+        return self.__run_and_ok_bytes(message=content.iter_chunks(self.FILE_CHUNK_SIZE), timeout=timeout,
+                                       byte_command=1)
 
     def startApp(self, package_name):
         return self.__runAndOk("more start {}\r\n".format(package_name), self.__command_timeout)
@@ -111,9 +121,19 @@ class Communicator:
         return response
 
     def get_screenshot(self, path, quality: int = 70, screenshot_type: ScreenshotType = ScreenshotType.JPEG) -> bool:
+        screenshot: Optional[Screenshot] = self.get_screenshot_in_memory(quality, screenshot_type)
+        if screenshot is None:
+            return False
+        logger.debug("Storing screenshot...")
+        screenshot.save(path)
+        logger.debug("Done storing, returning")
+        return True
+
+    def get_screenshot_in_memory(self, quality: int = 70,
+                                 screenshot_type: ScreenshotType = ScreenshotType.JPEG) -> Optional[Screenshot]:
         if quality < 10 or quality > 100:
             logger.error("Invalid quality value passed for screenshots")
-            return False
+            return None
 
         screenshot_type_str: str = "jpeg"
         if screenshot_type == ScreenshotType.PNG:
@@ -129,24 +149,23 @@ class Communicator:
         finally:
             self.__sendMutex.release()
         if encoded is None:
-            return False
+            return None
         elif isinstance(encoded, str):
             logger.debug("Screenshot response not binary")
             if "KO: " in encoded:
                 logger.error(
                         "get_screenshot: Could not retrieve screenshot. Make sure your RGC is updated.")
-                return False
+                return None
             elif "OK:" not in encoded:
                 logger.error("get_screenshot: response not OK")
-                return False
-            return False
+                return None
+            return None
         else:
-            logger.debug("Storing screenshot...")
+            self.__last_screenshot = Screenshot(encoded)
+            return self.__last_screenshot
 
-            with open(path, "wb") as fh:
-                fh.write(encoded)
-            logger.debug("Done storing, returning")
-            return True
+    def get_last_screenshot(self) -> Optional[Screenshot]:
+        return self.__last_screenshot
 
     def backButton(self) -> bool:
         return self.__runAndOk("screen back\r\n", self.__command_timeout)
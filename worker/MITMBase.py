@@ -54,7 +54,7 @@ class MITMBase(WorkerBase):
             timeout = self.get_devicesettings_value("mitm_wait_timeout", 45)
 
         # let's fetch the latest data to add the offset to timeout (in case device and server times are off...)
-        latest = self._mitm_mapper.request_latest(self._id)
+        latest_update, latest = self._mitm_mapper.wait_for_latest(self._id, -1, 0)
         timestamp_last_data = latest.get("timestamp_last_data", 0)
         timestamp_last_received = latest.get("timestamp_receiver", 0)
 
@@ -69,7 +69,6 @@ class MITMBase(WorkerBase):
 
         while data_requested == LatestReceivedType.UNDEFINED and timestamp + timeout >= int(time.time()) \
                 and not self._stop_worker_event.is_set():
-            latest = self._mitm_mapper.request_latest(self._id)
             data_requested = self._wait_data_worker(
                 latest, proto_to_wait_for, timestamp)
 
@@ -78,7 +77,9 @@ class MITMBase(WorkerBase):
                 logger.error("Worker {} get killed while sleeping", str(self._id))
                 raise InternalStopWorkerException
 
-            time.sleep(1)
+            if data_requested == LatestReceivedType.UNDEFINED:
+                # wake up as soon as new data of the device arrives, check the worker at least every second
+                latest_update, latest = self._mitm_mapper.wait_for_latest(self._id, latest_update, 1)
 
         position_type = self._mapping_manager.routemanager_get_position_type(self._routemanager_name, self._id)
         if position_type is None:
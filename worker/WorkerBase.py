@@ -11,8 +11,9 @@ from typing import Optional
 from db.DbWrapper import DbWrapper
 from mitm_receiver.MitmMapper import MitmMapper
 from ocr.pogoWindows import PogoWindows
-from utils.MappingManager import MappingManager
+from utils.MappingManager import DevicemappingsSnapshot, MappingManager
 from utils.hamming import hamming_distance as hamming_dist
+from utils.image_utils import Screenshot
 from utils.logging import logger
 from utils.madGlobals import (
     InternalStopWorkerException,
@@ -38,6 +39,7 @@ class WorkerBase(ABC):
         self._communicator: Communicator = Communicator(
                 websocket_handler, id, self, args.websocket_command_timeout)
         self._id: str = id
+        self._devicemappings: DevicemappingsSnapshot = DevicemappingsSnapshot(mapping_manager, id)
         self._applicationArgs = args
         self._last_known_state = last_known_state
         self._work_mutex = Lock()
@@ -87,20 +89,17 @@ class WorkerBase(ABC):
                                                           self._resocalc, mapping_manager, self._applicationArgs)
 
     def set_devicesettings_value(self, key: str, value):
-        self._mapping_manager.set_devicesetting_value_of(self._id, key, value)
+        self._devicemappings.set_devicesettings_value(key, value)
 
     def get_devicesettings_value(self, key: str, default_value: object = None):
         logger.debug2("Fetching devicemappings of {}".format(self._id))
         try:
-            devicemappings: Optional[dict] = self._mapping_manager.get_devicemappings_of(self._id)
+            return self._devicemappings.get_devicesettings_value(key, default_value)
         except (EOFError, FileNotFoundError) as e:
             logger.warning("Failed fetching devicemappings in worker {} with description: {}. Stopping worker"
                            .format(str(self._id), str(e)))
             self._stop_worker_event.set()
             return None
-        if devicemappings is None:
-            return default_value
-        return devicemappings.get("settings", {}).get(key, default_value)
 
     def get_communicator(self):
         return self._communicator
@@ -122,6 +121,15 @@ class WorkerBase(ABC):
         return os.path.join(
                 self._applicationArgs.temp_path, screenshot_filename)
 
+    def get_screenshot(self):
+        """
+        The screenshot taken last, kept in memory. Falls back to the path of the screenshot if none has been taken yet.
+        """
+        screenshot: Optional[Screenshot] = self._communicator.get_last_screenshot()
+        if screenshot is not None:
+            return screenshot
+        return self.get_screenshot_path()
+
     def check_max_walkers_reached(self):
         walkermax = self._walker.get('walkermax', False)
         if walkermax is False or (type(walkermax) is str and len(walkermax) == 0):
@@ -686,7 +694,7 @@ class WorkerBase(ABC):
             return False
 
         while not returncode == ScreenType.POGO and not self._stop_worker_event.isSet():
-            returncode = self._WordToScreenMatching.checkQuest(self.get_screenshot_path())
+            returncode = self._WordToScreenMatching.checkQuest(self.get_screenshot())
 
             if returncode == ScreenType.QUEST:
                 questcounter += 1
@@ -840,10 +848,8 @@ class WorkerBase(ABC):
                     "reopenRaidTab: Failed retrieving screenshot before checking for closebutton")
             return
         logger.debug("_reopenRaidTab: Checking close except nearby...")
-        pathToPass = self.get_screenshot_path()
-        logger.debug("Path: {}", str(pathToPass))
         self._pogoWindowManager.check_close_except_nearby_button(
-                pathToPass, self._id, self._communicator, 'True')
+                self.get_screenshot(), self._id, self._communicator, 'True')
         logger.debug("_reopenRaidTab: Getting to raidscreen...")
         self._getToRaidscreen(3)
         time.sleep(1)
@@ -860,7 +866,7 @@ class WorkerBase(ABC):
             return None
 
         logger.debug("_get_trash_positions: checking screen")
-        trashes = self._pogoWindowManager.get_trash_click_positions(self.get_screenshot_path())
+        trashes = self._pogoWindowManager.get_trash_click_positions(self.get_screenshot())
 
         return trashes
 
@@ -878,8 +884,13 @@ class WorkerBase(ABC):
 
         screenshot_quality: int = self.get_devicesettings_value("screenshot_quality", 80)
 
-        take_screenshot = self._communicator.get_screenshot(self.get_screenshot_path(fileaddon=errorscreen),
-                                                            screenshot_quality, screenshot_type)
+        screenshot: Optional[Screenshot] = self._communicator.get_screenshot_in_memory(screenshot_quality,
+                                                                                      screenshot_type)
+        take_screenshot = screenshot is not None
+        if take_screenshot and (errorscreen or self._applicationArgs.save_screenshots
+                                or self._applicationArgs.with_madmin):
+            # only needed for MADmin and for debugging, the screenshot is processed in memory
+            screenshot.save(self.get_screenshot_path(fileaddon=errorscreen))
 
         if self._lastScreenshotTaken and compareToTime < 0.5:
             logger.error(
@@ -903,7 +914,7 @@ class WorkerBase(ABC):
             logger.debug("_checkPogoFreeze: failed retrieving screenshot")
             return
         from utils.image_utils import getImageHash
-        screenHash = getImageHash(os.path.join(self.get_screenshot_path()))
+        screenHash = getImageHash(self.get_screenshot())
         logger.debug("checkPogoFreeze: Old Hash: {}",
                      str(self._lastScreenHash))
         logger.debug("checkPogoFreeze: New Hash: {}", str(screenHash))
@@ -943,7 +954,7 @@ class WorkerBase(ABC):
             return False
 
         logger.debug("_check_pogo_main_screen: checking mainscreen")
-        while not self._pogoWindowManager.check_pogo_mainscreen(screenshot_path, self._id):
+        while not self._pogoWindowManager.check_pogo_mainscreen(self.get_screenshot(), self._id):
             logger.warning("_check_pogo_main_screen: not on Mainscreen...")
             if attempts == maxAttempts:
                 # could not reach raidtab in given maxAttempts
@@ -951,16 +962,18 @@ class WorkerBase(ABC):
                         "_check_pogo_main_screen: Could not get to Mainscreen within {} attempts", str(maxAttempts))
                 return False
 
-            found = self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot_path(), self._id,
+            found = self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot(), self._id,
                                                                              self._communicator, close_raid=True)
             if found:
                 logger.debug("_check_pogo_main_screen: Found (X) button (except nearby)")
 
-            if not found and self._pogoWindowManager.look_for_button(screenshot_path, 2.20, 3.01, self._communicator):
+            if not found and self._pogoWindowManager.look_for_button(self.get_screenshot(), 2.20, 3.01,
+                                                                     self._communicator):
                 logger.debug("_check_pogo_main_screen: Found button (small)")
                 found = True
 
-            if not found and self._pogoWindowManager.look_for_button(screenshot_path, 1.05, 2.20, self._communicator):
+            if not found and self._pogoWindowManager.look_for_button(self.get_screenshot(), 1.05, 2.20,
+                                                                     self._communicator):
                 logger.debug("_check_pogo_main_screen: Found button (big)")
                 time.sleep(5)
                 found = True
@@ -990,7 +1003,7 @@ class WorkerBase(ABC):
             return False
 
         logger.debug("_check_pogo_main_screen_tr: checking mainscreen")
-        if not self._pogoWindowManager.check_pogo_mainscreen(screenshot_path, self._id):
+        if not self._pogoWindowManager.check_pogo_mainscreen(self.get_screenshot(), self._id):
             return False
 
         logger.debug("_check_pogo_main_screen_tr: done")
@@ -1017,12 +1030,12 @@ class WorkerBase(ABC):
             return False
 
         logger.debug("checkPogoButton: checking for buttons")
-        found = self._pogoWindowManager.look_for_button(self.get_screenshot_path(), 2.20, 3.01, self._communicator)
+        found = self._pogoWindowManager.look_for_button(self.get_screenshot(), 2.20, 3.01, self._communicator)
         if found:
             time.sleep(1)
             logger.debug("checkPogoButton: Found button (small)")
 
-        if not found and self._pogoWindowManager.look_for_button(self.get_screenshot_path(), 1.05, 2.20,
+        if not found and self._pogoWindowManager.look_for_button(self.get_screenshot(), 1.05, 2.20,
                                                                  self._communicator):
             logger.debug("checkPogoButton: Found button (big)")
             found = True
@@ -1059,7 +1072,7 @@ class WorkerBase(ABC):
             return False
 
         logger.debug("checkPogoClose: checking for CloseX")
-        found = self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot_path(), self._id,
+        found = self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot(), self._id,
                                                                          self._communicator)
         if found:
             time.sleep(1)
@@ -1093,7 +1106,7 @@ class WorkerBase(ABC):
             return False
 
         # TODO: replace self._id with device ID
-        while self._pogoWindowManager.is_gps_signal_lost(self.get_screenshot_path(), self._id):
+        while self._pogoWindowManager.is_gps_signal_lost(self.get_screenshot(), self._id):
             logger.debug("getToRaidscreen: GPS signal lost")
             time.sleep(1)
             self._takeScreenshot()
@@ -1107,7 +1120,7 @@ class WorkerBase(ABC):
                 return False
         self._redErrorCount = 0
         logger.debug("getToRaidscreen: checking raidscreen")
-        while not self._pogoWindowManager.check_raidscreen(self.get_screenshot_path(), self._id,
+        while not self._pogoWindowManager.check_raidscreen(self.get_screenshot(), self._id,
                                                            self._communicator):
             logger.debug("getToRaidscreen: not on raidscreen...")
             if attempts > maxAttempts:
@@ -1117,17 +1130,17 @@ class WorkerBase(ABC):
                 return False
             self._checkPogoFreeze()
             # not using continue since we need to get a screen before the next round...
-            found = self._pogoWindowManager.look_for_button(self.get_screenshot_path(), 2.20, 3.01, self._communicator)
+            found = self._pogoWindowManager.look_for_button(self.get_screenshot(), 2.20, 3.01, self._communicator)
             if found:
                 logger.debug("getToRaidscreen: Found button (small)")
 
-            if not found and self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot_path(),
+            if not found and self._pogoWindowManager.check_close_except_nearby_button(self.get_screenshot(),
                                                                                       self._id, self._communicator):
                 logger.debug(
                         "getToRaidscreen: Found (X) button (except nearby)")
                 found = True
 
-            if not found and self._pogoWindowManager.look_for_button(self.get_screenshot_path(), 1.05, 2.20,
+            if not found and self._pogoWindowManager.look_for_button(self.get_screenshot(), 1.05, 2.20,
                                                                      self._communicator):
                 logger.debug("getToRaidscreen: Found button (big)")
                 found = True
@@ -1137,7 +1150,7 @@ class WorkerBase(ABC):
             if not found:
                 logger.debug(
                         "getToRaidscreen: Previous checks found nothing. Checking nearby open")
-                if self._pogoWindowManager.check_nearby(self.get_screenshot_path(), self._id,
+                if self._pogoWindowManager.check_nearby(self.get_screenshot(), self._id,
                                                         self._communicator):
                     return self._takeScreenshot(delayBefore=self.get_devicesettings_value("post_screenshot_delay", 1))
 
@@ -2,11 +2,10 @@ import time
 import math
 
 from threading import Event
-from typing import Optional
 from utils.logging import logger
 from websocket.communicator import Communicator
 from utils.routeutil import check_walker_value_type
-from utils.MappingManager import MappingManager
+from utils.MappingManager import DevicemappingsSnapshot, MappingManager
 from mitm_receiver.MitmMapper import MitmMapper
 from db.DbWrapper import DbWrapper
 from utils.madGlobals import (WebsocketWorkerRemovedException, WebsocketWorkerTimeoutException,
@@ -25,17 +24,15 @@ class WorkerConfigmode(object):
         self._walker = walker
         self.workerstart = None
         self._mapping_manager: MappingManager = mapping_manager
+        self._devicemappings: DevicemappingsSnapshot = DevicemappingsSnapshot(mapping_manager, id)
         self._mitm_mapper = mitm_mapper
         self._db_wrapper = db_wrapper
 
     def set_devicesettings_value(self, key: str, value):
-        self._mapping_manager.set_devicesetting_value_of(self._id, key, value)
+        self._devicemappings.set_devicesettings_value(key, value)
 
     def get_devicesettings_value(self, key: str, default_value: object = None):
-        devicemappings: Optional[dict] = self._mapping_manager.get_devicemappings_of(self._id)
-        if devicemappings is None:
-            return default_value
-        return devicemappings.get("settings", {}).get(key, default_value)
+        return self._devicemappings.get_devicesettings_value(key, default_value)
 
     def get_communicator(self):
         return self._communicator
@@ -198,11 +198,9 @@ class WorkerMITM(MITMBase):
         if latest is None:
             logger.debug(
                 "Nothing received from {} since MAD started", str(self._id))
-            time.sleep(0.5)
         elif proto_to_wait_for not in latest:
             logger.debug(
                 "No data linked to the requested proto since MAD started.")
-            time.sleep(0.5)
         else:
             # proto has previously been received, let's check the timestamp...
             # TODO: int vs str-key?
@@ -214,7 +212,6 @@ class WorkerMITM(MITMBase):
                 # TODO: consider reseting timestamp here since we clearly received SOMETHING
                 latest_data = latest_proto.get("values", None)
                 if latest_data is None:
-                    time.sleep(0.5)
                     return LatestReceivedType.UNDEFINED
                 elif mode in ["mon_mitm", "iv_mitm"]:
                     # check if the GMO contains mons
@@ -226,7 +223,6 @@ class WorkerMITM(MITMBase):
                                 break
                     if data_requested is None:
                         logger.debug("No spawnpoints in data requested")
-                        time.sleep(1)
                 elif mode in ["raids_mitm"]:
                     for data_extract in latest_data['payload']['cells']:
                         for forts in data_extract['forts']:
@@ -235,15 +231,12 @@ class WorkerMITM(MITMBase):
                                 break
                     if data_requested is None:
                         logger.debug("No forts in data received")
-                        time.sleep(0.5)
                 else:
                     logger.warning(
                         "No mode specified to wait for - this should not even happen...")
-                    time.sleep(0.5)
             else:
                 logger.debug("latest timestamp of proto {} ({}) is older than {}",
                              str(proto_to_wait_for), str(latest_timestamp), str(timestamp))
                 # TODO: timeout error instead of data_error_counter? Differentiate timeout vs missing data (the
                 # TODO: latter indicates too high speeds for example
-                time.sleep(0.5)
         return data_requested
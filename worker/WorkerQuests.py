@@ -487,7 +487,7 @@ class WorkerQuests(MITMBase):
                 check_y_text_ending = int(trashcancheck[trash].y) + self._resocalc.get_inventory_text_diff(self)
 
                 try:
-                    item_text = self._pogoWindowManager.get_inventory_text(self.get_screenshot_path(),
+                    item_text = self._pogoWindowManager.get_inventory_text(self.get_screenshot(),
                                                                        self._id, text_x1, text_x2, check_y_text_ending,
                                                                        check_y_text_starter)
 
@@ -787,7 +787,6 @@ class WorkerQuests(MITMBase):
     def _wait_data_worker(self, latest, proto_to_wait_for, timestamp):
         if latest is None:
             logger.debug("Nothing received since MAD started")
-            time.sleep(0.5)
         elif 156 in latest and latest[156].get('timestamp', 0) >= timestamp:
             return LatestReceivedType.GYM
         elif 102 in latest and latest[102].get('timestamp', 0) >= timestamp:
@@ -795,7 +794,6 @@ class WorkerQuests(MITMBase):
         elif proto_to_wait_for not in latest:
             logger.debug(
                     "No data linked to the requested proto since MAD started.")
-            time.sleep(0.5)
         else:
             # proto has previously been received, let's check the timestamp...
             # TODO: int vs str-key?
@@ -806,7 +804,6 @@ class WorkerQuests(MITMBase):
                 latest_data = latest_proto.get("values", None)
                 logger.debug4("Latest data received: {}".format(str(latest_data)))
                 if latest_data is None:
-                    time.sleep(0.5)
                     return None
                 elif proto_to_wait_for == 101:
                     payload: dict = latest_data.get("payload", None)
@@ -842,7 +839,6 @@ class WorkerQuests(MITMBase):
                         proto_to_wait_for), str(latest_timestamp), str(timestamp))
                 # TODO: timeoutopen error instead of data_error_counter? Differentiate timeout vs missing data (the
                 # TODO: latter indicates too high speeds for example
-                time.sleep(0.5)
         return LatestReceivedType.UNDEFINED
 
     def process_rocket(self):